@@ -0,0 +1,52 @@
+"""presence_nodes
+
+Revision ID: 3f9c1d2a7b64
+Revises: 789df888a224
+Create Date: 2026-10-19 01:05:12.418305
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.utils.sqids import SqidType
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c1d2a7b64"
+down_revision: str | Sequence[str] | None = "789df888a224"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "presence_nodes",
+        sa.Column("node_id", sa.Text(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", SqidType(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("node_id"),
+    )
+    op.create_index(op.f("ix_presence_nodes_deleted_at"), "presence_nodes", ["deleted_at"], unique=False)
+    op.create_index(op.f("ix_presence_nodes_expires_at"), "presence_nodes", ["expires_at"], unique=False)
+
+    # Events logged before presence was tracked per node belong to no live node
+    op.execute("DELETE FROM thread_viewer_events")
+    op.add_column("thread_viewer_events", sa.Column("node_id", sa.Text(), nullable=False))
+    op.create_index(op.f("ix_thread_viewer_events_node_id"), "thread_viewer_events", ["node_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_thread_viewer_events_node_id"), table_name="thread_viewer_events")
+    op.drop_column("thread_viewer_events", "node_id")
+
+    op.drop_index(op.f("ix_presence_nodes_expires_at"), table_name="presence_nodes")
+    op.drop_index(op.f("ix_presence_nodes_deleted_at"), table_name="presence_nodes")
+    op.drop_table("presence_nodes")
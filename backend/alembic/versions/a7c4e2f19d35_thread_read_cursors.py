@@ -0,0 +1,111 @@
+"""thread_read_cursors
+
+Revision ID: a7c4e2f19d35
+Revises: 3f9c1d2a7b64
+Create Date: 2026-10-19 02:14:37.902144
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.utils.sqids import SqidType
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c4e2f19d35"
+down_revision: str | Sequence[str] | None = "3f9c1d2a7b64"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "thread_read_cursors",
+        sa.Column("thread_id", SqidType(), nullable=False),
+        sa.Column("user_id", SqidType(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("read_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", SqidType(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["thread_id"], ["threads.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("thread_id", "user_id", name="uq_thread_read_cursor"),
+    )
+    op.create_index(op.f("ix_thread_read_cursors_deleted_at"), "thread_read_cursors", ["deleted_at"], unique=False)
+    op.create_index(op.f("ix_thread_read_cursors_user_id"), "thread_read_cursors", ["user_id"], unique=False)
+
+    # Number existing messages per thread in creation order
+    op.add_column("threads", sa.Column("last_seq", sa.Integer(), server_default="0", nullable=False))
+    op.add_column("messages", sa.Column("seq", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE messages
+        SET seq = numbered.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY thread_id ORDER BY created_at, id) AS seq
+            FROM messages
+        ) AS numbered
+        WHERE messages.id = numbered.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE threads
+        SET last_seq = counts.last_seq
+        FROM (SELECT thread_id, max(seq) AS last_seq FROM messages GROUP BY thread_id) AS counts
+        WHERE threads.id = counts.thread_id
+        """
+    )
+    op.alter_column("messages", "seq", nullable=False)
+    op.create_unique_constraint("uq_messages_thread_seq", "messages", ["thread_id", "seq"])
+    op.create_index(
+        "ix_messages_thread_deleted_seq",
+        "messages",
+        ["thread_id", "seq"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+    # Backfill read cursors from the legacy read log, so unread counts are right from the
+    # start: a read at read_at covers the messages created up to then. The log itself is
+    # deleted in batches by the compact_thread_read_log task.
+    op.execute(
+        """
+        INSERT INTO thread_read_cursors (thread_id, user_id, seq, read_at)
+        SELECT
+            latest.thread_id,
+            latest.user_id,
+            COALESCE(
+                (
+                    SELECT max(messages.seq) FROM messages
+                    WHERE messages.thread_id = latest.thread_id AND messages.created_at <= latest.read_at
+                ),
+                0
+            ),
+            latest.read_at
+        FROM (
+            SELECT thread_id, user_id, max(read_at) AS read_at
+            FROM thread_read_statuses
+            GROUP BY thread_id, user_id
+        ) AS latest
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_messages_thread_deleted_seq", table_name="messages", postgresql_where=sa.text("deleted_at IS NOT NULL")
+    )
+    op.drop_constraint("uq_messages_thread_seq", "messages", type_="unique")
+    op.drop_column("messages", "seq")
+    op.drop_column("threads", "last_seq")
+
+    op.drop_index(op.f("ix_thread_read_cursors_user_id"), table_name="thread_read_cursors")
+    op.drop_index(op.f("ix_thread_read_cursors_deleted_at"), table_name="thread_read_cursors")
+    op.drop_table("thread_read_cursors")
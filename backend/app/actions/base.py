@@ -233,14 +233,16 @@ class ActionGroup:
     def get_available_actions(
         self,
         obj: BaseDBModel | None = None,
+        deps: "ActionDeps | None" = None,
     ) -> list[ActionDTO]:
         from app.actions.deps import ActionDeps
 
         # Select the appropriate pre-sorted dictionary
         actions_dict = self.top_level_actions if obj is None else self.object_actions
 
-        # Create deps instance for this request
-        deps = ActionDeps(**self.action_registry.dependencies)
+        # Create deps instance for this request, unless the caller built its own
+        if deps is None:
+            deps = ActionDeps(**self.action_registry.dependencies)
 
         available = []
         for action_key, action_class in actions_dict.items():
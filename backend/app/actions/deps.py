@@ -8,7 +8,7 @@ from litestar_saq import TaskQueues
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.actions.registry import ActionRegistry
-from app.client.s3_client import S3Client, S3Dep
+from app.client.s3_client import BaseS3Client, S3Dep
 from app.emails.service import EmailService
 from app.utils.configure import ConfigProtocol
 
@@ -31,7 +31,7 @@ class ActionDeps:
     transaction: AsyncSession
 
     # Services
-    s3_client: S3Client
+    s3_client: BaseS3Client
     task_queues: TaskQueues
     channels: ChannelsPlugin
     config: ConfigProtocol
@@ -61,3 +61,32 @@ def provide_action_registry(
         email_service=email_service,
         channels=channels,
     )
+
+
+def provide_read_action_deps(
+    s3_client: S3Dep,
+    config: ConfigProtocol,
+    read_transaction: AsyncSession,
+    task_queues: TaskQueues,
+    request: Request,
+    team_id: int | None,
+    campaign_id: int | None,
+    email_service: EmailService,
+    channels: ChannelsPlugin,
+) -> ActionDeps:
+    """Deps for checking which actions are available on read-only routes.
+
+    Bound to the read transaction, so listing actions doesn't open a writer connection.
+    """
+    return ActionDeps(
+        user=request.user,
+        team_id=team_id,
+        campaign_id=campaign_id,
+        request=request,
+        transaction=read_transaction,
+        s3_client=s3_client,
+        task_queues=task_queues,
+        channels=channels,
+        config=config,
+        email_service=email_service,
+    )
@@ -151,14 +151,16 @@ async def google_callback(
 
 
 @get("/me")
-async def get_current_user_google_info(request: Request, transaction: AsyncSession) -> GoogleUserInfoResponseSchema:
+async def get_current_user_google_info(
+    request: Request, read_transaction: AsyncSession
+) -> GoogleUserInfoResponseSchema:
     """Get current user's Google OAuth information."""
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     stmt = select(GoogleOAuthAccount).where(GoogleOAuthAccount.user_id == user_id)
-    result = await transaction.execute(stmt)
+    result = await read_transaction.execute(stmt)
     google_account = result.scalar_one_or_none()
 
     if not google_account:
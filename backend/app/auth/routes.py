@@ -17,12 +17,13 @@ from app.auth.schemas import (
     TeamScopeSchema,
 )
 from app.campaigns.models import Campaign, CampaignGuest
+from app.sessions.cookie import REVOCATION_STORE, revoke_session, revoke_user_sessions
 from app.teams.models import Team
 from app.users.models import Role
 
 
 @get("/list-scopes", guards=[requires_session])
-async def list_scopes(request: Request, transaction: AsyncSession) -> ListScopesResponse:
+async def list_scopes(request: Request, read_transaction: AsyncSession) -> ListScopesResponse:
     """List all available scopes for the current user.
 
     Returns teams (via Role) and campaigns (via CampaignGuest) that the user has access to.
@@ -31,7 +32,7 @@ async def list_scopes(request: Request, transaction: AsyncSession) -> ListScopes
 
     # Get teams via Role table
     team_stmt = select(Role, Team).join(Team, Role.team_id == Team.id).where(Role.user_id == user_id)
-    team_result = await transaction.execute(team_stmt)
+    team_result = await read_transaction.execute(team_stmt)
     team_rows = team_result.all()
 
     teams = [
@@ -46,7 +47,7 @@ async def list_scopes(request: Request, transaction: AsyncSession) -> ListScopes
         .join(Team, Campaign.team_id == Team.id)
         .where(CampaignGuest.user_id == user_id)
     )
-    campaign_result = await transaction.execute(campaign_stmt)
+    campaign_result = await read_transaction.execute(campaign_stmt)
     campaign_rows = campaign_result.all()
 
     campaigns = [
@@ -133,6 +134,14 @@ async def switch_scope(request: Request, data: SwitchScopeRequest, transaction:
 
 @post("/logout")
 async def logout_user(request: Request) -> None:
+    await revoke_session(request.app.stores.get(REVOCATION_STORE), request.session)
+    request.clear_session()
+
+
+@post("/logout-everywhere", guards=[requires_session])
+async def logout_user_everywhere(request: Request) -> None:
+    """Log the current user out of every session, on every device."""
+    await revoke_user_sessions(request.app.stores.get(REVOCATION_STORE), request.user)
     request.clear_session()
 
 
@@ -141,6 +150,7 @@ auth_router = Router(
     path="/auth",
     route_handlers=[
         logout_user,
+        logout_user_everywhere,
         list_scopes,
         switch_scope,
         google_auth_router,
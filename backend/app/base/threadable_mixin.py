@@ -7,7 +7,6 @@ from sqlalchemy.orm import Mapped, declared_attr, relationship
 
 if TYPE_CHECKING:
     from app.threads.models import Thread
-    from app.threads.schemas import ThreadUnreadInfo
 
 
 class ThreadableMixin:
@@ -21,11 +20,12 @@ class ThreadableMixin:
             __tablename__ = "campaigns"
             # ... rest of model
 
-    The relationship can be eager-loaded:
-        query = select(Campaign).options(selectinload(Campaign.thread))
-
-    Or accessed lazily:
+    The thread is only loaded on request:
+        query = select(Campaign).options(joinedload(Campaign.thread))
         campaign.thread  # Will be None if no thread exists yet
+
+    Unread counts are computed in SQL without loading the thread, see
+    get_thread_unread_info and get_thread_unread_infos in app.threads.services.
     """
 
     @declared_attr
@@ -51,43 +51,10 @@ class ThreadableMixin:
             foreign_keys="[Thread.threadable_id]",
             viewonly=True,
             uselist=False,
-            lazy="selectin",  # Automatically batch-load in queries
+            lazy="raise",  # Opt-in: load explicitly where the thread is needed
         )
 
-    def get_thread_unread_info(self, user_id: int) -> "ThreadUnreadInfo | None":
-        """Get ThreadUnreadInfo for this object's thread.
-
-        This is a synchronous helper that requires the thread relationship
-        to already be loaded. It computes the unread count from the loaded
-        thread's messages and read_statuses.
-
-        Args:
-            user_id: User ID to calculate unread count for
-
-        Returns:
-            ThreadUnreadInfo or None if no thread exists
-        """
-        from app.threads.schemas import ThreadUnreadInfo
-
-        if self.thread is None:
-            return None
-
-        # Find the user's most recent read timestamp
-        last_read_at = None
-        for read_status in self.thread.read_statuses:
-            if read_status.user_id == user_id:
-                if last_read_at is None or read_status.read_at > last_read_at:
-                    last_read_at = read_status.read_at
-
-        # Count unread messages
-        unread_count = 0
-        for message in self.thread.messages:
-            if message.deleted_at is not None:
-                continue  # Skip soft-deleted messages
-            if last_read_at is None or message.created_at > last_read_at:
-                unread_count += 1
-
-        return ThreadUnreadInfo(
-            thread_id=self.thread.id,
-            unread_count=unread_count,
-        )
+    @classmethod
+    def threadable_type(cls) -> str:
+        """Threadable type of this model's threads (its table name)."""
+        return cls.__tablename__  # type: ignore[attr-defined]
@@ -1,6 +1,5 @@
 from litestar import Request, Router, get, post
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
 
 from app.actions.enums import ActionGroupType
 from app.actions.registry import ActionRegistry
@@ -13,7 +12,7 @@ from app.brands.schemas import (
     BrandSchema,
     BrandUpdateSchema,
 )
-from app.threads.models import Thread
+from app.threads.services import get_thread_unread_info
 from app.utils.db import get_or_404, update_model
 from app.utils.sqids import Sqid
 
@@ -22,28 +21,17 @@ from app.utils.sqids import Sqid
 async def get_brand(
     id: Sqid,
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     action_registry: ActionRegistry,
 ) -> BrandSchema:
     """Get a brand by SQID."""
-    brand = await get_or_404(
-        transaction,
-        Brand,
-        id,
-        load_options=[
-            joinedload(Brand.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            )
-        ],
-    )
+    brand = await get_or_404(read_transaction, Brand, id)
 
     # Compute actions for this brand
     action_group = action_registry.get_class(ActionGroupType.BrandActions)
     actions = action_group.get_available_actions(obj=brand)
 
-    # Convert thread to unread info using the mixin method
-    thread_info = brand.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(read_transaction, brand, request.user)
 
     return BrandSchema(
         id=brand.id,
@@ -88,9 +76,9 @@ async def update_brand(id: Sqid, data: BrandUpdateSchema, request: Request, tran
 
 
 @get("/contacts/{id:str}")
-async def get_brand_contact(id: Sqid, transaction: AsyncSession) -> BrandContactSchema:
+async def get_brand_contact(id: Sqid, read_transaction: AsyncSession) -> BrandContactSchema:
     """Get a brand contact by SQID."""
-    contact = await get_or_404(transaction, BrandContact, id)
+    contact = await get_or_404(read_transaction, BrandContact, id)
     return BrandContactSchema(
         id=contact.id,
         first_name=contact.first_name,
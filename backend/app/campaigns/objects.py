@@ -31,7 +31,6 @@ class CampaignObject(BaseObject[Campaign]):
     # Load options for eager loading relationships
     load_options = [
         joinedload(Campaign.brand),
-        joinedload(Campaign.thread),
         selectinload(Campaign.contract_versions),
         joinedload(Campaign.contract),
     ]
@@ -11,7 +11,7 @@ from app.campaigns.schemas import CampaignSchema, CampaignUpdateSchema
 from app.client.openai_client import OpenAIClient
 from app.client.s3_client import BaseS3Client
 from app.documents.models import Document
-from app.threads.models import Thread
+from app.threads.services import get_thread_unread_info
 from app.utils.db import get_or_404, update_model
 from app.utils.sqids import Sqid
 
@@ -20,18 +20,14 @@ from app.utils.sqids import Sqid
 async def get_campaign(
     id: Sqid,
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     action_registry: ActionRegistry,
 ) -> CampaignSchema:
     campaign = await get_or_404(
-        transaction,
+        read_transaction,
         Campaign,
         id,
         load_options=[
-            joinedload(Campaign.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            ),
             joinedload(Campaign.contract),
             selectinload(Campaign.contract_versions),
         ],
@@ -41,8 +37,7 @@ async def get_campaign(
     action_group = action_registry.get_class(ActionGroupType.CampaignActions)
     actions = action_group.get_available_actions(obj=campaign)
 
-    # Convert thread to unread info using the mixin method
-    thread_info = campaign.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(read_transaction, campaign, request.user)
 
     return CampaignSchema(
         id=campaign.id,
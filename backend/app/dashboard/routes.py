@@ -69,7 +69,7 @@ def _dashboard_to_schema(dashboard: Dashboard, action_registry: ActionRegistry)
 
 @get("/")
 async def list_dashboards(
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     request: Request,
     action_registry: ActionRegistry,
 ) -> list[DashboardSchema]:
@@ -92,17 +92,17 @@ async def list_dashboards(
         )
         .options(selectinload(Dashboard.widgets))
     )
-    result = await transaction.execute(stmt)
+    result = await read_transaction.execute(stmt)
     dashboards = result.scalars().all()
 
     return [_dashboard_to_schema(dashboard, action_registry) for dashboard in dashboards]
 
 
 @get("/{id:str}")
-async def get_dashboard(id: Sqid, transaction: AsyncSession, action_registry: ActionRegistry) -> DashboardSchema:
+async def get_dashboard(id: Sqid, read_transaction: AsyncSession, action_registry: ActionRegistry) -> DashboardSchema:
     """Get a specific dashboard by ID."""
     stmt = select(Dashboard).where(Dashboard.id == id).options(selectinload(Dashboard.widgets))
-    result = await transaction.execute(stmt)
+    result = await read_transaction.execute(stmt)
     dashboard = result.scalar_one_or_none()
     if not dashboard:
         raise NotFoundException(f"Dashboard with id {id} not found")
@@ -53,7 +53,6 @@ class DeliverableObject(BaseObject[Deliverable]):
         ),
         selectinload(Deliverable.media),
         selectinload(Deliverable.assigned_roster),
-        joinedload(Deliverable.thread),
     ]
 
     column_definitions = [
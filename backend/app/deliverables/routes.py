@@ -12,40 +12,35 @@ from app.deliverables.schemas import (
     DeliverableUpdateSchema,
     deliverable_to_response,
 )
-from app.media.models import Media
-from app.threads.models import Thread
+from app.threads.services import get_thread_unread_info
 from app.utils.db import get_or_404, update_model
 from app.utils.sqids import Sqid
 
 
 @get("/{id:str}")
 async def get_deliverable(
-    request: Request, id: Sqid, transaction: AsyncSession, s3_client: S3Dep
+    request: Request, id: Sqid, read_transaction: AsyncSession, s3_client: S3Dep
 ) -> DeliverableResponseSchema:
     """Get a deliverable by SQID with type-safe field access and relations."""
     # id is already decoded from SQID string to int by msgspec
 
     # Load deliverable with all relations eagerly
     deliverable = await get_or_404(
-        transaction,
+        read_transaction,
         Deliverable,
         id,
         load_options=[
             joinedload(Deliverable.deliverable_media_associations).options(
-                selectinload(DeliverableMedia.media).options(joinedload(Media.thread)),
+                selectinload(DeliverableMedia.media),
                 joinedload(DeliverableMedia.thread),
             ),
             joinedload(Deliverable.campaign),
             selectinload(Deliverable.assigned_roster),
-            joinedload(Deliverable.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            ),
         ],
     )
     action_group = ActionRegistry().get_class(ActionGroupType.DeliverableActions)
     actions = action_group.get_available_actions(obj=deliverable)
-    thread_info = deliverable.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(read_transaction, deliverable, request.user)
     return deliverable_to_response(
         deliverable=deliverable,
         s3_client=s3_client,
@@ -74,10 +69,6 @@ async def update_deliverable(
                 joinedload(DeliverableMedia.thread),
             ),
             selectinload(Deliverable.assigned_roster),
-            joinedload(Deliverable.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            ),
         ],
     )
     await update_model(
@@ -90,7 +81,7 @@ async def update_deliverable(
 
     action_group = ActionRegistry().get_class(ActionGroupType.DeliverableActions)
     actions = action_group.get_available_actions(obj=deliverable)
-    thread_info = deliverable.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(transaction, deliverable, request.user)
     return deliverable_to_response(
         deliverable=deliverable,
         s3_client=s3_client,
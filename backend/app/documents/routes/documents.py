@@ -18,6 +18,7 @@ from app.documents.schemas import (
     RegisterDocumentSchema,
     document_to_response_schema,
 )
+from app.threads.services import get_thread_unread_info, get_thread_unread_infos
 from app.utils.db import get_or_404
 from app.utils.sqids import Sqid
 
@@ -87,20 +88,21 @@ async def register_document(
 @get("/{id:str}")
 async def get_document(
     id: Sqid,
-    transaction: AsyncSession,
+    request: Request,
+    read_transaction: AsyncSession,
     s3_client: S3Dep,
     action_registry: ActionRegistry,
 ) -> DocumentResponseSchema:
     """Get a document item by SQID."""
-    from sqlalchemy.orm import joinedload
-
-    document = await get_or_404(transaction, Document, id, load_options=[joinedload(Document.thread)])
+    document = await get_or_404(read_transaction, Document, id)
 
     # Compute actions for this document
     action_group = action_registry.get_class(ActionGroupType.DocumentActions)
     actions = action_group.get_available_actions(obj=document)
 
-    return document_to_response_schema(document, s3_client, actions)
+    thread_info = await get_thread_unread_info(read_transaction, document, request.user)
+
+    return document_to_response_schema(document, s3_client, actions, thread_info)
 
 
 @delete("/{id:str}", status_code=200)
@@ -123,7 +125,7 @@ async def delete_document(id: Sqid, transaction: AsyncSession, s3_client: S3Dep)
 
 @get("/")
 async def list_documents(
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     s3_client: S3Dep,
     action_registry: ActionRegistry,
     request: Request,
@@ -138,8 +140,11 @@ async def list_documents(
 
     query = query.order_by(Document.created_at.desc())
 
-    result = await transaction.execute(query)
+    result = await read_transaction.execute(query)
     documents = result.scalars().all()
+    thread_infos = await get_thread_unread_infos(
+        read_transaction, Document.threadable_type(), [document.id for document in documents], request.user
+    )
 
     # Compute actions for each document
     action_group = action_registry.get_class(ActionGroupType.DocumentActions)
@@ -149,6 +154,7 @@ async def list_documents(
             document,
             s3_client,
             action_group.get_available_actions(obj=document),
+            thread_infos.get(document.id),
         )
         for document in documents
     ]
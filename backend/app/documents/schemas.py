@@ -41,7 +41,7 @@ class DocumentResponseSchema(BaseSchema):
 
 
 def document_to_response_schema(
-    document: Document, s3_client: BaseS3Client, actions: list[ActionDTO], thread=None
+    document: Document, s3_client: BaseS3Client, actions: list[ActionDTO], thread: ThreadUnreadInfo | None = None
 ) -> DocumentResponseSchema:
     """Transform Document model to response schema with presigned URLs.
 
@@ -70,7 +70,7 @@ def document_to_response_schema(
         download_url=download_url,
         thumbnail_url=thumbnail_url,
         actions=actions,
-        thread=thread if thread is not None else document.thread,
+        thread=thread,
     )
 
 
@@ -17,8 +17,8 @@ from app.threads.enums import ThreadSocketMessageType
 from app.threads.models import Message
 from app.threads.schemas import ServerMessage
 from app.threads.services import (
-    get_or_create_thread,
-    notify_thread,
+    get_or_create_thread_id,
+    notify_thread_after_commit,
 )
 from app.utils.sqids import sqid_encode
 from app.utils.tiptap import bold, doc, paragraph, text
@@ -51,7 +51,7 @@ async def _post_to_thread(
         campaign_id: Optional campaign_id for dual-scoped messages
     """
     # Get or create thread for this object
-    thread = await get_or_create_thread(
+    thread_id = await get_or_create_thread_id(
         transaction=session,
         threadable_type=event.object_type,
         threadable_id=event.object_id,
@@ -60,7 +60,7 @@ async def _post_to_thread(
 
     # Create thread message
     thread_message = Message(
-        thread_id=thread.id,
+        thread_id=thread_id,
         user_id=user_id,
         content=content,
         team_id=event.team_id,
@@ -69,21 +69,23 @@ async def _post_to_thread(
     session.add(thread_message)
     await session.flush()
 
-    # Notify WebSocket subscribers
+    # Notify WebSocket subscribers once the message is committed
     # Event messages are system-created messages
-    await notify_thread(
+    notify_thread_after_commit(
+        session,
         channels,
-        thread.id,
+        thread_id,
         ServerMessage(
             message_type=ThreadSocketMessageType.MESSAGE_CREATED,
             message_id=sqid_encode(thread_message.id),
-            thread_id=sqid_encode(thread.id),
+            thread_id=sqid_encode(thread_id),
             user_id=sqid_encode(0),  # System user (events have no user_id)
+            seq=thread_message.seq,
             viewers=[],  # Empty - event consumers don't have viewer_store access
         ),
     )
 
-    logger.info(f"Posted event {event.id} to thread {thread.id} as message {thread_message.id}")
+    logger.info(f"Posted event {event.id} to thread {thread_id} as message {thread_message.id}")
 
 
 def _format_object_ref(event: Event, obj: Any) -> str:
@@ -1,17 +1,17 @@
 import logging
+from functools import partial
 from typing import Any
 
 from advanced_alchemy.exceptions import RepositoryError
 from litestar import Litestar, Request, Response
 from litestar.channels import ChannelsPlugin
-from litestar.channels.backends.psycopg import PsycoPgChannelsBackend
 from litestar.config.cors import CORSConfig
 from litestar.contrib.jinja import JinjaTemplateEngine
 from litestar.contrib.opentelemetry import OpenTelemetryConfig, OpenTelemetryPlugin
 from litestar.di import Provide
-from litestar.exceptions import InternalServerException
+from litestar.exceptions import InternalServerException, ServiceUnavailableException
+from litestar.exceptions.responses import create_exception_response
 from litestar.middleware.logging import LoggingMiddlewareConfig
-from litestar.middleware.session.base import ONE_DAY_IN_SECONDS
 from litestar.middleware.session.server_side import ServerSideSessionConfig
 from litestar.openapi.config import OpenAPIConfig
 from litestar.openapi.plugins import ScalarRenderPlugin
@@ -25,9 +25,11 @@ from litestar.security.session_auth import SessionAuth
 from litestar.stores.memory import MemoryStore
 from litestar.template.config import TemplateConfig
 from litestar_saq import SAQConfig, SAQPlugin
-from sqlalchemy.pool import AsyncAdaptedQueuePool
+from psycopg.errors import QueryCanceled
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
 
-from app.actions.deps import provide_action_registry
+from app.actions.deps import provide_action_registry, provide_read_action_deps
 from app.actions.routes import action_router
 from app.auth.routes import auth_router
 from app.base.models import BaseDBModel
@@ -47,12 +49,16 @@ from app.payments.routes import invoice_router
 from app.plugins import SqidSchemaPlugin
 from app.queue.config import queue_config
 from app.roster.routes import roster_router
+from app.sessions.cookie import REVOCATION_STORE, SESSION_MAX_AGE, ScopedCookieBackendConfig, parse_cookie_secrets
 from app.teams.routes import team_router
 from app.threads import thread_router
 from app.threads.websocket import thread_handler
 from app.users.routes import user_router
 from app.utils import providers
+from app.utils.admission import AdmissionControlMiddleware
+from app.utils.cancellation import CancelOnDisconnectMiddleware
 from app.utils.configure import ConfigProtocol
+from app.utils.connections import ManagedPsycoPgChannelsBackend, connection_manager
 from app.utils.exceptions import ApplicationError, exception_to_http_response
 from app.utils.logging import create_logging_config
 from app.utils.sqids import Sqid, sqid_dec_hook, sqid_enc_hook, sqid_type_predicate
@@ -68,6 +74,14 @@ def handle_options_disconnect(request: Request, exc: InternalServerException) ->
     raise exc
 
 
+def handle_query_canceled(request: Request, exc: OperationalError) -> Response:
+    """Answer statements stopped by their statement timeout with 503 instead of 500."""
+    if isinstance(exc.orig, QueryCanceled):
+        logger.warning("Query canceled", extra={"path": request.url.path, "detail": str(exc.orig)})
+        return create_exception_response(request, ServiceUnavailableException(detail="The query took too long"))
+    raise exc
+
+
 def _shutdown_otel_if_enabled(config: ConfigProtocol) -> None:
     """Lazily import and shutdown OpenTelemetry if enabled."""
     if config.OTEL_ENABLED:
@@ -99,8 +113,10 @@ def create_app(
     # ========================================================================
     stores = {
         "sessions": providers.create_postgres_session_store(),
-        "viewers": MemoryStore(),
+        "view_counts": MemoryStore(),
     } | (stores_overrides or {})
+    # Cookie sessions keep their revocation list alongside server-side sessions
+    stores.setdefault(REVOCATION_STORE, stores["sessions"])
 
     # ========================================================================
     # Session Auth
@@ -109,7 +125,7 @@ def create_app(
         "^/health",
         "^/auth/google/",
         "^/auth/magic-link/",
-        "^/auth/logout",
+        "^/auth/logout$",
         "^/webhooks/emails",
         "^/teams/invitations/accept",
         "^/schema",
@@ -118,14 +134,26 @@ def create_app(
     if config.IS_DEV:
         exclude_patterns.extend(["^/local-upload/", "^/local-download/"])
 
+    session_cookie_params: dict[str, Any] = {
+        "samesite": "lax",
+        "secure": not config.IS_DEV,
+        "httponly": True,
+        "max_age": SESSION_MAX_AGE,
+        "domain": (config.SESSION_COOKIE_DOMAIN if hasattr(config, "SESSION_COOKIE_DOMAIN") else None),
+    }
+    session_backend_config: ServerSideSessionConfig | ScopedCookieBackendConfig
+    if config.SESSION_BACKEND == "cookie":
+        current_secret, *previous_secrets = parse_cookie_secrets(config.SESSION_COOKIE_SECRETS)
+        session_backend_config = ScopedCookieBackendConfig(
+            secret=current_secret,
+            previous_secrets=previous_secrets,
+            **session_cookie_params,
+        )
+    else:
+        session_backend_config = ServerSideSessionConfig(**session_cookie_params)
+
     session_auth = SessionAuth[int, Any](
-        session_backend_config=ServerSideSessionConfig(
-            samesite="lax",
-            secure=not config.IS_DEV,
-            httponly=True,
-            max_age=ONE_DAY_IN_SECONDS * 14,
-            domain=(config.SESSION_COOKIE_DOMAIN if hasattr(config, "SESSION_COOKIE_DOMAIN") else None),
-        ),
+        session_backend_config=session_backend_config,
         retrieve_user_handler=lambda session, conn: session.get("user_id"),
         exclude=exclude_patterns,
     )
@@ -141,17 +169,24 @@ def create_app(
 
     dependencies = {
         "transaction": Provide(providers.provide_transaction),
+        "read_transaction": Provide(providers.provide_read_transaction),
+        "socket_transactions": Provide(providers.provide_socket_transactions, sync_to_thread=False),
         "http_client": Provide(providers.provide_http, sync_to_thread=False),
+        "thread_hub": Provide(providers.provide_thread_hub, sync_to_thread=False),
+        "replay_buffer": Provide(providers.provide_replay_buffer, sync_to_thread=False),
+        "read_receipts": Provide(providers.provide_read_receipts, sync_to_thread=False),
         "config": Provide(lambda: config, sync_to_thread=False),
         "s3_client": Provide(_provide_s3_client, sync_to_thread=False),
         "openai_client": Provide(_provide_openai_client, sync_to_thread=False),
         "email_client": Provide(provide_email_client, sync_to_thread=False),
         "email_service": Provide(providers.provide_email_service, sync_to_thread=False),
         "action_registry": Provide(provide_action_registry, sync_to_thread=False),
+        "read_action_deps": Provide(provide_read_action_deps, sync_to_thread=False),
         "object_registry": Provide(providers.provide_object_registry, sync_to_thread=False),
         "team_id": Provide(providers.provide_team_id, sync_to_thread=False),
         "campaign_id": Provide(providers.provide_campaign_id, sync_to_thread=False),
         "viewer_store": Provide(providers.provide_viewer_store, sync_to_thread=False),
+        "presence_broadcaster": Provide(providers.provide_presence_broadcaster, sync_to_thread=False),
     } | (dependencies_overrides or {})
 
     # ========================================================================
@@ -162,15 +197,20 @@ def create_app(
             config=SQLAlchemyAsyncConfig(
                 connection_string=config.ASYNC_DATABASE_URL,
                 metadata=BaseDBModel.metadata,
+                # Connections are opened through the process-wide connection budget
+                create_engine_callable=partial(
+                    create_async_engine,
+                    async_creator=connection_manager.async_creator(
+                        "app",
+                        config.ASYNC_DATABASE_URL,
+                        connect_timeout=10,
+                        application_name="manageros-ecs",
+                    ),
+                ),
                 engine_config=EngineConfig(
-                    poolclass=AsyncAdaptedQueuePool,
-                    pool_size=0,  # Zero persistent connections for Aurora scale-to-zero
-                    max_overflow=20,  # Create up to 20 temporary connections on-demand
+                    # Warm while serving traffic, closed when idle for Aurora scale-to-zero
+                    **connection_manager.pool_options("app"),
                     pool_timeout=30,
-                    connect_args={
-                        "connect_timeout": 10,
-                        "application_name": "manageros-ecs",
-                    },
                 ),
                 session_config=AsyncSessionConfig(
                     expire_on_commit=False,
@@ -188,7 +228,7 @@ def create_app(
             )
         ),
         ChannelsPlugin(
-            backend=PsycoPgChannelsBackend(config.ADMIN_DB_URL),
+            backend=ManagedPsycoPgChannelsBackend(config.ADMIN_DB_URL),
             arbitrary_channels_allowed=True,
         ),
         SqidSchemaPlugin(),
@@ -275,7 +315,9 @@ def create_app(
         ],
         on_app_init=[session_auth.on_app_init],
         middleware=[
+            CancelOnDisconnectMiddleware(),
             session_auth.middleware,
+            AdmissionControlMiddleware(),
             LoggingMiddlewareConfig(
                 exclude=["/health", "/db_health"],  # Skip health check endpoints
                 request_log_fields=["method", "path", "query"],
@@ -287,6 +329,7 @@ def create_app(
             ApplicationError: exception_to_http_response,
             RepositoryError: exception_to_http_response,
             InternalServerException: handle_options_disconnect,
+            OperationalError: handle_query_canceled,
         },
         stores=stores,
         dependencies=dependencies,
@@ -18,6 +18,7 @@ from app.media.schemas import (
     RegisterMediaSchema,
     media_to_response_schema,
 )
+from app.threads.services import get_thread_unread_info
 from app.utils.db import get_or_404
 from app.utils.sqids import Sqid
 
@@ -89,33 +90,18 @@ async def register_media(
 async def get_media(
     id: Sqid,
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     s3_client: S3Dep,
     action_registry: ActionRegistry,
 ) -> MediaResponseSchema:
     """Get a media item by SQID."""
-    from sqlalchemy.orm import joinedload, selectinload
-
-    from app.threads.models import Thread
-
-    media = await get_or_404(
-        transaction,
-        Media,
-        id,
-        load_options=[
-            joinedload(Media.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            )
-        ],
-    )
+    media = await get_or_404(read_transaction, Media, id)
 
     # Compute actions for this media
     action_group = action_registry.get_class(ActionGroupType.MediaActions)
     actions = action_group.get_available_actions(obj=media)
 
-    # Convert thread to unread info using the mixin method
-    thread_info = media.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(read_transaction, media, request.user)
 
     return media_to_response_schema(media, s3_client, actions, thread_info)
 
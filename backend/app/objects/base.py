@@ -1,28 +1,48 @@
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
+from enum import Enum
 from typing import TYPE_CHECKING, Any, ClassVar
 
 import sqlalchemy as sa
-from sqlalchemy import Select, func, inspect, or_, select
+from sqlalchemy import Select, and_, func, inspect, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.sql.elements import ColumnElement
 
 from app.actions.registry import ActionRegistry
 from app.base.models import BaseDBModel
 from app.base.registry import BaseRegistry
-from app.objects.enums import ObjectTypes
+from app.base.threadable_mixin import ThreadableMixin
+from app.objects.enums import FieldType, ObjectTypes
 from app.objects.schemas import (
+    BoardColumn,
     ColumnDefinitionSchema,
+    FacetResult,
+    FacetValueCount,
+    ObjectBoardRequest,
     ObjectColumn,
+    ObjectFacetRequest,
     ObjectFieldDTO,
     ObjectListRequest,
+    ObjectListResponse,
     ObjectListSchema,
+    SortDefinition,
     SortDirection,
 )
-from app.objects.services import apply_filter, get_filter_by_field_type
+from app.objects.services import (
+    apply_filter,
+    build_filter_condition,
+    decode_board_cursor,
+    encode_board_cursor,
+    get_filter_by_field_type,
+)
+from app.threads.services import get_thread_unread_infos
 from app.utils.sqids import sqid_encode
+from app.utils.textenum import TextEnum
 
 if TYPE_CHECKING:
+    from app.actions.deps import ActionDeps
     from app.actions.enums import ActionGroupType
 
 
@@ -82,14 +102,31 @@ class BaseObject[O: BaseDBModel](ABC):
         ]
 
     @classmethod
-    def get_top_level_actions(cls) -> list["Any"]:
+    def get_top_level_actions(cls, deps: "ActionDeps | None" = None) -> list["Any"]:
         if not cls.top_level_action_group:
             return []
         action_group = ActionRegistry().get_class(cls.top_level_action_group)
-        return action_group.get_available_actions()
+        return action_group.get_available_actions(deps=deps)
+
+    @classmethod
+    async def get_unread_counts(
+        cls, session: AsyncSession, objects: Sequence[BaseDBModel], user_id: int | None
+    ) -> dict[int, int] | None:
+        """Unread thread messages per object in one query, or None if the type has no threads."""
+        model = cls.model()
+        if user_id is None or not issubclass(model, ThreadableMixin):
+            return None
+        object_ids = [obj.id for obj in objects]
+        thread_infos = await get_thread_unread_infos(session, model.threadable_type(), object_ids, user_id)
+        return {
+            object_id: thread_infos[object_id].unread_count if object_id in thread_infos else 0
+            for object_id in object_ids
+        }
 
     @classmethod
-    def to_list_schema(cls, obj: O) -> ObjectListSchema:
+    def to_list_schema(
+        cls, obj: O, unread_count: int | None = None, deps: "ActionDeps | None" = None
+    ) -> ObjectListSchema:
         # Generate fields from column_definitions
         fields: list[ObjectFieldDTO] = []
 
@@ -114,7 +151,7 @@ class BaseObject[O: BaseDBModel](ABC):
         actions = []
         if cls.action_group:
             action_group = ActionRegistry().get_class(cls.action_group)
-            actions = action_group.get_available_actions(obj=obj)
+            actions = action_group.get_available_actions(obj=obj, deps=deps)
 
         object_id = sqid_encode(obj.id)
         return ObjectListSchema(
@@ -128,6 +165,7 @@ class BaseObject[O: BaseDBModel](ABC):
             actions=actions,
             fields=fields,
             link=f"/{cls.object_type}/{object_id}",
+            unread_count=unread_count,
         )
 
     @classmethod
@@ -189,7 +227,7 @@ class BaseObject[O: BaseDBModel](ABC):
         return obj
 
     @classmethod
-    async def get_list(cls, session: AsyncSession, request: ObjectListRequest) -> tuple[Sequence[BaseDBModel], int]:
+    async def get_list(cls, session: AsyncSession, request: ObjectListRequest) -> tuple[Sequence[O], int]:
         """Get list of objects with filtering and pagination.
 
         Scope and soft-delete filtering are applied automatically via SQLAlchemy events.
@@ -207,6 +245,225 @@ class BaseObject[O: BaseDBModel](ABC):
 
         return objects, total
 
+    @classmethod
+    async def get_list_response(
+        cls,
+        session: AsyncSession,
+        request: ObjectListRequest,
+        user_id: int | None = None,
+        deps: "ActionDeps | None" = None,
+    ) -> ObjectListResponse:
+        """Get a page of objects as list schemas, with the total and top-level actions.
+
+        With a user_id, threadable objects include the user's unread counts. Available
+        actions are checked with deps, e.g. bound to the read transaction.
+        """
+        objects, total = await cls.get_list(session, request)
+        unread_counts = await cls.get_unread_counts(session, objects, user_id)
+        return ObjectListResponse(
+            objects=[
+                cls.to_list_schema(obj, unread_counts[obj.id] if unread_counts is not None else None, deps)
+                for obj in objects
+            ],
+            total=total,
+            limit=request.limit,
+            offset=request.offset,
+            actions=cls.get_top_level_actions(deps),
+        )
+
+    @classmethod
+    async def get_board(
+        cls,
+        session: AsyncSession,
+        request: ObjectBoardRequest,
+        user_id: int | None = None,
+        deps: "ActionDeps | None" = None,
+    ) -> list[BoardColumn]:
+        """Get the top objects per state column for a kanban board in a single query.
+
+        Objects are ranked within each state using row_number() OVER (PARTITION BY state),
+        alongside a windowed count for the column total. A cursor restricts the query to
+        one column and skips the objects already loaded. With a user_id, threadable objects
+        include the user's unread counts (one more query for the whole board).
+
+        Scope and soft-delete filtering are applied automatically via SQLAlchemy events.
+        """
+        model = cls.model()
+        # StateMachineMixin models store their state in a TextEnum column named "state"
+        state_column = model.__table__.c.get("state")
+        if state_column is None or not isinstance(state_column.type, TextEnum):
+            raise ValueError(f"{cls.object_type} does not have a state machine")
+        state_enum: type[Enum] = state_column.type.enum_class
+
+        states = list(state_enum)
+        offset = 0
+        if request.cursor:
+            state_value, offset = decode_board_cursor(request.cursor)
+            try:
+                states = [state_enum(state_value)]
+            except ValueError as e:
+                raise ValueError(f"Invalid board cursor: {request.cursor}") from e
+
+        order_by = cls.get_sort_clauses(model, request.sorts) or [model.created_at.desc()]
+        order_by.append(model.id.desc())  # Stable ranking for cursors
+        ranked_query = select(
+            model.id,
+            func.row_number().over(partition_by=state_column, order_by=order_by).label("rank"),
+            func.count().over(partition_by=state_column).label("total"),
+        ).where(state_column.in_(states))
+        search_filter = cls.create_search_filter(request.search)
+        if search_filter is not None:
+            ranked_query = ranked_query.where(search_filter)
+        for filter_def in request.filters:
+            ranked_query = apply_filter(ranked_query, model, filter_def)
+        ranked = ranked_query.subquery()
+
+        stmt = (
+            select(model, ranked.c.total)
+            .join(ranked, model.id == ranked.c.id)
+            .where(ranked.c.rank > offset, ranked.c.rank <= offset + request.limit)
+            .order_by(ranked.c.rank)
+            .options(*cls.load_options)
+        )
+        rows = (await session.execute(stmt)).unique().all()
+        unread_counts = await cls.get_unread_counts(session, [obj for obj, _ in rows], user_id)
+
+        objects_by_state: dict[Any, list[ObjectListSchema]] = {state: [] for state in states}
+        totals: dict[Any, int] = dict.fromkeys(states, 0)
+        for obj, total in rows:
+            unread_count = unread_counts[obj.id] if unread_counts is not None else None
+            objects_by_state[obj.state].append(cls.to_list_schema(obj, unread_count, deps))
+            totals[obj.state] = total
+
+        columns = []
+        for state in states:
+            loaded = offset + len(objects_by_state[state])
+            columns.append(
+                BoardColumn(
+                    state=state.value,
+                    objects=objects_by_state[state],
+                    total=totals[state],
+                    next_cursor=encode_board_cursor(state.value, loaded) if loaded < totals[state] else None,
+                )
+            )
+        return columns
+
+    @classmethod
+    async def get_facet_counts(
+        cls, session: AsyncSession, request: ObjectFacetRequest
+    ) -> tuple[list[FacetResult], int]:
+        """Get value counts for several facet columns in a single GROUPING SETS query.
+
+        Filters on non-facet columns (and search) go in the WHERE clause. Filters on
+        facet columns become per-facet FILTER clauses, so each facet is counted with
+        every filter except its own. An empty grouping set gives the overall total.
+
+        Scope and soft-delete filtering are applied automatically via SQLAlchemy events.
+        """
+        model = cls.model()
+        facet_defs = [cls._get_facet_column(key) for key in dict.fromkeys(request.facets)]
+        facet_keys = {col_def.key for col_def in facet_defs}
+
+        base_conditions = []
+        facet_conditions: dict[str, list[ColumnElement[bool]]] = {}
+        for filter_def in request.filters:
+            condition = build_filter_condition(model, filter_def)
+            if condition is None:
+                continue
+            if filter_def.column in facet_keys:
+                facet_conditions.setdefault(filter_def.column, []).append(condition)
+            else:
+                base_conditions.append(condition)
+
+        search_filter = cls.create_search_filter(request.search)
+        if search_filter is not None:
+            base_conditions.append(search_filter)
+
+        def _count_excluding(key: str | None):
+            others = [cond for other, conds in facet_conditions.items() if other != key for cond in conds]
+            return func.count().filter(and_(*others)) if others else func.count()
+
+        query = select().select_from(model)
+        grouping_sets = []
+        label_indexes: set[int] = set()
+        for index, col_def in enumerate(facet_defs):
+            column = getattr(model, col_def.key)
+            group = [column]
+            query = query.add_columns(
+                column.label(f"value_{index}"),
+                func.grouping(column).label(f"grouping_{index}"),
+                _count_excluding(col_def.key).label(f"count_{index}"),
+            )
+
+            # Object facets also group by the related display column (e.g., brand name)
+            if col_def.type == FieldType.Object and col_def.query_relationship and col_def.query_column:
+                relationship_attr = getattr(model, col_def.query_relationship)
+                related = aliased(relationship_attr.property.mapper.class_)
+                query = query.outerjoin(relationship_attr.of_type(related))
+                label_column = getattr(related, col_def.query_column)
+                query = query.add_columns(label_column.label(f"label_{index}"))
+                group.append(label_column)
+                label_indexes.add(index)
+
+            grouping_sets.append(sa.tuple_(*group))
+
+        # Empty grouping set: one extra row with the total across all filters
+        grouping_sets.append(sa.tuple_())
+        query = query.add_columns(_count_excluding(None).label("total")).where(*base_conditions)
+        query = query.group_by(func.grouping_sets(*grouping_sets))
+
+        result = await session.execute(query)
+
+        total = 0
+        values_by_key: dict[str, list[FacetValueCount]] = {col_def.key: [] for col_def in facet_defs}
+        for row in result.mappings():
+            # GROUPING(col) is 0 only in the grouping set that contains col
+            index = next((i for i in range(len(facet_defs)) if row[f"grouping_{i}"] == 0), None)
+            if index is None:
+                total = row["total"]
+                continue
+
+            col_def = facet_defs[index]
+            count = row[f"count_{index}"]
+            if count:
+                values_by_key[col_def.key].append(
+                    FacetValueCount(
+                        value=cls._facet_value(col_def, row[f"value_{index}"]),
+                        count=count,
+                        label=row[f"label_{index}"] if index in label_indexes else None,
+                    )
+                )
+
+        facets = [
+            FacetResult(
+                column=col_def.key,
+                values=sorted(values_by_key[col_def.key], key=lambda value: value.count, reverse=True),
+            )
+            for col_def in facet_defs
+        ]
+        return facets, total
+
+    @classmethod
+    def _get_facet_column(cls, field_name: str) -> ObjectColumn:
+        """Get a facetable column definition (Enum, Bool or Object backed by a model column)."""
+        col_def = cls.get_field_metadata(field_name)
+        if col_def is None:
+            raise ValueError(f"Field '{field_name}' not found in {cls.object_type} column definitions")
+        if col_def.type not in (FieldType.Enum, FieldType.Bool, FieldType.Object):
+            raise ValueError(f"Field '{field_name}' of type {col_def.type} cannot be used as a facet")
+        if getattr(cls.model(), col_def.key, None) is None:
+            raise ValueError(f"Field '{field_name}' is not a column on {cls.model().__name__}")
+        return col_def
+
+    @staticmethod
+    def _facet_value(col_def: ObjectColumn, value: Any) -> str | bool | None:
+        """Convert a raw grouped value into its API representation."""
+        if value is None or isinstance(value, bool):
+            return value
+        if col_def.type == FieldType.Object:
+            return sqid_encode(value)
+        return str(value)
+
     @classmethod
     def apply_request_to_query(
         cls, query: Select, model_class: type[BaseDBModel], request: ObjectListRequest
@@ -216,16 +473,23 @@ class BaseObject[O: BaseDBModel](ABC):
                 query = apply_filter(query, model_class, filter_def)
 
         if request.sorts:
-            for sort_def in request.sorts:
-                column = getattr(model_class, sort_def.column, None)
-                if column:
-                    if sort_def.direction == SortDirection.sort_asc:
-                        query = query.order_by(column.asc())
-                    else:
-                        query = query.order_by(column.desc())
+            query = query.order_by(*cls.get_sort_clauses(model_class, request.sorts))
 
         return query
 
+    @staticmethod
+    def get_sort_clauses(model_class: type[BaseDBModel], sorts: list[SortDefinition]) -> list[ColumnElement]:
+        """Translate sort definitions into ORDER BY clauses, skipping unknown columns."""
+        clauses = []
+        for sort_def in sorts:
+            column = getattr(model_class, sort_def.column, None)
+            if column:
+                if sort_def.direction == SortDirection.sort_asc:
+                    clauses.append(column.asc())
+                else:
+                    clauses.append(column.desc())
+        return clauses
+
     @classmethod
     def get_field_metadata(cls, field_name: str) -> ObjectColumn | None:
         """Get column definition metadata for a field.
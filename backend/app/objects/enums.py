@@ -101,6 +101,14 @@ class AggregationType(StrEnum):
     max = auto()
     min = auto()
     count_ = auto()  # Renamed to avoid shadowing str.count
+    count_distinct = auto()  # number of distinct values
+
+    # Distribution aggregations (percentile_cont, numerical fields only)
+    p50 = auto()  # median
+    p75 = auto()
+    p90 = auto()
+    p95 = auto()
+    p99 = auto()
 
     # Categorical aggregations
     mode = auto()  # most frequent value
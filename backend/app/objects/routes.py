@@ -1,16 +1,20 @@
 import logging
-from collections.abc import Sequence
 
-from litestar import Router, get, post
+from litestar import Request, Router, get, post
+from litestar.exceptions import ValidationException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.base.models import BaseDBModel
+from app.actions.deps import ActionDeps
 from app.objects.base import ObjectRegistry
 from app.objects.enums import ObjectTypes
 from app.objects.schemas import (
     CategoricalTimeSeriesData,
     NumericalDataPoint,
     NumericalTimeSeriesData,
+    ObjectBoardRequest,
+    ObjectBoardResponse,
+    ObjectFacetRequest,
+    ObjectFacetResponse,
     ObjectListRequest,
     ObjectListResponse,
     ObjectSchemaResponse,
@@ -20,9 +24,13 @@ from app.objects.schemas import (
 from app.objects.services import (
     determine_granularity,
     get_default_aggregation,
+    is_aggregation_supported,
     query_time_series_data,
     resolve_time_range,
 )
+from app.utils.admission import ADMISSION_CLASS_OPT
+from app.utils.configure import config
+from app.utils.db import STATEMENT_TIMEOUT_OPT
 from app.utils.discovery import discover_and_import
 
 logger = logging.getLogger(__name__)
@@ -32,7 +40,7 @@ logger = logging.getLogger(__name__)
 discover_and_import(["objects.py", "objects/**/*.py"], base_path="app")
 
 
-@get("/{object_type:str}/schema")
+@get("/{object_type:str}/schema", opt={ADMISSION_CLASS_OPT: "light"})
 async def get_object_schema(
     object_type: ObjectTypes,
     object_registry: ObjectRegistry,
@@ -43,35 +51,59 @@ async def get_object_schema(
     return ObjectSchemaResponse(columns=object_service.get_column_schemas())
 
 
-@post("/{object_type:str}", operation_id="list_objects")
+@post("/{object_type:str}", operation_id="list_objects", opt={ADMISSION_CLASS_OPT: "dashboard"})
 async def list_objects(
     object_type: ObjectTypes,
     data: ObjectListRequest,
-    transaction: AsyncSession,
+    request: Request,
+    read_transaction: AsyncSession,
     object_registry: ObjectRegistry,
+    read_action_deps: ActionDeps,
 ) -> ObjectListResponse:
     logger.info(f"data:{data}")
     object_service = object_registry.get_class(object_type)
-    objects: Sequence[BaseDBModel]
-    objects, total = await object_service.get_list(transaction, data)
-
-    # Convert objects to schemas
-    object_schemas = [object_service.to_list_schema(obj) for obj in objects]
-
-    return ObjectListResponse(
-        objects=object_schemas,
-        total=total,
-        limit=data.limit,
-        offset=data.offset,
-        actions=object_service.get_top_level_actions(),
-    )
+    return await object_service.get_list_response(read_transaction, data, user_id=request.user, deps=read_action_deps)
+
+
+@post("/{object_type:str}/facets", operation_id="get_object_facets")
+async def get_object_facets(
+    object_type: ObjectTypes,
+    data: ObjectFacetRequest,
+    read_transaction: AsyncSession,
+    object_registry: ObjectRegistry,
+) -> ObjectFacetResponse:
+    """Get value counts for filter sidebar facets under the current filters."""
+    object_service = object_registry.get_class(object_type)
+    try:
+        facets, total = await object_service.get_facet_counts(read_transaction, data)
+    except ValueError as e:
+        raise ValidationException(str(e)) from e
+    return ObjectFacetResponse(facets=facets, total=total)
+
+
+@post("/{object_type:str}/board", operation_id="get_object_board")
+async def get_object_board(
+    object_type: ObjectTypes,
+    data: ObjectBoardRequest,
+    request: Request,
+    read_transaction: AsyncSession,
+    object_registry: ObjectRegistry,
+    read_action_deps: ActionDeps,
+) -> ObjectBoardResponse:
+    """Get a kanban board: the top objects of every state column, with column totals."""
+    object_service = object_registry.get_class(object_type)
+    try:
+        columns = await object_service.get_board(read_transaction, data, user_id=request.user, deps=read_action_deps)
+    except ValueError as e:
+        raise ValidationException(str(e)) from e
+    return ObjectBoardResponse(columns=columns, actions=object_service.get_top_level_actions(read_action_deps))
 
 
-@post("/{object_type:str}/data", operation_id="get_time_series_data")
+@post("/{object_type:str}/data", operation_id="get_time_series_data", opt={ADMISSION_CLASS_OPT: "dashboard"})
 async def get_time_series_data(
     object_type: ObjectTypes,
     data: TimeSeriesDataRequest,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     object_registry: ObjectRegistry,
 ) -> TimeSeriesDataResponse:
     logger.info(f"Time series request for {object_type}: {data}")
@@ -96,10 +128,12 @@ async def get_time_series_data(
 
     # Determine aggregation type
     aggregation = data.aggregation or get_default_aggregation(field_type)
+    if not is_aggregation_supported(aggregation, field_type):
+        raise ValidationException(f"Aggregation {aggregation} is not supported for {field_type} field {data.field}")
 
     # Query data
     data_points, total_records = await query_time_series_data(
-        session=transaction,
+        session=read_transaction,
         model_class=object_service.model(),
         field_name=data.field,
         field_type=field_type,
@@ -142,7 +176,10 @@ object_router = Router(
     route_handlers=[
         get_object_schema,
         list_objects,
+        get_object_facets,
+        get_object_board,
         get_time_series_data,
     ],
     tags=["objects"],
+    opt={STATEMENT_TIMEOUT_OPT: config.DB_REPORT_STATEMENT_TIMEOUT_MS, ADMISSION_CLASS_OPT: "heavy"},
 )
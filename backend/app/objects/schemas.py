@@ -287,6 +287,8 @@ class ObjectListSchema(BaseSchema):
     actions: list[ActionDTO] = []
     fields: list[ObjectFieldDTO] = []
     link: str | None = None
+    # Unread thread messages of the current user; None for object types without threads
+    unread_count: int | None = None
 
 
 class ObjectListRequest(BaseSchema):
@@ -316,6 +318,78 @@ class ObjectSchemaResponse(BaseSchema):
     columns: list[ColumnDefinitionSchema]
 
 
+# ============================================================================
+# Facet Schemas
+# ============================================================================
+
+
+class ObjectFacetRequest(ObjectListRequest):
+    """Request schema for facet counts.
+
+    Filters and search are applied as for a list request (paging and sorts are ignored).
+    Each facet ignores filters on its own column, so every option keeps a count.
+    """
+
+    facets: list[str] = []  # Enum, Bool or Object column keys
+
+
+class FacetValueCount(BaseSchema):
+    """Number of objects with a given value for a facet column."""
+
+    value: str | bool | None  # Enum value, bool, or SQID for Object columns
+    count: int
+    label: str | None = None  # Display label for Object columns (e.g., brand name)
+
+
+class FacetResult(BaseSchema):
+    """Value counts for a single facet column, most frequent first."""
+
+    column: str
+    values: list[FacetValueCount]
+
+
+class ObjectFacetResponse(BaseSchema):
+    """Response schema for facet counts."""
+
+    facets: list[FacetResult]
+    total: int  # Objects matching all filters
+
+
+# ============================================================================
+# Board Schemas
+# ============================================================================
+
+
+class ObjectBoardRequest(BaseSchema):
+    """Request schema for a kanban board grouped by state.
+
+    Without a cursor, returns the first `limit` objects of every state column.
+    With a cursor (from a column's next_cursor), returns the next page of that column only.
+    """
+
+    limit: int = 20  # Objects per column
+    filters: list[FilterDefinition] = []
+    sorts: list[SortDefinition] = []
+    search: str | None = None
+    cursor: str | None = None
+
+
+class BoardColumn(BaseSchema):
+    """A single state column of a kanban board."""
+
+    state: str  # State enum value
+    objects: list[ObjectListSchema]
+    total: int  # Objects in this state matching the filters
+    next_cursor: str | None = None  # None when the column is exhausted
+
+
+class ObjectBoardResponse(BaseSchema):
+    """Response schema for a kanban board."""
+
+    columns: list[BoardColumn]
+    actions: list[ActionDTO] = []
+
+
 # ============================================================================
 # Time Series Schemas
 # ============================================================================
@@ -1,9 +1,12 @@
+import base64
 import logging
 from datetime import UTC, datetime, timedelta
 from typing import assert_never
 
+import msgspec
 from sqlalchemy import Select, and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
 from app.base.models import BaseDBModel
 from app.objects.enums import (
@@ -32,21 +35,26 @@ from app.utils.tracing import trace_operation
 logger = logging.getLogger(__name__)
 
 
-def apply_filter(query: Select, model_class: type[BaseDBModel], filter_def: FilterDefinition) -> Select:
+def build_filter_condition(model_class: type[BaseDBModel], filter_def: FilterDefinition) -> ColumnElement[bool] | None:
+    """Translate a filter definition into a WHERE predicate.
+
+    Returns None when the filter doesn't constrain anything (unknown column,
+    open-ended range), so callers can compose predicates without a query.
+    """
     column = getattr(model_class, filter_def.column, None)
     if column is None:
-        return query
+        return None
 
     match filter_def:
         # ---------- Text ----------
         case TextFilterDefinition(operation="equals", value=v):
-            return query.where(column == v)
+            return column == v
         case TextFilterDefinition(operation="contains", value=v):
-            return query.where(column.ilike(f"%{v}%"))
+            return column.ilike(f"%{v}%")
         case TextFilterDefinition(operation="starts_with", value=v):
-            return query.where(column.ilike(f"{v}%"))
+            return column.ilike(f"{v}%")
         case TextFilterDefinition(operation="ends_with", value=v):
-            return query.where(column.ilike(f"%{v}"))
+            return column.ilike(f"%{v}")
 
         # ---------- Numeric Range ----------
         case RangeFilterDefinition(start=s, finish=e):
@@ -55,11 +63,11 @@ def apply_filter(query: Select, model_class: type[BaseDBModel], filter_def: Filt
                 conds.append(column >= s)
             if e is not None:
                 conds.append(column <= e)
-            return query.where(and_(*conds)) if conds else query
+            return and_(*conds) if conds else None
 
         # ---------- Boolean ----------
         case BooleanFilterDefinition(value=b):
-            return query.where(column.is_(b))
+            return column.is_(b)
 
         # ---------- Date/Time ----------
         case DateFilterDefinition(start=s, finish=e):
@@ -68,18 +76,18 @@ def apply_filter(query: Select, model_class: type[BaseDBModel], filter_def: Filt
                 conds.append(column >= s)
             if e is not None:
                 conds.append(column <= e)
-            return query.where(and_(*conds)) if conds else query
+            return and_(*conds) if conds else None
 
         # ---------- Enum ----------
         case EnumFilterDefinition(values=vals):
-            return query.where(column.in_(vals))
+            return column.in_(vals)
 
         # ---------- Object Reference ----------
         case ObjectFilterDefinition(values=sqids):
             # Decode SQIDs to integer IDs
             try:
                 decoded_ids = [sqid_decode(sqid) for sqid in sqids]
-                return query.where(column.in_(decoded_ids))
+                return column.in_(decoded_ids)
             except ValueError as e:
                 # Invalid SQID - return query that matches nothing
                 raise ValueError(f"Invalid SQID in object filter: {e}") from e
@@ -88,6 +96,27 @@ def apply_filter(query: Select, model_class: type[BaseDBModel], filter_def: Filt
             raise ValueError(f"Unknown filter definition type: {type(filter_def)}")
 
 
+def encode_board_cursor(state: str, offset: int) -> str:
+    """Encode the position of the next page within a board column as an opaque token."""
+    return base64.urlsafe_b64encode(msgspec.json.encode([state, offset])).decode()
+
+
+def decode_board_cursor(cursor: str) -> tuple[str, int]:
+    """Decode a board cursor into (state value, offset)."""
+    try:
+        state, offset = msgspec.json.decode(base64.urlsafe_b64decode(cursor), type=tuple[str, int])
+    except (ValueError, msgspec.DecodeError) as e:
+        raise ValueError(f"Invalid board cursor: {cursor}") from e
+    if offset < 0:
+        raise ValueError(f"Invalid board cursor: {cursor}")
+    return state, offset
+
+
+def apply_filter(query: Select, model_class: type[BaseDBModel], filter_def: FilterDefinition) -> Select:
+    condition = build_filter_condition(model_class, filter_def)
+    return query.where(condition) if condition is not None else query
+
+
 def get_filter_by_field_type(field_type: FieldType) -> FilterType:
     """Get default available filters for a field type."""
     match field_type:
@@ -343,6 +372,40 @@ def is_categorical_field(field_type: FieldType) -> bool:
     return field_type in (FieldType.String, FieldType.Enum, FieldType.Bool)
 
 
+def get_percentile_fraction(aggregation: AggregationType) -> float | None:
+    """Get the percentile_cont fraction for a percentile aggregation, or None for other aggregations."""
+    match aggregation:
+        case AggregationType.p50:
+            return 0.5
+        case AggregationType.p75:
+            return 0.75
+        case AggregationType.p90:
+            return 0.9
+        case AggregationType.p95:
+            return 0.95
+        case AggregationType.p99:
+            return 0.99
+        case _:
+            return None
+
+
+def is_scalar_aggregation(aggregation: AggregationType) -> bool:
+    """Check if an aggregation reduces each bucket to a single value regardless of field type.
+
+    Distinct counts and percentiles always produce numerical series, even for
+    categorical fields (e.g. number of distinct brand names per month).
+    """
+    return aggregation == AggregationType.count_distinct or get_percentile_fraction(aggregation) is not None
+
+
+def is_aggregation_supported(aggregation: AggregationType, field_type: FieldType) -> bool:
+    """Check if an aggregation can be computed over a field type.
+
+    Percentiles need numerical values; distinct counts work on any field.
+    """
+    return get_percentile_fraction(aggregation) is None or is_numerical_field(field_type)
+
+
 def get_series_interval(granularity: Granularity) -> str:
     """Get PostgreSQL interval string for generate_series."""
     match granularity:
@@ -442,6 +505,10 @@ async def query_time_series_data(
         if column is None:
             raise ValueError(f"Column {field_name} not found on {model_class.__name__}")
 
+    percentile_fraction = get_percentile_fraction(aggregation)
+    if not is_aggregation_supported(aggregation, field_type):
+        raise ValueError(f"Aggregation {aggregation} requires a numerical field, got {field_type}")
+
     # Get timestamp column (default to created_at)
     timestamp_column = model_class.created_at
 
@@ -497,7 +564,9 @@ async def query_time_series_data(
     ).subquery()
 
     # Handle categorical vs numerical aggregation
-    if is_categorical_field(field_type) or aggregation == AggregationType.mode:
+    if aggregation == AggregationType.mode or (
+        is_categorical_field(field_type) and not is_scalar_aggregation(aggregation)
+    ):
         # For categorical: GROUP BY time_bucket and field value, then count
         # Build aggregation directly from the filtered table
         time_bucket_expr = func.date_trunc(trunc_format, timestamp_column)
@@ -578,8 +647,13 @@ async def query_time_series_data(
                 agg_func = func.max(column)
             case AggregationType.min:
                 agg_func = func.min(column)
-            case AggregationType.count:
+            case AggregationType.count_:
                 agg_func = func.count(column)
+            case AggregationType.count_distinct:
+                agg_func = func.count(column.distinct())
+            case _ if percentile_fraction is not None:
+                # Exact, computed in the same scan as the bucket grouping
+                agg_func = func.percentile_cont(percentile_fraction).within_group(column.asc())
             case _:
                 agg_func = func.sum(column)  # default fallback
 
@@ -609,7 +683,8 @@ async def query_time_series_data(
 
         # Determine the default value for COALESCE based on field type
         # For datetime/date fields, use NULL; for numeric fields, use 0
-        if field_type in (FieldType.Date, FieldType.Datetime):
+        # Percentiles of empty buckets are undefined, so they stay NULL as well
+        if field_type in (FieldType.Date, FieldType.Datetime) or percentile_fraction is not None:
             # For timestamp aggregations, we can't use 0, so use NULL
             default_agg_value = None
         else:
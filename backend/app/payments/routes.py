@@ -11,7 +11,7 @@ from app.objects.enums import ObjectTypes
 from app.payments.models import Invoice
 from app.payments.objects import InvoiceObject
 from app.payments.schemas import InvoiceSchema, InvoiceUpdateSchema
-from app.threads.models import Thread
+from app.threads.services import get_thread_unread_info
 from app.utils.db import get_or_404, update_model
 from app.utils.sqids import Sqid
 
@@ -22,30 +22,17 @@ ObjectRegistry().register(ObjectTypes.Invoices, InvoiceObject)
 async def get_invoice(
     id: Sqid,
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     action_registry: ActionRegistry,
 ) -> InvoiceSchema:
     """Get an invoice by SQID."""
-    from sqlalchemy.orm import joinedload, selectinload
-
-    invoice = await get_or_404(
-        transaction,
-        Invoice,
-        id,
-        load_options=[
-            joinedload(Invoice.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            )
-        ],
-    )
+    invoice = await get_or_404(read_transaction, Invoice, id)
 
     # Compute actions for this invoice
     action_group = action_registry.get_class(ActionGroupType.InvoiceActions)
     actions = action_group.get_available_actions(obj=invoice)
 
-    # Convert thread to unread info using the mixin method
-    thread_info = invoice.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(read_transaction, invoice, request.user)
 
     return InvoiceSchema(
         id=invoice.id,
@@ -20,6 +20,7 @@ from saq.types import ReceivesContext
 from app.queue.registry import get_registry
 from app.queue.types import AppContext
 from app.utils.configure import config
+from app.utils.connections import connection_manager
 from app.utils.discovery import discover_and_import
 
 # Auto-discover all task files to trigger decorator registration
@@ -35,22 +36,21 @@ async def queue_startup(ctx: AppContext) -> None:
     """
     from sqlalchemy import event
     from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-    from sqlalchemy.pool import AsyncAdaptedQueuePool
 
     from app.client.openai_client import provide_openai_client
     from app.client.s3_client import provide_s3_client
 
-    # Create database session factory with zero persistent connections for Aurora scale-to-zero
+    # Create database session factory; idle connections are closed for Aurora scale-to-zero
     engine = create_async_engine(
         config.ASYNC_DATABASE_URL,
-        poolclass=AsyncAdaptedQueuePool,
-        pool_size=0,  # Zero persistent connections
-        max_overflow=10,  # Create up to 10 temporary connections on-demand
+        **connection_manager.pool_options("tasks"),
         pool_timeout=30,
-        connect_args={
-            "connect_timeout": 10,
-            "application_name": "manageros-worker",
-        },
+        async_creator=connection_manager.async_creator(
+            "tasks",
+            config.ASYNC_DATABASE_URL,
+            connect_timeout=10,
+            application_name="manageros-worker",
+        ),
     )
 
     # Set system mode for all worker connections to bypass RLS
@@ -90,7 +90,8 @@ def get_queue_config() -> list[QueueConfig]:
     return [
         QueueConfig(
             name="default",
-            dsn=config.ADMIN_DB_URL,
+            # Broker connections are opened through the process-wide connection budget
+            broker_instance=connection_manager.broker_pool("queue", config.ADMIN_DB_URL),
             # Tasks are automatically collected from @task decorators
             tasks=registry.get_all_tasks(),
             # Scheduled tasks are automatically collected from @scheduled_task decorators
@@ -104,7 +105,8 @@ def get_queue_config() -> list[QueueConfig]:
             # Connection pool settings for Postgres - zero persistent for Aurora scale-to-zero
             broker_options={
                 "min_size": 0,  # Zero persistent connections - create on-demand, close when idle
-                "max_size": 5,  # Reduced from 10 since concurrency handles parallelism
+                "max_size": connection_manager.budgets["queue"].limit,
+                "manage_pool_lifecycle": True,
             },
         ),
     ]
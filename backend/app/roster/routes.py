@@ -9,7 +9,7 @@ from app.addresses.schemas import AddressSchema
 from app.auth.guards import requires_session
 from app.roster.models import Roster
 from app.roster.schemas import RosterSchema, RosterUpdateSchema
-from app.threads.models import Thread
+from app.threads.services import get_thread_unread_info
 from app.utils.db import get_or_404, update_model
 from app.utils.sqids import Sqid
 
@@ -18,22 +18,18 @@ from app.utils.sqids import Sqid
 async def get_roster(
     id: Sqid,
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     action_registry: ActionRegistry,
 ) -> RosterSchema:
     """Get a roster member by SQID."""
-    from sqlalchemy.orm import joinedload, selectinload
+    from sqlalchemy.orm import joinedload
 
     roster = await get_or_404(
-        transaction,
+        read_transaction,
         Roster,
         id,
         load_options=[
             joinedload(Roster.address),
-            joinedload(Roster.thread).options(
-                selectinload(Thread.messages),
-                selectinload(Thread.read_statuses),
-            ),
         ],
     )
 
@@ -41,8 +37,7 @@ async def get_roster(
     action_group = action_registry.get_class(ActionGroupType.RosterActions)
     actions = action_group.get_available_actions(obj=roster)
 
-    # Convert thread to unread info using the mixin method
-    thread_info = roster.get_thread_unread_info(request.user)
+    thread_info = await get_thread_unread_info(read_transaction, roster, request.user)
 
     # Convert address to schema
     address_schema = None
@@ -0,0 +1,185 @@
+"""Encrypted cookie session backend carrying the RLS scope.
+
+An alternative to the PostgreSQL-backed server-side sessions. The session payload
+(user_id, scope_type, team_id, campaign_id, ...) lives in an AES-GCM encrypted cookie,
+so most requests never touch the session store. Logout, logout everywhere and team
+deletion are handled by a revocation list kept in the "session_revocations" store.
+"""
+
+import contextlib
+import logging
+import secrets
+import time
+from base64 import b64decode
+from dataclasses import dataclass, field
+from typing import Any
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from litestar.connection import ASGIConnection
+from litestar.exceptions import ImproperlyConfiguredException
+from litestar.middleware.session.base import ONE_DAY_IN_SECONDS
+from litestar.middleware.session.client_side import (
+    AAD,
+    NONCE_SIZE,
+    ClientSideSessionBackend,
+    CookieBackendConfig,
+)
+from litestar.serialization import decode_json
+from litestar.stores.base import Store
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import await_only
+
+from app.sessions.store import PostgreSQLSessionStore
+
+logger = logging.getLogger(__name__)
+
+SESSION_MAX_AGE = ONE_DAY_IN_SECONDS * 14
+REVOCATION_STORE = "session_revocations"
+
+# Keys added to every cookie session so it can be revoked
+SESSION_ID_KEY = "sid"
+ISSUED_AT_KEY = "iat"
+
+
+class ScopedCookieSessionBackend(ClientSideSessionBackend):
+    """Cookie session backend with key rotation and server-side revocation.
+
+    Sessions are encrypted with the current secret. Previous secrets are still accepted
+    for decryption, and sessions are re-encrypted with the current secret on the next
+    response, so keys can be rotated without logging anyone out.
+
+    A session is revoked by its id, or as issued before its user's or team's sessions
+    were revoked. Revocation lookups aren't cached here: PostgreSQLSessionStore caches
+    them, found or not, and every worker drops its copy as soon as a revocation is
+    written.
+    """
+
+    config: "ScopedCookieBackendConfig"
+
+    def __init__(self, config: "ScopedCookieBackendConfig") -> None:
+        super().__init__(config)
+        self._decryption_keys = [AESGCM(secret) for secret in [config.secret, *config.previous_secrets]]
+
+    def dump_data(self, data: Any, scope: Any = None) -> list[bytes]:
+        """Stamp the session with an id and issue time before encrypting it."""
+        if isinstance(data, dict):
+            data.setdefault(SESSION_ID_KEY, secrets.token_urlsafe(16))
+            data.setdefault(ISSUED_AT_KEY, int(time.time()))
+        return super().dump_data(data, scope)
+
+    def load_data(self, data: list[bytes]) -> dict[str, Any]:
+        """Decrypt session cookies with the current secret or any previous one."""
+        decoded = b64decode(b"".join(data))
+        aad_starts_from = decoded.find(AAD)
+        if aad_starts_from == -1:
+            return {}
+        associated_data = decoded[aad_starts_from + len(AAD) :]
+        if decode_json(value=associated_data)["expires_at"] <= round(time.time()):
+            return {}
+
+        nonce = decoded[:NONCE_SIZE]
+        encrypted_session = decoded[NONCE_SIZE:aad_starts_from]
+        for aesgcm in self._decryption_keys:
+            with contextlib.suppress(InvalidTag):
+                decrypted = aesgcm.decrypt(nonce, encrypted_session, associated_data=associated_data)
+                return self.deserialize_data(decrypted)
+        raise InvalidTag
+
+    async def load_from_connection(self, connection: ASGIConnection) -> dict[str, Any]:
+        """Load the session from cookies, discarding it if it has been revoked."""
+        session = await super().load_from_connection(connection)
+        if session and await self._is_revoked(connection.app.stores.get(REVOCATION_STORE), session):
+            return {}
+        return session
+
+    async def _is_revoked(self, store: Store, session: dict[str, Any]) -> bool:
+        session_id = session.get(SESSION_ID_KEY)
+        if session_id is None:
+            return False
+
+        if await store.exists(f"sid:{session_id}"):
+            return True
+        for scope in ("user", "team"):
+            if (scope_id := session.get(f"{scope}_id")) is not None:
+                revoked_before = await store.get(f"{scope}:{scope_id}")
+                if revoked_before is not None and session.get(ISSUED_AT_KEY, 0) < int(revoked_before):
+                    return True
+        return False
+
+
+@dataclass
+class ScopedCookieBackendConfig(CookieBackendConfig):
+    """Configuration for ScopedCookieSessionBackend.
+
+    `secret` is the current encryption key; `previous_secrets` are accepted for
+    decryption only while a rotation rolls out.
+    """
+
+    _backend_class = ScopedCookieSessionBackend
+
+    previous_secrets: list[bytes] = field(default_factory=list)
+
+
+def parse_cookie_secrets(secrets_setting: str) -> list[bytes]:
+    """Parse SESSION_COOKIE_SECRETS: comma-separated hex AES keys, current key first."""
+    keys = []
+    for secret in secrets_setting.split(","):
+        if not (secret := secret.strip()):
+            continue
+        try:
+            key = bytes.fromhex(secret)
+        except ValueError as e:
+            raise ImproperlyConfiguredException("SESSION_COOKIE_SECRETS must contain hex-encoded keys") from e
+        if len(key) not in (16, 24, 32):
+            raise ImproperlyConfiguredException(
+                f"SESSION_COOKIE_SECRETS keys must be 16, 24 or 32 bytes (AES), got {len(key)} bytes"
+            )
+        keys.append(key)
+    if not keys:
+        raise ImproperlyConfiguredException("SESSION_COOKIE_SECRETS must be set when SESSION_BACKEND is 'cookie'")
+    return keys
+
+
+async def revoke_session(store: Store, session: dict[str, Any], expires_in: int = SESSION_MAX_AGE) -> None:
+    """Revoke a single cookie session (e.g. on logout).
+
+    Server-side sessions carry no session id and are removed from the store instead.
+    """
+    if session_id := session.get(SESSION_ID_KEY):
+        await store.set(f"sid:{session_id}", b"1", expires_in=expires_in)
+
+
+async def _revoke_issued_before_now(store: Store, scope: str, scope_id: int, expires_in: int) -> None:
+    if isinstance(store, PostgreSQLSessionStore):
+        # Server-side sessions of the scope are deleted outright
+        await store.delete_where(f"{scope}_id", scope_id)
+    await store.set(f"{scope}:{scope_id}", str(int(time.time()) + 1).encode(), expires_in=expires_in)
+
+
+async def revoke_user_sessions(store: Store, user_id: int, expires_in: int = SESSION_MAX_AGE) -> None:
+    """Revoke every session issued to a user so far (e.g. on logout everywhere)."""
+    await _revoke_issued_before_now(store, "user", user_id, expires_in)
+
+
+async def revoke_team_sessions(store: Store, team_id: int, expires_in: int = SESSION_MAX_AGE) -> None:
+    """Revoke every session scoped to a team so far (e.g. when the team is deleted)."""
+    await _revoke_issued_before_now(store, "team", team_id, expires_in)
+
+
+def revoke_team_sessions_after_commit(transaction: AsyncSession, store: Store, team_id: int) -> None:
+    """Revoke the team's sessions once the transaction commits, e.g. the one deleting the team.
+
+    The revocation is written in its own transaction; run before the commit, it would
+    outlive a rolled back deletion.
+    """
+
+    def revoke(_: Any) -> None:
+        # after_commit runs inside the session's commit, in SQLAlchemy's greenlet
+        try:
+            await_only(revoke_team_sessions(store, team_id))
+        except Exception:
+            logger.exception("Failed to revoke the sessions of team %s", team_id)
+
+    event.listen(transaction.sync_session, "after_commit", revoke, once=True)
@@ -15,7 +15,9 @@ class Session(BaseDBModel.registry.generate_base()):
 
     Note: Inherits directly from DeclarativeBase instead of BaseDBModel
     to avoid soft delete functionality and extra columns. Sessions use
-    expiration-based cleanup via expires_at.
+    expiration-based cleanup via expires_at (see app/sessions/tasks.py).
+
+    The table can be switched to UNLOGGED storage with scripts/set_sessions_logging.py.
     """
 
     __tablename__ = "sessions"
@@ -1,135 +1,375 @@
 """PostgreSQL-backed session store implementation."""
 
-import json
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import msgspec
+from litestar.channels import ChannelsPlugin, Subscriber
 from litestar.stores.base import Store
-from sqlalchemy import delete, select
+from sqlalchemy import DateTime, String, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 
 from app.sessions.models import Session
 
+logger = logging.getLogger(__name__)
+
+# Sessions written or deleted by one worker, so the others drop their cached copies
+SESSION_INVALIDATION_CHANNEL = "session_invalidations"
+
+
+class SessionInvalidation(msgspec.Struct):
+    """A session changed on node_id; key None means every session."""
+
+    node_id: str
+    key: str | None = None
+
+
+@dataclass
+class _CachedSession:
+    """A session payload held in the in-process read cache; data None caches a missing session."""
+
+    data: bytes | None
+    expires_at: datetime
+    cached_until: float  # time.monotonic() deadline
+
 
 class PostgreSQLSessionStore(Store):
-    """PostgreSQL-backed session store for Litestar."""
+    """PostgreSQL-backed session store for Litestar.
+
+    Reads are served from a bounded, TTL-aware in-process cache. Writes go through to
+    the database and refresh the cache; deletes invalidate it. Session data carries the
+    scope that RLS variables are set from, so a worker must never serve a copy another
+    worker has changed or deleted (switch_scope, logout): every write and delete is
+    published on SESSION_INVALIDATION_CHANNEL before it returns, and the other workers
+    drop their copies. Missing keys are cached the same way, so lookups that usually
+    find nothing (cookie session revocations) don't query on every request. The cache
+    is only used while start_invalidation_listener is subscribed; cache_ttl bounds how
+    long an entry lives should an invalidation be lost. Set cache_ttl=0 to disable
+    caching.
+
+    Expiry renewals (a set with unchanged data, or a get with renew_for) are coalesced:
+    they are ignored until the expiry has moved by more than renewal_threshold of the
+    TTL, then queued and written in one multi-row UPDATE by flush_renewals, which a
+    background task runs every renewal_flush_interval seconds.
+    """
 
-    def __init__(self, db_session_factory, default_expiry: int = 3600):
+    def __init__(
+        self,
+        db_session_factory,
+        default_expiry: int = 3600,
+        cache_ttl: int = 30,
+        cache_max_entries: int = 10_000,
+        renewal_threshold: float = 0.1,
+        renewal_flush_interval: int = 60,
+    ):
         """Initialize the PostgreSQL session store.
 
         Args:
             db_session_factory: Factory function to create database sessions
             default_expiry: Default session expiry time in seconds
+            cache_ttl: Seconds a session may be served from the in-process cache
+            cache_max_entries: Maximum number of cached sessions (least recently used are evicted)
+            renewal_threshold: Fraction of the TTL an expiry must move before it is persisted
+            renewal_flush_interval: Seconds between background flushes of pending renewals
         """
         self.db_session_factory = db_session_factory
         self.default_expiry = default_expiry
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.renewal_threshold = renewal_threshold
+        self.renewal_flush_interval = renewal_flush_interval
+        self._cache: OrderedDict[str, _CachedSession] = OrderedDict()
+        self._pending_renewals: dict[str, datetime] = {}
+        self._flush_task: asyncio.Task | None = None
+        self.node_id = uuid.uuid4().hex
+        self._channels: ChannelsPlugin | None = None
+        self._subscriber: Subscriber | None = None
+        self._listen_task: asyncio.Task | None = None
+        # Bumped by every write, delete or invalidation; a read that raced one isn't cached
+        self._generation = 0
+
+    @property
+    def caching(self) -> bool:
+        """Whether sessions are cached: only while other workers' writes invalidate them."""
+        return self.cache_ttl > 0 and self._subscriber is not None
+
+    def _cache_get(self, key: str) -> _CachedSession | None:
+        """Return a live cache entry, dropping it if stale or expired."""
+        if not self.caching:
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry.cached_until < time.monotonic() or entry.expires_at < datetime.now(tz=UTC):
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry
+
+    def _cache_put(
+        self, key: str, data: bytes | None, expires_at: datetime, read_generation: int | None = None
+    ) -> _CachedSession:
+        """Cache a session payload, evicting the least recently used entries when full.
+
+        Returns the entry, which is only kept while caching, and for a payload read at
+        read_generation, only if no session changed since.
+        """
+        entry = _CachedSession(data=data, expires_at=expires_at, cached_until=time.monotonic() + self.cache_ttl)
+        if not self.caching or (read_generation is not None and read_generation != self._generation):
+            return entry
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+        return entry
+
+    async def _invalidate(self, key: str | None) -> None:
+        """Make the other workers drop their cached copy of a session (all with key None)."""
+        if self._channels is None:
+            return
+        invalidation = SessionInvalidation(node_id=self.node_id, key=key)
+        await self._channels.wait_published(msgspec.json.encode(invalidation), [SESSION_INVALIDATION_CHANNEL])
+
+    async def start_invalidation_listener(self, channels: ChannelsPlugin) -> None:
+        """Share invalidations with the other workers through the channels backend, and start caching."""
+        if self._subscriber is not None:
+            return
+        self._channels = channels
+        self._subscriber = await channels.subscribe([SESSION_INVALIDATION_CHANNEL])
+        self._listen_task = asyncio.create_task(self._listen(self._subscriber))
+
+    async def stop_invalidation_listener(self) -> None:
+        """Stop caching and listening for invalidations."""
+        subscriber, self._subscriber = self._subscriber, None
+        self._cache.clear()
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listen_task
+            self._listen_task = None
+        if subscriber is not None and self._channels is not None:
+            # The channels plugin may already be stopped at shutdown
+            with contextlib.suppress(Exception):
+                await self._channels.unsubscribe(subscriber, [SESSION_INVALIDATION_CHANNEL])
+
+    async def _listen(self, subscriber: Subscriber) -> None:
+        try:
+            async for data in subscriber.iter_events():
+                try:
+                    invalidation = msgspec.json.decode(data, type=SessionInvalidation)
+                except msgspec.DecodeError:
+                    logger.warning("Ignoring malformed session invalidation: %r", data)
+                    continue
+                if invalidation.node_id == self.node_id:
+                    continue
+                self._generation += 1
+                if invalidation.key is None:
+                    self._cache.clear()
+                else:
+                    self._cache.pop(invalidation.key, None)
+        finally:
+            # Invalidations could be missed from now on: stop caching
+            if self._subscriber is subscriber:
+                logger.warning("Session invalidation listener stopped; session caching disabled")
+                self._subscriber = None
+            self._cache.clear()
+
+    @staticmethod
+    def _seconds(expires_in: int | timedelta) -> int:
+        return int(expires_in.total_seconds()) if isinstance(expires_in, timedelta) else expires_in
+
+    def _expires_at(self, expires_in: int | timedelta) -> datetime:
+        return datetime.now(tz=UTC) + timedelta(seconds=self._seconds(expires_in))
+
+    def _renew(self, key: str, entry: _CachedSession, expires_in: int | timedelta) -> None:
+        """Queue a renewal for a cached session if its expiry moved far enough to matter."""
+        expires_at = self._expires_at(expires_in)
+        threshold = timedelta(seconds=self._seconds(expires_in) * self.renewal_threshold)
+        if expires_at - entry.expires_at > threshold:
+            entry.expires_at = expires_at
+            self._pending_renewals[key] = expires_at
 
     async def get(self, key: str, renew_for: int | timedelta | None = None) -> Any:
         """Get session data by key."""
+        if entry := self._cache_get(key):
+            if renew_for is not None and entry.data is not None:
+                self._renew(key, entry, renew_for)
+            return entry.data
+
+        read_generation = self._generation
         async with self.db_session_factory() as db_session:
             stmt = select(Session).where(Session.session_id == key)
             result = await db_session.execute(stmt)
             session = result.scalar_one_or_none()
 
-            if not session:
-                return None
-
-            # Check if session is expired
-            if session.is_expired:
+            if session and session.is_expired:
                 # Clean up expired session
                 await db_session.delete(session)
                 await db_session.commit()
-                return None
+                session = None
 
-            # Renew session if requested
-            if renew_for is not None:
-                if isinstance(renew_for, timedelta):
-                    session.expires_at = datetime.now(tz=UTC) + renew_for
-                else:
-                    session.expires_at = datetime.now(tz=UTC) + timedelta(seconds=renew_for)
-                await db_session.commit()
+            if not session:
+                self._cache_put(key, None, self._expires_at(self.cache_ttl), read_generation)
+                return None
 
             # Convert dict back to bytes for Litestar
-            return json.dumps(session.data).encode("utf-8")
+            data = msgspec.json.encode(session.data)
+            expires_at = session.expires_at
+            if (pending_expiry := self._pending_renewals.get(key)) is not None:
+                expires_at = max(expires_at, pending_expiry)
+
+        entry = self._cache_put(key, data, expires_at, read_generation)
+        if renew_for is not None:
+            self._renew(key, entry, renew_for)
+        return data
 
     async def set(self, key: str, value: str | bytes, expires_in: int | timedelta | None = None) -> None:
-        """Set session data by key."""
-        if expires_in is None:
-            expiry_seconds = self.default_expiry
-        elif isinstance(expires_in, timedelta):
-            expiry_seconds = int(expires_in.total_seconds())
-        else:
-            expiry_seconds = expires_in
+        """Set session data by key with a single upsert.
 
-        expires_at = datetime.now(tz=UTC) + timedelta(seconds=expiry_seconds)
+        Setting unchanged data only renews the expiry, which is coalesced.
+        """
+        if expires_in is None:
+            expires_in = self.default_expiry
+        expires_at = self._expires_at(expires_in)
 
-        # Convert value to string for JSON parsing
-        if isinstance(value, bytes):
-            value_str = value.decode("utf-8")
-        else:
-            value_str = value
+        data = value.encode("utf-8") if isinstance(value, str) else value
 
         # Convert to dict for storage in JSONB
         try:
-            session_data = json.loads(value_str)
-        except (json.JSONDecodeError, UnicodeDecodeError):
+            session_data = msgspec.json.decode(data)
+        except (msgspec.DecodeError, UnicodeDecodeError):
             # If data can't be decoded as JSON, store it as a string value
-            session_data = {"raw_data": value_str}
+            session_data = {"raw_data": data.decode("utf-8", errors="replace")}
+            data = msgspec.json.encode(session_data)
 
+        # Compare decoded payloads: JSONB doesn't preserve key order
+        if (
+            (entry := self._cache_get(key))
+            and entry.data is not None
+            and msgspec.json.decode(entry.data) == session_data
+        ):
+            self._renew(key, entry, expires_in)
+            return
+
+        stmt = insert(Session).values(session_id=key, data=session_data, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Session.session_id],
+            set_={"data": stmt.excluded.data, "expires_at": stmt.excluded.expires_at},
+        )
         async with self.db_session_factory() as db_session:
-            # Try to get existing session
-            stmt = select(Session).where(Session.session_id == key)
-            result = await db_session.execute(stmt)
-            session = result.scalar_one_or_none()
+            await db_session.execute(stmt)
+            await db_session.commit()
 
-            if session:
-                # Update existing session
-                session.data = session_data
-                session.expires_at = expires_at
-            else:
-                # Create new session
-                session = Session(session_id=key, data=session_data, expires_at=expires_at)
-                db_session.add(session)
+        self._generation += 1
+        self._pending_renewals.pop(key, None)
+        self._cache_put(key, data, expires_at)
+        await self._invalidate(key)
 
-            await db_session.commit()
+    async def flush_renewals(self) -> int:
+        """Persist pending expiry renewals in a single multi-row UPDATE.
+
+        Returns:
+            Number of sessions renewed
+        """
+        if not self._pending_renewals:
+            return 0
+        pending, self._pending_renewals = self._pending_renewals, {}
+
+        renewals = values(
+            column("session_id", String),
+            column("expires_at", DateTime(timezone=True)),
+            name="renewals",
+        ).data(list(pending.items()))
+        stmt = (
+            update(Session)
+            .where(Session.session_id == renewals.c.session_id)
+            .values(expires_at=func.greatest(Session.expires_at, renewals.c.expires_at))
+        )
+        try:
+            async with self.db_session_factory() as db_session:
+                await db_session.execute(stmt)
+                await db_session.commit()
+        except Exception:
+            # Keep renewals for the next flush, unless newer ones were queued meanwhile
+            self._pending_renewals = pending | self._pending_renewals
+            raise
+        return len(pending)
+
+    async def _flush_renewals_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.renewal_flush_interval)
+            try:
+                await self.flush_renewals()
+            except Exception:
+                logger.exception("Failed to flush session renewals")
+
+    def start_renewal_flusher(self) -> None:
+        """Start the background task that periodically flushes pending renewals."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_renewals_periodically())
+
+    async def stop_renewal_flusher(self) -> None:
+        """Stop the background flush task and persist any remaining renewals."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        try:
+            await self.flush_renewals()
+        except Exception:
+            logger.exception("Failed to flush session renewals on shutdown")
 
     async def delete(self, key: str) -> None:
         """Delete session by key."""
+        self._generation += 1
+        self._cache.pop(key, None)
+        self._pending_renewals.pop(key, None)
         async with self.db_session_factory() as db_session:
             stmt = delete(Session).where(Session.session_id == key)
             await db_session.execute(stmt)
             await db_session.commit()
+        await self._invalidate(key)
 
-    async def exists(self, key: str) -> bool:
-        """Check if session exists and is not expired."""
+    async def delete_where(self, field: str, value: int) -> None:
+        """Delete every session whose data has field set to value (e.g. all of a user's sessions)."""
+        self._generation += 1
+        self._cache.clear()
         async with self.db_session_factory() as db_session:
-            stmt = select(Session).where(Session.session_id == key)
-            result = await db_session.execute(stmt)
-            session = result.scalar_one_or_none()
-
-            if not session:
-                return False
-
-            if session.is_expired:
-                # Clean up expired session
-                await db_session.delete(session)
-                await db_session.commit()
-                return False
+            stmt = delete(Session).where(Session.data[field].as_integer() == value)
+            await db_session.execute(stmt)
+            await db_session.commit()
+        await self._invalidate(None)
 
-            return True
+    async def exists(self, key: str) -> bool:
+        """Check if session exists and is not expired."""
+        return await self.get(key) is not None
 
     async def expires_in(self, key: str) -> int | None:
         """Get seconds until session expires."""
-        async with self.db_session_factory() as db_session:
-            stmt = select(Session).where(Session.session_id == key)
-            result = await db_session.execute(stmt)
-            session = result.scalar_one_or_none()
-
-            if not session or session.is_expired:
+        if entry := self._cache_get(key):
+            if entry.data is None:
                 return None
+            expires_at = entry.expires_at
+        else:
+            async with self.db_session_factory() as db_session:
+                stmt = select(Session).where(Session.session_id == key)
+                result = await db_session.execute(stmt)
+                session = result.scalar_one_or_none()
 
-            now = datetime.now(tz=UTC)
-            delta = session.expires_at - now
-            return max(0, int(delta.total_seconds()))
+                if not session or session.is_expired:
+                    return None
+                expires_at = session.expires_at
+
+        delta = expires_at - datetime.now(tz=UTC)
+        return max(0, int(delta.total_seconds()))
 
     async def delete_expired(self) -> None:
         """Clean up expired sessions."""
@@ -141,7 +381,11 @@ class PostgreSQLSessionStore(Store):
 
     async def delete_all(self) -> None:
         """Delete all sessions."""
+        self._generation += 1
+        self._cache.clear()
+        self._pending_renewals.clear()
         async with self.db_session_factory() as db_session:
             stmt = delete(Session)
             await db_session.execute(stmt)
             await db_session.commit()
+        await self._invalidate(None)
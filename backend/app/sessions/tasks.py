@@ -0,0 +1,76 @@
+"""Session-related background tasks."""
+
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.queue.registry import scheduled_task
+from app.queue.transactions import task_transaction
+from app.queue.types import AppContext
+
+__all__ = ["cleanup_expired_sessions", "delete_expired_sessions_batch"]
+
+logger = logging.getLogger(__name__)
+
+SESSION_CLEANUP_BATCH_SIZE = 5_000
+SESSION_CLEANUP_MAX_BATCHES = 200
+
+# Delete by physical row address: the subquery walks ix_sessions_expires_at, and
+# SKIP LOCKED keeps the cleanup from waiting on sessions being written concurrently.
+_DELETE_EXPIRED_BATCH = text(
+    """
+    WITH deleted AS (
+        DELETE FROM sessions
+        WHERE ctid = ANY(ARRAY(
+            SELECT ctid FROM sessions
+            WHERE expires_at < :now
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        ))
+        RETURNING 1
+    )
+    SELECT count(*) FROM deleted
+    """
+)
+
+
+async def delete_expired_sessions_batch(transaction: AsyncSession, *, now: datetime, batch_size: int) -> int:
+    """Delete up to batch_size sessions that expired before now.
+
+    Returns:
+        Number of sessions deleted
+    """
+    return await transaction.scalar(_DELETE_EXPIRED_BATCH, {"now": now, "batch_size": batch_size}) or 0
+
+
+@scheduled_task(cron="*/15 * * * *", timeout=600)
+async def cleanup_expired_sessions(ctx: AppContext) -> dict:
+    """Delete expired sessions in bounded batches.
+
+    Runs every 15 minutes. Each batch commits in its own short transaction so
+    locks and WAL are released as the cleanup progresses; a backlog larger than
+    SESSION_CLEANUP_MAX_BATCHES batches is finished by the next run.
+
+    Args:
+        ctx: SAQ task context
+
+    Returns:
+        Dictionary with cleanup statistics
+    """
+    now = datetime.now(tz=UTC)
+    sessions_deleted = 0
+    batches = 0
+
+    while batches < SESSION_CLEANUP_MAX_BATCHES:
+        async with task_transaction(ctx["db_sessionmaker"]) as transaction:
+            deleted = await delete_expired_sessions_batch(transaction, now=now, batch_size=SESSION_CLEANUP_BATCH_SIZE)
+        sessions_deleted += deleted
+        batches += 1
+        if deleted < SESSION_CLEANUP_BATCH_SIZE:
+            break
+
+    result = {"sessions_deleted": sessions_deleted, "batches": batches, "cutoff_date": now.isoformat()}
+    logger.info(f"Session cleanup completed: {result}")
+    return result
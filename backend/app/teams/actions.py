@@ -9,6 +9,7 @@ from app.actions.base import EmptyActionData
 from app.actions.deps import ActionDeps
 from app.actions.enums import ActionIcon
 from app.actions.schemas import ActionExecutionResponse
+from app.sessions.cookie import REVOCATION_STORE, revoke_team_sessions_after_commit
 from app.teams.enums import TeamActions
 from app.teams.models import Team
 from app.teams.schemas import InviteUserToTeamSchema
@@ -68,6 +69,10 @@ class DeleteTeam(BaseObjectAction[Team, EmptyActionData]):
 
         obj.soft_delete()
         transaction.add(obj)
+
+        # Sessions scoped to the team must not keep using it, once it is deleted
+        revoke_team_sessions_after_commit(transaction, deps.request.app.stores.get(REVOCATION_STORE), obj.id)
+
         return ActionExecutionResponse(
             message="Team deleted successfully",
         )
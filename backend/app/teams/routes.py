@@ -33,12 +33,12 @@ logger = logging.getLogger(__name__)
 async def get_team(
     id: Sqid,
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     action_registry: ActionRegistry,
 ) -> TeamSchema:
     """Get a team by ID with actions."""
     team = await get_or_404(
-        transaction,
+        read_transaction,
         Team,
         id,
         load_options=[
@@ -105,7 +105,7 @@ async def create_team(
 @get("/", guards=[requires_session])
 async def list_teams(
     request: Request,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     action_registry: ActionRegistry,
 ) -> list[TeamListItemSchema]:
     """List all teams for the current user.
@@ -132,7 +132,7 @@ async def list_teams(
             )
 
         # Get the campaign and its team
-        campaign = await get_or_404(transaction, Campaign, campaign_id)
+        campaign = await get_or_404(read_transaction, Campaign, campaign_id)
         teams = [
             TeamListItemSchema(
                 id=campaign.id,
@@ -146,7 +146,7 @@ async def list_teams(
         # User is in team scope or no scope - return all teams via Role table
         team_id: int | None = request.session.get("team_id")
 
-        result = await transaction.execute(
+        result = await read_transaction.execute(
             select(Team)
             .join(Role, Role.team_id == Team.id)
             .where(Role.user_id == user_id, Team.deleted_at.is_(None))
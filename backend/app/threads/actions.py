@@ -59,6 +59,7 @@ class UpdateMessage(BaseObjectAction[Message, MessageUpdateSchema]):
                 message_id=sqid_encode(obj.id),
                 thread_id=sqid_encode(obj.thread_id),
                 user_id=sqid_encode(obj.user_id or 0),
+                seq=obj.seq,
                 viewers=[],  # Empty - actions don't have viewer_store access
             ),
         )
@@ -110,6 +111,7 @@ class DeleteMessage(BaseObjectAction[Message, EmptyActionData]):
                 message_id=sqid_encode(obj.id),
                 thread_id=sqid_encode(obj.thread_id),
                 user_id=sqid_encode(obj.user_id or 0),
+                seq=obj.seq,
                 viewers=[],  # Empty - actions don't have viewer_store access
             ),
         )
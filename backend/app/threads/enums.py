@@ -26,6 +26,8 @@ class ThreadSocketMessageType(StrEnum):
     USER_LEFT = "user_left"  # User left thread
     USER_FOCUS = "user_focus"  # User started typing
     USER_BLUR = "user_blur"  # User stopped typing
+    PRESENCE_UPDATE = "presence_update"  # Batched focus/blur changes (clients opting into diffs)
     MESSAGE_CREATED = "message_created"  # New message created
     MESSAGE_UPDATED = "message_updated"  # Message updated
     MESSAGE_DELETED = "message_deleted"  # Message deleted
+    RESYNC = "resync"  # Too many messages were missed to replay; refetch the message list
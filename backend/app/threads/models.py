@@ -4,8 +4,10 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any, Literal
 
 import sqlalchemy as sa
+from sqlalchemy import event
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, attributes, mapped_column, object_session, relationship
+from sqlalchemy.orm.util import identity_key
 
 from app.base.models import BaseDBModel
 from app.base.scope_mixins import RLSMixin
@@ -31,6 +33,9 @@ class Thread(
     threadable_type: Mapped[str] = mapped_column(sa.Text, nullable=False, index=True)
     threadable_id: Mapped[int] = mapped_column(sa.Integer, nullable=False, index=True)
 
+    # Sequence number of the thread's latest message (see Message.seq)
+    last_seq: Mapped[int] = mapped_column(sa.Integer, nullable=False, default=0, server_default="0")
+
     # Relationships
     messages: Mapped[list["Message"]] = relationship(
         "Message",
@@ -38,8 +43,8 @@ class Thread(
         cascade="all, delete-orphan",
         order_by="Message.created_at",
     )
-    read_statuses: Mapped[list["ThreadReadStatus"]] = relationship(
-        "ThreadReadStatus",
+    read_cursors: Mapped[list["ThreadReadCursor"]] = relationship(
+        "ThreadReadCursor",
         back_populates="thread",
         cascade="all, delete-orphan",
     )
@@ -77,19 +82,84 @@ class Message(
     # Content (stored as TipTap JSON format)
     content: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
 
+    # Position in the thread (1, 2, ...), assigned on insert from Thread.last_seq
+    seq: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+
     # Relationships
     thread: Mapped["Thread"] = relationship("Thread", back_populates="messages")
     user: Mapped["User | None"] = relationship("User")
 
-    # Index for efficient message listing
-    __table_args__ = (sa.Index("ix_messages_thread_created", "thread_id", "created_at"),)
+    __table_args__ = (
+        # Index for efficient message listing
+        sa.Index("ix_messages_thread_created", "thread_id", "created_at"),
+        sa.UniqueConstraint("thread_id", "seq", name="uq_messages_thread_seq"),
+        # Deleted messages are subtracted from unread counts; they are rare, so this stays tiny
+        sa.Index(
+            "ix_messages_thread_deleted_seq",
+            "thread_id",
+            "seq",
+            postgresql_where=sa.text("deleted_at IS NOT NULL"),
+        ),
+    )
+
+
+@event.listens_for(Message, "before_insert")
+def _assign_message_seq(mapper, connection, target: Message) -> None:
+    """Number a new message within its thread.
+
+    Bumping Thread.last_seq locks the thread row until commit, so concurrent posts to
+    one thread get consecutive numbers.
+    """
+    if target.seq is not None:
+        return
+    target.seq = connection.scalar(
+        sa.update(Thread)
+        .where(Thread.id == target.thread_id)
+        .values(last_seq=Thread.last_seq + 1)
+        .returning(Thread.last_seq)
+    )
+    # Keep a thread loaded in the same session in step
+    session = object_session(target)
+    thread = session.identity_map.get(identity_key(Thread, target.thread_id)) if session else None
+    if thread is not None:
+        attributes.set_committed_value(thread, "last_seq", target.seq)
+
+
+class ThreadReadCursor(BaseDBModel):
+    """How far a user has read a thread.
+
+    One row per (thread, user), upserted on mark-read. The user's unread count is
+    Thread.last_seq - seq, less the messages deleted since.
+    """
+
+    __tablename__ = "thread_read_cursors"
+
+    thread_id: Mapped[Sqid] = mapped_column(
+        sa.ForeignKey("threads.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id: Mapped[Sqid] = mapped_column(
+        sa.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Message.seq of the last message read
+    seq: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+    read_at: Mapped[datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False)
+
+    # Relationships
+    thread: Mapped["Thread"] = relationship("Thread", back_populates="read_cursors")
+    user: Mapped["User"] = relationship("User")
+
+    __table_args__ = (sa.UniqueConstraint("thread_id", "user_id", name="uq_thread_read_cursor"),)
 
 
 class ThreadReadStatus(BaseDBModel):
-    """Log of thread read events.
+    """Legacy log of thread read events.
 
-    Append-only log used to calculate unread message counts.
-    Each time a user marks a thread as read, a new row is inserted.
+    Superseded by ThreadReadCursor: no longer written, and folded into the cursors
+    (then deleted) by the compact_thread_read_log task.
     """
 
     __tablename__ = "thread_read_statuses"
@@ -113,7 +183,7 @@ class ThreadReadStatus(BaseDBModel):
     )
 
     # Relationships
-    thread: Mapped["Thread"] = relationship("Thread", back_populates="read_statuses")
+    thread: Mapped["Thread"] = relationship("Thread")
     user: Mapped["User"] = relationship("User")
 
     # Index for efficient MAX(read_at) lookups
@@ -130,8 +200,9 @@ class ThreadReadStatus(BaseDBModel):
 class ThreadViewerEvent(BaseDBModel):
     """Log of thread viewer presence events (multi-server safe).
 
-    Append-only log tracking when users join/leave threads via WebSocket.
-    Used to reconstruct current viewer list across multiple app servers.
+    Append-only log tracking when users join/leave threads via WebSocket, per app
+    server (node). A node's viewers count while its PresenceNode lease is current;
+    events of expired nodes are deleted (see app/threads/presence.py).
     """
 
     __tablename__ = "thread_viewer_events"
@@ -157,6 +228,9 @@ class ThreadViewerEvent(BaseDBModel):
     # Denormalized user name for efficient reads (avoids JOIN on queries)
     user_name: Mapped[str] = mapped_column(sa.Text, nullable=False)
 
+    # App server the socket is connected to
+    node_id: Mapped[str] = mapped_column(sa.Text, nullable=False, index=True)
+
     # Relationships
     thread: Mapped["Thread"] = relationship("Thread")
     user: Mapped["User"] = relationship("User")
@@ -171,3 +245,16 @@ class ThreadViewerEvent(BaseDBModel):
             "created_at",
         ),
     )
+
+
+class PresenceNode(BaseDBModel):
+    """Heartbeat lease of an app server holding thread WebSockets.
+
+    Renewed every PRESENCE_HEARTBEAT_SECONDS. Once expires_at has passed the node is
+    considered crashed, and its viewer events are deleted by the next sweep.
+    """
+
+    __tablename__ = "presence_nodes"
+
+    node_id: Mapped[str] = mapped_column(sa.Text, nullable=False, unique=True)
+    expires_at: Mapped[datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,412 @@
+"""Thread viewer presence shared across app servers.
+
+Each app server (node) keeps a replica of who is viewing which thread in memory, so
+get_viewers is a local read. Joins and leaves are applied to the local replica, logged
+as ThreadViewerEvent rows tagged with the node, and published on PRESENCE_CHANNEL (a
+NOTIFY through the channels backend); the other nodes apply them to their replicas.
+
+Focus/blur changes don't affect who is viewing; PresenceBroadcaster batches them into
+at most one PresenceUpdate per thread every THREAD_PRESENCE_INTERVAL_MS.
+
+While a node holds sockets it renews its PresenceNode lease every
+PRESENCE_HEARTBEAT_SECONDS. A crashed node's lease expires after PRESENCE_LEASE_SECONDS:
+the next node to heartbeat deletes its events and publishes node_expired, and every
+replica drops its viewers. A starting node loads the viewers of live nodes from the
+event log. Heartbeats stop while a node has no viewers, so an idle deployment doesn't
+keep a database connection open.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections import Counter
+from datetime import timedelta
+from typing import Literal
+
+import msgspec
+from litestar.channels import ChannelsPlugin, Subscriber
+from sqlalchemy import Integer, case, delete, exists, func, insert, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.threads.enums import ThreadSocketMessageType
+from app.threads.models import PresenceNode, ThreadViewerEvent
+from app.threads.schemas import PresenceUpdate
+from app.threads.utils import get_thread_channel
+from app.users.models import User
+from app.utils.configure import config
+from app.utils.sqids import sqid_encode
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_CHANNEL = "thread_presence"
+
+ViewerEventType = Literal["joined", "left"]
+
+
+def default_node_id() -> str:
+    """Identify this process among the app servers."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class PresenceEvent(msgspec.Struct, omit_defaults=True):
+    """Presence change published to the other nodes."""
+
+    kind: Literal["joined", "left", "node_expired"]
+    node_id: str
+    thread_id: int | None = None
+    user_id: int | None = None
+    # ThreadViewerEvent id, to skip events already included in a node's startup snapshot
+    event_id: int | None = None
+
+
+class ViewerReplica:
+    """Viewers per thread, counted per (user, node) since a user may have several sockets open."""
+
+    def __init__(self) -> None:
+        self._threads: dict[int, Counter[tuple[int, str]]] = {}
+
+    def join(self, thread_id: int, user_id: int, node_id: str, count: int = 1) -> None:
+        self._threads.setdefault(thread_id, Counter())[user_id, node_id] += count
+
+    def leave(self, thread_id: int, user_id: int, node_id: str) -> None:
+        viewers = self._threads.get(thread_id)
+        if not viewers or viewers[user_id, node_id] <= 0:
+            return
+        viewers[user_id, node_id] -= 1
+        if viewers[user_id, node_id] == 0:
+            del viewers[user_id, node_id]
+        if not viewers:
+            del self._threads[thread_id]
+
+    def expire_node(self, node_id: str) -> None:
+        """Drop every viewer connected to node_id."""
+        for thread_id, viewers in list(self._threads.items()):
+            for key in [key for key in viewers if key[1] == node_id]:
+                del viewers[key]
+            if not viewers:
+                del self._threads[thread_id]
+
+    def get_viewers(self, thread_id: int) -> set[int]:
+        return {user_id for user_id, _ in self._threads.get(thread_id, ())}
+
+    def node_viewers(self, node_id: str) -> list[tuple[int, int, int]]:
+        """(thread_id, user_id, sockets) of the viewers connected to node_id."""
+        return [
+            (thread_id, user_id, count)
+            for thread_id, viewers in self._threads.items()
+            for (user_id, viewer_node_id), count in viewers.items()
+            if viewer_node_id == node_id
+        ]
+
+    def has_node(self, node_id: str) -> bool:
+        return any(key[1] == node_id for viewers in self._threads.values() for key in viewers)
+
+
+def _net_viewers():
+    return func.sum(case((ThreadViewerEvent.event_type == "joined", 1), else_=-1))
+
+
+class ThreadViewerStore:
+    """Viewer presence of all nodes, replicated in this process.
+
+    Sharing is best-effort: if the database or channels backend is unavailable, the
+    local replica stays correct for this node's sockets and sharing is retried on the
+    next join or leave.
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        channels: ChannelsPlugin,
+        node_id: str | None = None,
+        heartbeat: float | None = None,
+        lease: float | None = None,
+    ) -> None:
+        self.sessionmaker = sessionmaker
+        self.channels = channels
+        self.node_id = node_id or default_node_id()
+        self.heartbeat = config.PRESENCE_HEARTBEAT_SECONDS if heartbeat is None else heartbeat
+        self.lease = config.PRESENCE_LEASE_SECONDS if lease is None else lease
+        self.replica = ViewerReplica()
+        self._subscriber: Subscriber | None = None
+        self._snapshot_event_id = 0
+        self._start_lock = asyncio.Lock()
+        self._lease_lock = asyncio.Lock()
+        self._heartbeat_task: asyncio.Task | None = None
+        self._leased = False
+        self._tasks: set[asyncio.Task] = set()
+
+    def get_viewers(self, thread_id: int) -> set[int]:
+        return self.replica.get_viewers(thread_id)
+
+    async def add_viewer(self, thread_id: int, user_id: int) -> set[int]:
+        self.replica.join(thread_id, user_id, self.node_id)
+        await self._share("joined", thread_id, user_id)
+        return self.get_viewers(thread_id)
+
+    async def remove_viewer(self, thread_id: int, user_id: int) -> set[int]:
+        self.replica.leave(thread_id, user_id, self.node_id)
+        await self._share("left", thread_id, user_id)
+        return self.get_viewers(thread_id)
+
+    async def start(self) -> None:
+        """Subscribe to the other nodes' events and load their current viewers."""
+        if self._subscriber is not None:
+            return
+        async with self._start_lock:
+            if self._subscriber is not None:
+                return
+            # Subscribe before the snapshot, so no event falls between the two
+            subscriber = await self.channels.subscribe([PRESENCE_CHANNEL])
+            try:
+                self._snapshot_event_id = await self._load_snapshot()
+            except BaseException:
+                await self.channels.unsubscribe(subscriber, [PRESENCE_CHANNEL])
+                raise
+            self._subscriber = subscriber
+            self._spawn(self._listen(subscriber))
+
+    async def stop(self) -> None:
+        """Withdraw this node's viewers and stop sharing."""
+        for task in [self._heartbeat_task, *self._tasks]:
+            if task is not None:
+                task.cancel()
+        if self._subscriber is not None:
+            await self.channels.unsubscribe(self._subscriber, [PRESENCE_CHANNEL])
+            self._subscriber = None
+        if self._heartbeat_task is None:
+            return  # Never leased
+        try:
+            async with self.sessionmaker.begin() as session:
+                await session.execute(delete(ThreadViewerEvent).where(ThreadViewerEvent.node_id == self.node_id))
+                await session.execute(delete(PresenceNode).where(PresenceNode.node_id == self.node_id))
+            await self.channels.wait_published(
+                msgspec.json.encode(PresenceEvent(kind="node_expired", node_id=self.node_id)), [PRESENCE_CHANNEL]
+            )
+        except Exception:
+            logger.exception("Failed to withdraw thread presence of node %s", self.node_id)
+        self._heartbeat_task = None
+        self._leased = False
+
+    async def beat(self) -> None:
+        """Renew this node's lease, expire crashed nodes and compact this node's events."""
+        async with self.sessionmaker.begin() as session:
+            lease_lost = await self._renew_lease(session) and self._leased
+            expired = await self._sweep(session)
+            await self._compact(session)
+        self._leased = True
+
+        for node_id in expired:
+            logger.info("Expired thread presence of node %s", node_id)
+            self.replica.expire_node(node_id)
+            self._publish(PresenceEvent(kind="node_expired", node_id=node_id))
+        if lease_lost:
+            # Another node expired this one (e.g. after a long pause): announce our viewers again
+            logger.warning("Thread presence lease of node %s was lost, rejoining viewers", self.node_id)
+            for thread_id, user_id, count in self.replica.node_viewers(self.node_id):
+                for _ in range(count):
+                    await self._log_and_publish("joined", thread_id, user_id)
+
+    async def _share(self, kind: ViewerEventType, thread_id: int, user_id: int) -> None:
+        """Log the event and publish it to the other nodes, without failing the socket."""
+        try:
+            await self.start()
+            await self._ensure_heartbeat()
+            await self._log_and_publish(kind, thread_id, user_id)
+        except Exception:
+            logger.exception("Failed to share thread presence", extra={"thread_id": thread_id, "user_id": user_id})
+
+    async def _log_and_publish(self, kind: ViewerEventType, thread_id: int, user_id: int) -> None:
+        async with self.sessionmaker.begin() as session:
+            event_id = await session.scalar(self._log_event(kind, thread_id, user_id))
+        self._publish(
+            PresenceEvent(
+                kind=kind,
+                node_id=self.node_id,
+                thread_id=int(thread_id),
+                user_id=int(user_id),
+                event_id=int(event_id) if event_id is not None else None,
+            )
+        )
+
+    def _log_event(self, kind: ViewerEventType, thread_id: int, user_id: int):
+        return (
+            insert(ThreadViewerEvent)
+            .from_select(
+                ["thread_id", "user_id", "event_type", "user_name", "node_id"],
+                select(
+                    literal(int(thread_id), Integer),
+                    User.id,
+                    literal(kind),
+                    User.name,
+                    literal(self.node_id),
+                ).where(User.id == user_id),
+            )
+            .returning(ThreadViewerEvent.id)
+        )
+
+    def _publish(self, event: PresenceEvent) -> None:
+        self.channels.publish(msgspec.json.encode(event), [PRESENCE_CHANNEL])
+
+    async def _ensure_heartbeat(self) -> None:
+        async with self._lease_lock:
+            if self._heartbeat_task is None or self._heartbeat_task.done():
+                # Take the lease before logging events, so a sweep never sees them leaseless
+                await self.beat()
+                self._heartbeat_task = asyncio.create_task(self._heartbeat_periodically())
+
+    async def _heartbeat_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            try:
+                await self.beat()
+            except Exception:
+                logger.exception("Thread presence heartbeat failed")
+            if not self.replica.has_node(self.node_id):
+                # Let the lease lapse until the next socket connects
+                self._leased = False
+                return
+
+    async def _renew_lease(self, session: AsyncSession) -> bool:
+        """Extend this node's lease; True if it had to be created."""
+        expires_at = func.now() + timedelta(seconds=self.lease)
+        stmt = (
+            pg_insert(PresenceNode)
+            .values(node_id=self.node_id, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=[PresenceNode.node_id],
+                set_={"expires_at": expires_at, "updated_at": func.now()},
+            )
+            # xmax is 0 for a freshly inserted row
+            .returning(literal_column("xmax = 0"))
+        )
+        return bool(await session.scalar(stmt))
+
+    async def _sweep(self, session: AsyncSession) -> list[str]:
+        """Delete the leases and events of expired nodes; return their ids."""
+        expired = list(
+            await session.scalars(
+                select(PresenceNode.node_id)
+                .where(PresenceNode.expires_at < func.now(), PresenceNode.node_id != self.node_id)
+                .with_for_update(skip_locked=True)
+            )
+        )
+        if expired:
+            await session.execute(delete(ThreadViewerEvent).where(ThreadViewerEvent.node_id.in_(expired)))
+            await session.execute(delete(PresenceNode).where(PresenceNode.node_id.in_(expired)))
+        # Events logged by a node after its lease was swept
+        await session.execute(
+            delete(ThreadViewerEvent).where(
+                ThreadViewerEvent.created_at < func.now() - timedelta(seconds=self.lease),
+                ~exists().where(PresenceNode.node_id == ThreadViewerEvent.node_id),
+            )
+        )
+        return expired
+
+    async def _compact(self, session: AsyncSession) -> None:
+        """Delete this node's events for viewers that have left again."""
+        settled = (
+            select(ThreadViewerEvent.thread_id, ThreadViewerEvent.user_id)
+            .where(ThreadViewerEvent.node_id == self.node_id)
+            .group_by(ThreadViewerEvent.thread_id, ThreadViewerEvent.user_id)
+            .having(_net_viewers() == 0)
+        )
+        await session.execute(
+            delete(ThreadViewerEvent).where(
+                ThreadViewerEvent.node_id == self.node_id,
+                tuple_(ThreadViewerEvent.thread_id, ThreadViewerEvent.user_id).in_(settled),
+            )
+        )
+
+    async def _load_snapshot(self) -> int:
+        """Load the viewers of the other live nodes; return the last event id included."""
+        async with self.sessionmaker.begin() as session:
+            # Both queries must see the same events
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            net = _net_viewers()
+            rows = await session.execute(
+                select(ThreadViewerEvent.thread_id, ThreadViewerEvent.user_id, ThreadViewerEvent.node_id, net)
+                .join(PresenceNode, PresenceNode.node_id == ThreadViewerEvent.node_id)
+                .where(PresenceNode.expires_at > func.now(), ThreadViewerEvent.node_id != self.node_id)
+                .group_by(ThreadViewerEvent.thread_id, ThreadViewerEvent.user_id, ThreadViewerEvent.node_id)
+                .having(net > 0)
+            )
+            last_event_id = await session.scalar(select(func.max(ThreadViewerEvent.id)))
+        for thread_id, user_id, node_id, count in rows:
+            self.replica.join(thread_id, user_id, node_id, count)
+        return int(last_event_id or 0)
+
+    async def _listen(self, subscriber: Subscriber) -> None:
+        async for data in subscriber.iter_events():
+            try:
+                event = msgspec.json.decode(data, type=PresenceEvent)
+            except msgspec.DecodeError:
+                logger.warning("Ignoring malformed presence event: %r", data)
+                continue
+            self.apply(event)
+
+    def apply(self, event: PresenceEvent) -> None:
+        """Apply another node's event to the replica."""
+        if event.node_id == self.node_id:
+            return
+        if event.kind == "node_expired":
+            self.replica.expire_node(event.node_id)
+        elif event.event_id is not None and event.event_id <= self._snapshot_event_id:
+            return  # Already included in the snapshot
+        elif event.thread_id is not None and event.user_id is not None:
+            if event.kind == "joined":
+                self.replica.join(event.thread_id, event.user_id, event.node_id)
+            else:
+                self.replica.leave(event.thread_id, event.user_id, event.node_id)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class PresenceBroadcaster:
+    """Batches each thread's focus/blur changes into at most one broadcast per interval.
+
+    A user switching tabs sends bursts of focus and blur; only their latest state in the
+    interval is broadcast, together with the other users' changes, as one PresenceUpdate.
+    """
+
+    def __init__(self, channels: ChannelsPlugin, interval: float | None = None) -> None:
+        self.channels = channels
+        self.interval = config.THREAD_PRESENCE_INTERVAL_MS / 1000 if interval is None else interval
+        # Latest focus state per user, per thread with a broadcast due
+        self._pending: dict[int, dict[int, bool]] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+
+    def update(self, thread_id: int, user_id: int, focused: bool) -> None:
+        """Record a user's focus state; it is broadcast when the thread's interval ends."""
+        self._pending.setdefault(thread_id, {})[user_id] = focused
+        if thread_id not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[thread_id] = loop.call_later(self.interval, self.flush, thread_id)
+
+    def flush(self, thread_id: int) -> None:
+        """Broadcast the thread's pending changes now."""
+        if timer := self._timers.pop(thread_id, None):
+            timer.cancel()
+        changes = self._pending.pop(thread_id, None)
+        if not changes:
+            return
+        update = PresenceUpdate(
+            message_type=ThreadSocketMessageType.PRESENCE_UPDATE,
+            focused=[sqid_encode(user_id) for user_id, focused in changes.items() if focused],
+            blurred=[sqid_encode(user_id) for user_id, focused in changes.items() if not focused],
+        )
+        try:
+            self.channels.publish(msgspec.json.encode(update), [get_thread_channel(thread_id)])
+        except Exception:
+            logger.exception("Failed to broadcast presence of thread %s", thread_id)
+
+    def close(self) -> None:
+        """Broadcast every pending change."""
+        for thread_id in list(self._pending):
+            self.flush(thread_id)
@@ -0,0 +1,124 @@
+"""Coalesced persistence of thread read cursors.
+
+Clients mark a thread as read on every message they receive, and senders are marked
+as read on every message they post, so an active thread would move each viewer's
+ThreadReadCursor once per message. ReadReceipts keeps the furthest seq marked per
+(thread, user) in memory and writes them every THREAD_READ_FLUSH_MS in one multi-row
+upsert, and when a socket closes or the app shuts down.
+
+Cursors only move forward (GREATEST), so a receipt written late or twice is harmless.
+Unread counts lag a mark by at most the flush interval.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime
+
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.threads.models import ThreadReadCursor
+from app.utils.configure import config
+
+logger = logging.getLogger(__name__)
+
+
+class ReadReceipts:
+    """Accumulates read cursor moves and flushes them as one upsert per interval."""
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], interval: float | None = None) -> None:
+        self.sessionmaker = sessionmaker
+        self.interval = config.THREAD_READ_FLUSH_MS / 1000 if interval is None else interval
+        # Furthest seq read, and when, per (thread_id, user_id)
+        self._pending: dict[tuple[int, int], tuple[int, datetime]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def mark(self, thread_id: int, user_id: int, seq: int) -> None:
+        """Record that a user has read a thread up to seq; it is written with the next flush."""
+        key = (thread_id, user_id)
+        pending = self._pending.get(key)
+        if pending is None or seq > pending[0]:
+            self._pending[key] = (seq, datetime.now(tz=UTC))
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._flush_in_background)
+
+    def mark_after_commit(self, transaction: AsyncSession, thread_id: int, user_id: int, seq: int) -> None:
+        """Mark once the transaction commits, e.g. a sender as having read their new message.
+
+        Marking a seq the transaction assigned before it commits could skip a message: if
+        the transaction rolls back, the next message gets the same seq.
+        """
+        event.listen(transaction.sync_session, "after_commit", lambda _: self.mark(thread_id, user_id, seq), once=True)
+
+    async def flush(self) -> int:
+        """Write every pending receipt in a single multi-row upsert.
+
+        Returns:
+            Number of read cursors written
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        stmt = insert(ThreadReadCursor).values(
+            [
+                {"thread_id": thread_id, "user_id": user_id, "seq": seq, "read_at": read_at}
+                for (thread_id, user_id), (seq, read_at) in pending.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_thread_read_cursor",
+            set_={
+                "seq": func.greatest(ThreadReadCursor.seq, stmt.excluded.seq),
+                "read_at": func.greatest(ThreadReadCursor.read_at, stmt.excluded.read_at),
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            async with self.sessionmaker.begin() as session:
+                await session.execute(stmt)
+        except IntegrityError:
+            # A thread or user was deleted meanwhile; retrying would fail again
+            logger.exception("Dropped %d read receipts", len(pending))
+            return 0
+        except Exception:
+            # Keep the receipts for the next flush, merged with newer ones
+            for key, (seq, read_at) in pending.items():
+                if key not in self._pending or self._pending[key][0] < seq:
+                    self._pending[key] = (seq, read_at)
+            raise
+        return len(pending)
+
+    async def flush_for(self, thread_id: int, user_id: int) -> None:
+        """Flush now if the user has a receipt pending for the thread, e.g. as their socket closes."""
+        if (thread_id, user_id) in self._pending:
+            await self._flush_logged()
+
+    def _flush_in_background(self) -> None:
+        self._timer = None
+        task = asyncio.create_task(self._flush_logged())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to flush read receipts")
+            if self._pending and self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.interval, self._flush_in_background)
+
+    async def close(self) -> None:
+        """Write the remaining receipts."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to flush read receipts on shutdown")
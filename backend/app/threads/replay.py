@@ -0,0 +1,138 @@
+"""Replay of the messages a reconnecting thread WebSocket missed.
+
+Every message has a seq, consecutive within its thread, and MESSAGE_CREATED events
+carry it. A client reconnecting with ?since=<last seq seen> gets a MESSAGE_CREATED
+event for each message created since, before any live event, instead of refetching
+the message list.
+
+MessageReplayBuffer keeps the latest THREAD_REPLAY_BUFFER_SIZE MESSAGE_CREATED events
+of each thread channel this process is subscribed to, as the ChannelHub observer. It
+only serves a replay when it holds every seq from since up to the thread's last_seq;
+otherwise the missed messages are read from the database. Beyond
+REPLAY_MAX_MESSAGES missed messages, the client gets RESYNC and refetches the list.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.threads.enums import ThreadSocketMessageType
+from app.threads.models import Message, Thread
+from app.threads.schemas import ServerMessage
+from app.threads.utils import created_message_seq, encode_server_message_str, get_thread_channel
+from app.utils.sqids import sqid_encode
+
+REPLAY_MAX_MESSAGES = 500
+
+
+class MessageReplayBuffer:
+    """Latest MESSAGE_CREATED events per thread channel, in seq order without gaps."""
+
+    def __init__(self, size: int = 200, max_channels: int = 1000) -> None:
+        self.size = size
+        self.max_channels = max_channels
+        self._events: OrderedDict[str, deque[tuple[int, bytes]]] = OrderedDict()
+
+    def record(self, channel: str, event: bytes) -> None:
+        """Keep a MESSAGE_CREATED event; other events are ignored."""
+        if (seq := created_message_seq(event)) is None:
+            return
+        events = self._events.get(channel)
+        if events is None:
+            events = self._events[channel] = deque(maxlen=self.size)
+            if len(self._events) > self.max_channels:
+                self._events.popitem(last=False)
+        else:
+            self._events.move_to_end(channel)
+            if events and seq <= events[-1][0]:
+                return  # Already kept
+            if events and seq != events[-1][0] + 1:
+                events.clear()  # Events were missed; only the newer ones are complete
+        events.append((seq, event))
+
+    def last_seq(self, channel: str) -> int | None:
+        """Seq of the latest message created in the channel's thread, if any was received."""
+        events = self._events.get(channel)
+        return events[-1][0] if events else None
+
+    def since(self, channel: str, seq: int, last_seq: int) -> list[bytes] | None:
+        """Events after seq up to last_seq, or None unless all of them are kept."""
+        if seq >= last_seq:
+            return []
+        events = self._events.get(channel)
+        if not events or events[0][0] > seq + 1 or events[-1][0] < last_seq:
+            return None
+        return [event for event_seq, event in events if seq < event_seq <= last_seq]
+
+
+async def missed_messages(
+    transaction: AsyncSession, replay_buffer: MessageReplayBuffer, thread_id: int, since: int
+) -> tuple[list[bytes | str], int]:
+    """Encoded events for the messages of a thread created after since.
+
+    Returns:
+        The events to send, and the seq of the last message they cover
+    """
+    last_seq = await transaction.scalar(select(Thread.last_seq).where(Thread.id == thread_id)) or 0
+    buffered = replay_buffer.since(get_thread_channel(thread_id), since, last_seq)
+    if buffered is not None:
+        return list(buffered), last_seq
+
+    if last_seq - since > REPLAY_MAX_MESSAGES:
+        resync = ServerMessage(
+            message_type=ThreadSocketMessageType.RESYNC,
+            thread_id=sqid_encode(thread_id),
+            seq=last_seq,
+            viewers=[],
+        )
+        return [encode_server_message_str(resync)], last_seq
+
+    result = await transaction.execute(
+        select(Message.id, Message.user_id, Message.seq)
+        .where(
+            Message.thread_id == thread_id,
+            Message.seq > since,
+            Message.seq <= last_seq,
+            Message.deleted_at.is_(None),
+        )
+        .order_by(Message.seq)
+    )
+    return [
+        encode_server_message_str(
+            ServerMessage(
+                message_type=ThreadSocketMessageType.MESSAGE_CREATED,
+                message_id=sqid_encode(row.id),
+                thread_id=sqid_encode(thread_id),
+                user_id=sqid_encode(row.user_id or 0),
+                seq=row.seq,
+                viewers=[],
+            )
+        )
+        for row in result
+    ], last_seq
+
+
+class ResumeGate:
+    """Holds a resuming socket's live events until its missed messages are sent.
+
+    Live MESSAGE_CREATED events for messages the replay already covered are dropped.
+    """
+
+    def __init__(self, send_event: Callable[[bytes], Awaitable[None]]) -> None:
+        self.send_event = send_event
+        self.replayed_seq = 0
+        self._open = asyncio.Event()
+
+    async def send(self, event: bytes) -> None:
+        await self._open.wait()
+        seq = created_message_seq(event)
+        if seq is not None and seq <= self.replayed_seq:
+            return
+        await self.send_event(event)
+
+    def open(self, replayed_seq: int) -> None:
+        self.replayed_seq = replayed_seq
+        self._open.set()
@@ -6,7 +6,7 @@ from typing import Annotated
 from litestar import Request, Router, get, post
 from litestar.channels import ChannelsPlugin
 from litestar.params import Parameter
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -14,6 +14,7 @@ from app.auth.guards import requires_scoped_session
 from app.objects.enums import ObjectTypes
 from app.threads.enums import ThreadSocketMessageType
 from app.threads.models import Message, Thread
+from app.threads.read_receipts import ReadReceipts
 from app.threads.schemas import (
     BatchUnreadRequest,
     BatchUnreadResponse,
@@ -26,9 +27,8 @@ from app.threads.schemas import (
 )
 from app.threads.services import (
     get_batch_unread_counts,
-    get_or_create_thread,
-    mark_thread_as_read,
-    notify_thread,
+    get_or_create_thread_id,
+    notify_thread_after_commit,
 )
 from app.users.models import User
 from app.utils.db import get_or_404
@@ -56,10 +56,11 @@ async def create_message(
     team_id: int,
     campaign_id: int | None,
     channels: ChannelsPlugin,
+    read_receipts: ReadReceipts,
 ) -> MessageSchema:
     user = await get_or_404(transaction, User, request.user)
     # Get or create thread
-    thread = await get_or_create_thread(
+    thread_id = await get_or_create_thread_id(
         transaction=transaction,
         threadable_type=threadable_type,
         threadable_id=threadable_id,
@@ -68,7 +69,7 @@ async def create_message(
 
     # Create message
     message = Message(
-        thread_id=thread.id,
+        thread_id=thread_id,
         user_id=user.id,
         content=data.content,
         team_id=team_id,
@@ -78,22 +79,24 @@ async def create_message(
     await transaction.flush()
 
     # Mark thread as read for the sender (user's own messages shouldn't count as unread)
-    await mark_thread_as_read(transaction, thread.id, user.id)
+    read_receipts.mark_after_commit(transaction, thread_id, user.id, message.seq)
 
-    # Notify WebSocket subscribers via Channels
-    await notify_thread(
+    # Notify WebSocket subscribers via Channels once the message is committed
+    notify_thread_after_commit(
+        transaction,
         channels,
-        thread.id,
+        thread_id,
         ServerMessage(
             message_type=ThreadSocketMessageType.MESSAGE_CREATED,
             message_id=sqid_encode(message.id),
-            thread_id=sqid_encode(thread.id),
+            thread_id=sqid_encode(thread_id),
             user_id=sqid_encode(user.id),
+            seq=message.seq,
             viewers=[],  # Empty - REST routes don't have viewer_store access
         ),
     )
 
-    logger.info(f"Created message {message.id} in thread {thread.id} ({threadable_type}:{threadable_id})")
+    logger.info(f"Created message {message.id} in thread {thread_id} ({threadable_type}:{threadable_id})")
 
     user_schema = MessageSenderSchema(
         id=user.id,  # Already a Sqid
@@ -104,12 +107,13 @@ async def create_message(
     # Construct response
     return MessageSchema(
         id=message.id,
-        thread_id=thread.id,
+        thread_id=thread_id,
         user_id=user.id,
         content=message.content,
         created_at=message.created_at,
         updated_at=message.updated_at,
         user=user_schema,
+        seq=message.seq,
     )
 
 
@@ -119,41 +123,47 @@ async def create_message(
 async def list_messages(
     threadable_type: ObjectTypes,
     threadable_id: Sqid,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
+    before: Annotated[int | None, Parameter(ge=1)] = None,
+    after: Annotated[int | None, Parameter(ge=0)] = None,
+    newest_first: bool = False,
     offset: Annotated[int, Parameter(ge=0)] = 0,
     limit: Annotated[int, Parameter(ge=1, le=100)] = 50,
 ) -> MessageListResponse:
-    stmt = (
-        select(Message)
-        .join(
-            Thread,
-            and_(
-                Message.thread_id == Thread.id,
-                Thread.threadable_type == threadable_type,
-                Thread.threadable_id == threadable_id,
-            ),
+    """List a thread's messages, oldest first or newest first.
+
+    Page with the seq of the last message received: before=<seq> with newest_first
+    loads older messages, after=<seq> loads newer ones. Each page is a range read on
+    the thread's (thread_id, seq) index.
+    """
+    thread_id = await read_transaction.scalar(
+        select(Thread.id).where(
+            Thread.threadable_type == threadable_type,
+            Thread.threadable_id == threadable_id,
         )
-        .where(Message.deleted_at.is_(None))
-        .order_by(Message.created_at.asc())
+    )
+    if thread_id is None:
+        return MessageListResponse(messages=[], offset=offset, limit=limit)
+
+    stmt = select(Message).where(Message.thread_id == thread_id, Message.deleted_at.is_(None))
+    if before is not None:
+        stmt = stmt.where(Message.seq < before)
+    if after is not None:
+        stmt = stmt.where(Message.seq > after)
+    stmt = (
+        stmt.order_by(Message.seq.desc() if newest_first else Message.seq.asc())
         .offset(offset)
-        .limit(limit)
-        .options(joinedload(Message.user), joinedload(Message.thread))
+        .limit(limit + 1)  # One more to tell if there are more
+        .options(joinedload(Message.user))
     )
 
-    result = await transaction.execute(stmt)
-    rows = result.scalars()
-
-    if not rows:
-        # No messages found
-        return MessageListResponse(
-            messages=[],
-            offset=offset,
-            limit=limit,
-        )
+    result = await read_transaction.execute(stmt)
+    messages = list(result.scalars())
+    has_more = len(messages) > limit
 
     # Convert to schemas
     message_schemas = []
-    for message in rows:
+    for message in messages[:limit]:
         # Default to Arive system user if user_id is null
         if message.user is None:
             user_schema = ARIVE_SYSTEM_USER
@@ -169,12 +179,13 @@ async def list_messages(
         message_schemas.append(
             MessageSchema(
                 id=message.id,  # Already a Sqid
-                thread_id=message.thread.id,  # Already a Sqid
+                thread_id=Sqid(thread_id),
                 user_id=user_id,
                 content=message.content,
                 created_at=message.created_at,
                 updated_at=message.updated_at,
                 user=user_schema,
+                seq=message.seq,
             )
         )
 
@@ -182,6 +193,7 @@ async def list_messages(
         messages=message_schemas,
         offset=offset,
         limit=limit,
+        has_more=has_more,
     )
 
 
@@ -31,6 +31,7 @@ class MessageSchema(BaseSchema):
     created_at: datetime
     updated_at: datetime
     user: MessageSenderSchema
+    seq: int  # Position in the thread, for paging with before/after
 
 
 # Request schemas
@@ -53,6 +54,8 @@ class MessageListResponse(BaseSchema):
     messages: list[MessageSchema]
     offset: int
     limit: int
+    # More messages past this page in the requested direction
+    has_more: bool = False
 
 
 class BatchUnreadRequest(BaseSchema):
@@ -109,9 +112,10 @@ class ServerMessage(Struct, frozen=True):
     - USER_LEFT: user_id, viewers
     - USER_FOCUS: user_id, viewers
     - USER_BLUR: user_id, viewers
-    - MESSAGE_CREATED: message_id, thread_id, user_id, viewers
-    - MESSAGE_UPDATED: message_id, thread_id, user_id, viewers
-    - MESSAGE_DELETED: message_id, thread_id, user_id, viewers
+    - MESSAGE_CREATED: message_id, thread_id, user_id, seq, viewers
+    - MESSAGE_UPDATED: message_id, thread_id, user_id, seq, viewers
+    - MESSAGE_DELETED: message_id, thread_id, user_id, seq, viewers
+    - RESYNC: thread_id, seq, viewers
     """
 
     message_type: ThreadSocketMessageType
@@ -119,3 +123,16 @@ class ServerMessage(Struct, frozen=True):
     user_id: str | None = None  # Sqid-encoded user ID
     message_id: str | None = None  # Sqid-encoded message ID
     thread_id: str | None = None  # Sqid-encoded thread ID
+    seq: int | None = None  # Message's position in the thread (latest position for RESYNC)
+
+
+class PresenceUpdate(Struct, frozen=True):
+    """Focus/blur changes of a thread's viewers since the previous update.
+
+    Sent instead of per-user USER_FOCUS/USER_BLUR messages to sockets connected with
+    ?presence=diff. Each user appears at most once, with their latest state.
+    """
+
+    message_type: ThreadSocketMessageType  # PRESENCE_UPDATE
+    focused: list[str]  # Sqid-encoded user IDs
+    blurred: list[str]  # Sqid-encoded user IDs
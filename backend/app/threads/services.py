@@ -1,116 +1,157 @@
 import logging
+from collections import OrderedDict
+from collections.abc import Collection
 from datetime import UTC, datetime
-from typing import cast
+from typing import TYPE_CHECKING
 
 from litestar.channels import ChannelsPlugin
-from litestar.stores.base import Store
-from litestar.stores.memory import MemoryStore
-from sqlalchemy import func, select
+from sqlalchemy import DateTime, Integer, Select, event, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
-from app.threads.models import Message, Thread, ThreadReadStatus
+from app.threads.models import Message, Thread, ThreadReadCursor
 from app.threads.schemas import (
     ServerMessage,
+    ThreadUnreadInfo,
 )
 from app.threads.utils import encode_server_message_str, get_thread_channel
+from app.utils.configure import config
+from app.utils.sqids import Sqid
 from app.utils.tracing import trace_operation
 
+if TYPE_CHECKING:
+    from app.base.threadable_mixin import ThreadableMixin
+
 logger = logging.getLogger(__name__)
 
 
-# ============================================================================
-# WebSocket Viewer Presence Management (In-Memory with MemoryStore)
-# ============================================================================
+class ThreadIdCache:
+    """Thread id of recently used objects, least recently used evicted first.
 
+    Threads are never deleted or moved to another object, so an entry can't go stale.
+    An entry also records the thread's team: it is only served to that team, as
+    row-level security would only show them the thread.
+    """
 
-class ThreadViewerStore:
-    def __init__(self, store: Store):
-        # N.B. When switching to use a redis backed store, we will have to handle serialization here
-        self.store: MemoryStore = cast(MemoryStore, store)
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._threads: OrderedDict[tuple[str, int], tuple[Sqid, int]] = OrderedDict()
 
-    def get_key(self, thread_id: int) -> str:
-        return f"thread_id_{thread_id}"
+    def get(self, threadable_type: str, threadable_id: int, team_id: int) -> Sqid | None:
+        key = (threadable_type, threadable_id)
+        cached = self._threads.get(key)
+        if cached is None or cached[1] != team_id:
+            return None
+        self._threads.move_to_end(key)
+        return cached[0]
 
-    async def get_viewers(self, thread_id: int) -> set[int]:
-        data = await self.store.get(self.get_key(thread_id))
-        return cast(set[int], data) if data else set()
+    def put(self, threadable_type: str, threadable_id: int, thread_id: Sqid, team_id: int) -> None:
+        self._threads[(threadable_type, threadable_id)] = (thread_id, team_id)
+        self._threads.move_to_end((threadable_type, threadable_id))
+        if len(self._threads) > self.size:
+            self._threads.popitem(last=False)
 
-    async def add_viewer(self, thread_id: int, user_id: int) -> set[int]:
-        viewers = await self.get_viewers(thread_id)
-        viewers.add(user_id)
-        await self.store.set(self.get_key(thread_id), cast(bytes, viewers))
-        return viewers
+    def clear(self) -> None:
+        self._threads.clear()
 
-    async def remove_viewer(self, thread_id: int, user_id: int) -> set[int]:
-        viewers = await self.get_viewers(thread_id)
-        viewers.discard(user_id)
-        await self.store.set(self.get_key(thread_id), cast(bytes, viewers))
-        return viewers
 
+thread_ids = ThreadIdCache(config.THREAD_ID_CACHE_SIZE)
 
-@trace_operation("get_or_create_thread")
-async def get_or_create_thread(
+
+async def get_or_create_thread_id(
     transaction: AsyncSession,
     threadable_type: str,
     threadable_id: int,
     team_id: int,
-) -> Thread:
-    stmt = select(Thread).where(
-        Thread.threadable_type == threadable_type,
-        Thread.threadable_id == threadable_id,
-    )
-    result = await transaction.execute(stmt)
-    thread = result.scalar_one_or_none()
+) -> Sqid:
+    """Get the id of an object's thread, creating the thread on first use.
 
-    if thread:
-        return thread
+    Served from this process's ThreadIdCache when possible, without a query.
+    """
+    thread_id = thread_ids.get(threadable_type, threadable_id, team_id)
+    if thread_id is None:
+        thread_id = await _upsert_thread(transaction, threadable_type, threadable_id, team_id)
+    return thread_id
 
-    # Create new thread
-    thread = Thread(
-        threadable_type=threadable_type,
-        threadable_id=threadable_id,
-        team_id=team_id,
-    )
-    transaction.add(thread)
-    await transaction.flush()
 
-    logger.info(f"Created new thread for {threadable_type}:{threadable_id} (thread_id={thread.id})")
+@trace_operation("get_or_create_thread")
+async def _upsert_thread(
+    transaction: AsyncSession,
+    threadable_type: str,
+    threadable_id: int,
+    team_id: int,
+) -> Sqid:
+    """Insert the object's thread, or lock and return the existing one, in one statement.
 
-    return thread
+    A thread created concurrently is waited for and returned instead of violating
+    uq_thread_per_object. The no-op DO UPDATE (rather than DO NOTHING) makes the
+    existing row visible to RETURNING. Postgres leaves xmax at 0 on rows it inserted.
+    """
+    stmt = insert(Thread).values(threadable_type=threadable_type, threadable_id=threadable_id, team_id=team_id)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_thread_per_object",
+        set_={"threadable_type": stmt.excluded.threadable_type},
+    ).returning(Thread.id, Thread.team_id, literal_column("xmax = 0").label("created"))
+    row = (await transaction.execute(stmt)).one()
+
+    if row.created:
+        logger.info(f"Created new thread for {threadable_type}:{threadable_id} (thread_id={row.id})")
+        # The thread only exists if the transaction commits
+        event.listen(
+            transaction.sync_session,
+            "after_commit",
+            lambda _: thread_ids.put(threadable_type, threadable_id, row.id, row.team_id),
+            once=True,
+        )
+    else:
+        thread_ids.put(threadable_type, threadable_id, row.id, row.team_id)
+    return row.id
 
 
-async def get_unread_count(
-    session: AsyncSession,
-    thread_id: int,
-    user_id: int,
-) -> int:
-    # Get user's most recent read timestamp
-    last_read_stmt = select(func.max(ThreadReadStatus.read_at)).where(
-        ThreadReadStatus.thread_id == thread_id,
-        ThreadReadStatus.user_id == user_id,
-    )
-    result = await session.execute(last_read_stmt)
-    last_read_at = result.scalar_one_or_none()
+def _unread_count_column() -> ColumnElement[int]:
+    """Unread messages of a thread joined (outer) with the user's ThreadReadCursor.
 
-    # Build query for unread messages
-    query = (
+    Messages after the cursor (Thread.last_seq - cursor seq), less those deleted since;
+    deleted messages are rare and counted from a partial index.
+    """
+    cursor_seq = func.coalesce(ThreadReadCursor.seq, 0)
+    deleted_unread = (
         select(func.count())
         .select_from(Message)
         .where(
-            Message.thread_id == thread_id,
-            Message.deleted_at.is_(None),  # Exclude soft-deleted messages
+            Message.thread_id == Thread.id,
+            Message.seq > cursor_seq,
+            Message.deleted_at.is_not(None),
         )
+        .correlate(Thread, ThreadReadCursor)
+        .scalar_subquery()
     )
+    return Thread.last_seq - cursor_seq - deleted_unread
+
 
-    if last_read_at:
-        # Count messages created after last read
-        query = query.where(Message.created_at > last_read_at)
-    # else: all messages are unread (user has never read this thread)
+def _unread_counts_query(user_id: int) -> Select[tuple[Sqid, int]]:
+    return (
+        select(Thread.id, _unread_count_column().label("unread_count"))
+        .select_from(Thread)
+        .outerjoin(
+            ThreadReadCursor,
+            (ThreadReadCursor.thread_id == Thread.id) & (ThreadReadCursor.user_id == user_id),
+        )
+        .where(Thread.deleted_at.is_(None))
+        # Deleted messages are counted on purpose; threads are filtered above
+        .execution_options(include_deleted=True)
+    )
 
-    result = await session.execute(query)
-    count = result.scalar_one()
 
-    return count
+async def get_unread_count(
+    session: AsyncSession,
+    thread_id: int,
+    user_id: int,
+) -> int:
+    result = await session.execute(_unread_counts_query(user_id).where(Thread.id == thread_id))
+    row = result.one_or_none()
+    return row.unread_count if row else 0
 
 
 async def get_batch_unread_counts(
@@ -128,50 +169,56 @@ async def get_batch_unread_counts(
         user_id: User ID
 
     Returns:
-        Dict mapping threadable_id -> (thread_id, unread_count)
-        Returns (None, 0) for objects without threads
+        (thread_id, unread_count) for each object that has a thread
     """
-    # Subquery to get MAX(read_at) per thread for this user
-    max_read_subq = (
-        select(
-            ThreadReadStatus.thread_id,
-            func.max(ThreadReadStatus.read_at).label("last_read_at"),
-        )
-        .where(ThreadReadStatus.user_id == user_id)
-        .group_by(ThreadReadStatus.thread_id)
-        .subquery()
+    stmt = _unread_counts_query(user_id).where(
+        Thread.threadable_type == threadable_type,
+        Thread.threadable_id.in_(threadable_ids),
     )
+    result = await session.execute(stmt)
+    return [(row.id, row.unread_count) for row in result]
+
+
+async def get_thread_unread_infos(
+    session: AsyncSession,
+    threadable_type: str,
+    threadable_ids: Collection[int],
+    user_id: int,
+) -> dict[int, ThreadUnreadInfo]:
+    """Get the thread unread info of many objects in a single aggregate query.
 
-    # Single query to get all thread info and unread counts
-    # Left join max_read_subq to get last_read_at for each thread
-    # Count messages where created_at > last_read_at (or all messages if never read)
+    Args:
+        session: Database session
+        threadable_type: Table name of the objects (e.g., "campaigns")
+        threadable_ids: Object IDs
+        user_id: User ID
+
+    Returns:
+        ThreadUnreadInfo by object ID; objects without a thread are left out
+    """
+    if not threadable_ids:
+        return {}
     stmt = (
-        select(
-            Thread.id.label("thread_id"),
-            max_read_subq.c.last_read_at,
-            func.count(Message.id).label("unread_count"),
-        )
-        .select_from(Thread)
-        .outerjoin(max_read_subq, max_read_subq.c.thread_id == Thread.id)
-        .outerjoin(
-            Message,
-            (Message.thread_id == Thread.id)
-            & (Message.deleted_at.is_(None))
-            & (
-                # Message is unread if created after last_read_at OR never read
-                (max_read_subq.c.last_read_at.is_(None)) | (Message.created_at > max_read_subq.c.last_read_at)
-            ),
-        )
+        _unread_counts_query(user_id)
+        .add_columns(Thread.threadable_id)
         .where(
             Thread.threadable_type == threadable_type,
             Thread.threadable_id.in_(threadable_ids),
         )
-        .group_by(Thread.id, max_read_subq.c.last_read_at)
     )
-
     result = await session.execute(stmt)
-    rows = result.all()
-    return [(row.thread_id, row.unread_count) for row in rows]
+    return {row.threadable_id: ThreadUnreadInfo(thread_id=row.id, unread_count=row.unread_count) for row in result}
+
+
+async def get_thread_unread_info(
+    session: AsyncSession,
+    obj: "ThreadableMixin",
+    user_id: int,
+) -> ThreadUnreadInfo | None:
+    """Get the thread unread info of one object, or None if it has no thread yet."""
+    object_id: int = obj.id  # type: ignore[attr-defined]
+    infos = await get_thread_unread_infos(session, obj.threadable_type(), [object_id], user_id)
+    return infos.get(object_id)
 
 
 async def mark_thread_as_read(
@@ -181,7 +228,7 @@ async def mark_thread_as_read(
 ) -> None:
     """Mark all messages in a thread as read for a user.
 
-    Appends a new read event to the log.
+    Moves the user's read cursor to the thread's latest message (never backwards).
 
     Args:
         session: Database session
@@ -190,24 +237,26 @@ async def mark_thread_as_read(
     """
     now = datetime.now(tz=UTC)
 
-    # Simple INSERT - append-only log
-    read_status = ThreadReadStatus(
-        thread_id=thread_id,
-        user_id=user_id,
-        read_at=now,
+    stmt = insert(ThreadReadCursor).from_select(
+        ["thread_id", "user_id", "seq", "read_at"],
+        select(Thread.id, literal(user_id, Integer), Thread.last_seq, literal(now, DateTime(timezone=True))).where(
+            Thread.id == thread_id
+        ),
     )
-    session.add(read_status)
-    await session.flush()
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_thread_read_cursor",
+        set_={
+            "seq": func.greatest(ThreadReadCursor.seq, stmt.excluded.seq),
+            "read_at": stmt.excluded.read_at,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
 
     logger.info(f"Marked thread {thread_id} as read for user {user_id}")
 
 
-@trace_operation("send_thread_notification")
-async def notify_thread(
-    channels: ChannelsPlugin,
-    thread_id: int,
-    message: ServerMessage,
-) -> None:
+def _publish_to_thread(channels: ChannelsPlugin, thread_id: int, message: ServerMessage) -> None:
     try:
         channels.publish(
             encode_server_message_str(message),
@@ -216,3 +265,31 @@ async def notify_thread(
         logger.debug(f"Notified thread {thread_id}: {message}")
     except Exception as e:
         logger.warning(f"Failed to notify thread {thread_id}: {e}")
+
+
+@trace_operation("send_thread_notification")
+async def notify_thread(
+    channels: ChannelsPlugin,
+    thread_id: int,
+    message: ServerMessage,
+) -> None:
+    _publish_to_thread(channels, thread_id, message)
+
+
+def notify_thread_after_commit(
+    transaction: AsyncSession,
+    channels: ChannelsPlugin,
+    thread_id: int,
+    message: ServerMessage,
+) -> None:
+    """Notify the thread once the transaction commits, e.g. of a message it created.
+
+    A MESSAGE_CREATED published before the commit could announce a message that is
+    rolled back, whose seq the next message then reuses.
+    """
+    event.listen(
+        transaction.sync_session,
+        "after_commit",
+        lambda _: _publish_to_thread(channels, thread_id, message),
+        once=True,
+    )
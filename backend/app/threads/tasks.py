@@ -0,0 +1,101 @@
+"""Thread-related background tasks."""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.queue.registry import scheduled_task
+from app.queue.transactions import task_transaction
+from app.queue.types import AppContext
+
+__all__ = ["compact_thread_read_log", "compact_thread_read_log_batch"]
+
+logger = logging.getLogger(__name__)
+
+READ_LOG_COMPACTION_BATCH_SIZE = 5_000
+READ_LOG_COMPACTION_MAX_BATCHES = 200
+
+# Deletes a batch of the legacy thread_read_statuses log, which the thread_read_cursors
+# migration already folded into the read cursors. Rows still logged by app servers
+# running the previous release are folded too: a read at read_at covers the messages
+# created up to then. Cursors only move forward, so rows can be folded in any order,
+# and the job can run while users read threads.
+_COMPACT_READ_LOG_BATCH = text(
+    """
+    WITH batch AS (
+        DELETE FROM thread_read_statuses
+        WHERE ctid = ANY(ARRAY(
+            SELECT ctid FROM thread_read_statuses
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        ))
+        RETURNING thread_id, user_id, read_at
+    ),
+    latest AS (
+        SELECT thread_id, user_id, max(read_at) AS read_at
+        FROM batch
+        GROUP BY thread_id, user_id
+    ),
+    cursors AS (
+        INSERT INTO thread_read_cursors (thread_id, user_id, seq, read_at)
+        SELECT
+            latest.thread_id,
+            latest.user_id,
+            COALESCE(
+                (
+                    SELECT max(messages.seq) FROM messages
+                    WHERE messages.thread_id = latest.thread_id AND messages.created_at <= latest.read_at
+                ),
+                0
+            ),
+            latest.read_at
+        FROM latest
+        ON CONFLICT ON CONSTRAINT uq_thread_read_cursor DO UPDATE
+        SET seq = GREATEST(thread_read_cursors.seq, EXCLUDED.seq),
+            read_at = GREATEST(thread_read_cursors.read_at, EXCLUDED.read_at),
+            updated_at = now()
+        RETURNING 1
+    )
+    SELECT count(*) FROM batch
+    """
+)
+
+
+async def compact_thread_read_log_batch(transaction: AsyncSession, *, batch_size: int) -> int:
+    """Fold up to batch_size read log rows into the read cursors.
+
+    Returns:
+        Number of log rows folded and deleted
+    """
+    return await transaction.scalar(_COMPACT_READ_LOG_BATCH, {"batch_size": batch_size}) or 0
+
+
+@scheduled_task(cron="*/30 * * * *", timeout=600)
+async def compact_thread_read_log(ctx: AppContext) -> dict:
+    """Delete the legacy read log, folding rows the migration didn't see into the read cursors.
+
+    Runs every 30 minutes and is a no-op once the log is empty. Each batch commits in
+    its own short transaction; a backlog larger than READ_LOG_COMPACTION_MAX_BATCHES
+    batches is finished by the next run.
+
+    Args:
+        ctx: SAQ task context
+
+    Returns:
+        Dictionary with compaction statistics
+    """
+    rows_compacted = 0
+    batches = 0
+
+    while batches < READ_LOG_COMPACTION_MAX_BATCHES:
+        async with task_transaction(ctx["db_sessionmaker"]) as transaction:
+            compacted = await compact_thread_read_log_batch(transaction, batch_size=READ_LOG_COMPACTION_BATCH_SIZE)
+        rows_compacted += compacted
+        batches += 1
+        if compacted < READ_LOG_COMPACTION_BATCH_SIZE:
+            break
+
+    result = {"rows_compacted": rows_compacted, "batches": batches}
+    logger.info(f"Thread read log compaction completed: {result}")
+    return result
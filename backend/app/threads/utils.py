@@ -1,6 +1,18 @@
 import msgspec
 
-from app.threads.schemas import ClientMessage, ServerMessage
+from app.threads.enums import ThreadSocketMessageType
+from app.threads.schemas import ClientMessage, PresenceUpdate, ServerMessage
+from app.utils.sqids import sqid_encode
+
+
+class _ServerMessageHeader(msgspec.Struct):
+    message_type: ThreadSocketMessageType
+    user_id: str | None = None
+    seq: int | None = None
+
+
+_header_decoder = msgspec.json.Decoder(_ServerMessageHeader)
+_presence_update_decoder = msgspec.json.Decoder(PresenceUpdate)
 
 
 def get_thread_channel(thread_id: int) -> str:
@@ -15,3 +27,57 @@ def decode_client_message(data: bytes | str) -> ClientMessage:
 
 def encode_server_message_str(message: ServerMessage) -> str:
     return msgspec.json.Encoder().encode(message).decode("utf-8")
+
+
+def thread_event_coalesce_key(event: bytes) -> str | None:
+    """Coalesce key of an encoded ServerMessage for slow sockets.
+
+    A user's join and leave events supersede their earlier ones; message events are
+    never coalesced. Focus and blur travel as PresenceUpdate diffs, which aren't either.
+    """
+    try:
+        header = _header_decoder.decode(event)
+    except msgspec.MsgspecError:
+        return None
+    match header.message_type:
+        case ThreadSocketMessageType.USER_JOINED | ThreadSocketMessageType.USER_LEFT:
+            return f"presence:{header.user_id}"
+    return None
+
+
+def thread_resync_event(thread_id: int) -> bytes:
+    """RESYNC event telling a socket that fell behind to refetch the thread's messages."""
+    message = ServerMessage(message_type=ThreadSocketMessageType.RESYNC, thread_id=sqid_encode(thread_id), viewers=[])
+    return msgspec.json.encode(message)
+
+
+def created_message_seq(event: bytes | str) -> int | None:
+    """Seq of the message of an encoded MESSAGE_CREATED ServerMessage, else None."""
+    try:
+        header = _header_decoder.decode(event)
+    except msgspec.MsgspecError:
+        return None
+    return header.seq if header.message_type == ThreadSocketMessageType.MESSAGE_CREATED else None
+
+
+def decode_presence_update(event: bytes | str) -> PresenceUpdate | None:
+    """Decode a channel event if it is a PresenceUpdate."""
+    try:
+        header = _header_decoder.decode(event)
+        if header.message_type != ThreadSocketMessageType.PRESENCE_UPDATE:
+            return None
+        return _presence_update_decoder.decode(event)
+    except msgspec.MsgspecError:
+        return None
+
+
+def expand_presence_update(update: PresenceUpdate, viewers: list[str]) -> list[str]:
+    """Encode a PresenceUpdate as the per-user messages of clients that don't take diffs."""
+    messages = [
+        ServerMessage(message_type=ThreadSocketMessageType.USER_FOCUS, user_id=user_id, viewers=viewers)
+        for user_id in update.focused
+    ] + [
+        ServerMessage(message_type=ThreadSocketMessageType.USER_BLUR, user_id=user_id, viewers=viewers)
+        for user_id in update.blurred
+    ]
+    return [encode_server_message_str(message) for message in messages]
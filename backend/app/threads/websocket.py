@@ -1,25 +1,30 @@
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from functools import partial
 
 import msgspec
 from litestar import WebSocket
 from litestar.channels import ChannelsPlugin
 from litestar.exceptions import WebSocketDisconnect
 from litestar.handlers import websocket_listener
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
 from app.auth.guards import requires_scoped_session
 from app.objects.enums import ObjectTypes
 from app.threads.enums import ThreadSocketMessageType
+from app.threads.models import Thread
+from app.threads.presence import PresenceBroadcaster, ThreadViewerStore
+from app.threads.read_receipts import ReadReceipts
+from app.threads.replay import MessageReplayBuffer, ResumeGate, missed_messages
 from app.threads.schemas import ClientMessage, ServerMessage
 from app.threads.services import (
-    ThreadViewerStore,
-    get_or_create_thread,
-    mark_thread_as_read,
+    get_or_create_thread_id,
     notify_thread,
 )
-from app.threads.utils import get_thread_channel
+from app.threads.utils import decode_presence_update, expand_presence_update, get_thread_channel, thread_resync_event
+from app.utils.channel_hub import ChannelHub
+from app.utils.db import SocketTransactions
 from app.utils.sqids import Sqid, sqid_encode
 
 logger = logging.getLogger(__name__)
@@ -30,29 +35,56 @@ logger = logging.getLogger(__name__)
 # ============================================================================
 
 
+async def send_expanding_presence(
+    socket: WebSocket, viewer_store: ThreadViewerStore, thread_id: int, event: bytes
+) -> None:
+    """Send a channel event, as per-user focus/blur messages if it is a PresenceUpdate."""
+    if (update := decode_presence_update(event)) is None:
+        await socket.send_text(event)
+        return
+    viewers = [sqid_encode(viewer) for viewer in viewer_store.get_viewers(thread_id)]
+    for message in expand_presence_update(update, viewers):
+        await socket.send_text(message)
+
+
+def resume_seq(socket: WebSocket) -> int | None:
+    """Last message seq the client saw, from ?since=<seq> on reconnect."""
+    try:
+        return max(0, int(socket.query_params["since"]))
+    except (KeyError, ValueError):
+        return None
+
+
 @asynccontextmanager
 async def thread_connection_lifespan(
     socket: WebSocket,
     channels: ChannelsPlugin,
+    thread_hub: ChannelHub,
+    replay_buffer: MessageReplayBuffer,
+    read_receipts: ReadReceipts,
     threadable_type: ObjectTypes,
     threadable_id: Sqid,
-    transaction: AsyncSession,
+    socket_transactions: SocketTransactions,
     viewer_store: ThreadViewerStore,
     team_id: int,
 ) -> AsyncGenerator[None]:
-    thread = await get_or_create_thread(
-        transaction=transaction,
-        threadable_type=threadable_type,
-        threadable_id=threadable_id,
-        team_id=team_id,
-    )
+    # Short-lived transaction: the socket must not hold a DB connection while it's open
+    async with socket_transactions() as transaction:
+        thread_id = await get_or_create_thread_id(
+            transaction=transaction,
+            threadable_type=threadable_type,
+            threadable_id=threadable_id,
+            team_id=team_id,
+        )
+        # Latest message the client can have seen, for MARK_READ
+        last_seq = await transaction.scalar(select(Thread.last_seq).where(Thread.id == thread_id)) or 0
 
     user_id = socket.user
-    viewer_ids = await viewer_store.add_viewer(thread.id, user_id)
+    viewer_ids = await viewer_store.add_viewer(thread_id, user_id)
 
     await notify_thread(
         channels,
-        thread.id,
+        thread_id,
         ServerMessage(
             message_type=ThreadSocketMessageType.USER_JOINED,
             user_id=sqid_encode(user_id),
@@ -60,22 +92,46 @@ async def thread_connection_lifespan(
         ),
     )
 
-    logger.info(f"WebSocket connected: user {user_id} -> thread {thread.id}")
+    logger.info(f"WebSocket connected: user {user_id} -> thread {thread_id}")
 
-    async with (
-        channels.start_subscription([get_thread_channel(thread.id)]) as subscriber,
-        subscriber.run_in_background(socket.send_text),
+    # Clients connecting with ?presence=diff take PresenceUpdates as they are
+    if socket.query_params.get("presence") == "diff":
+        send_event = socket.send_text
+    else:
+        send_event = partial(send_expanding_presence, socket, viewer_store, thread_id)
+
+    # A resuming client gets the messages it missed before any live event
+    since = resume_seq(socket)
+    gate = ResumeGate(send_event)
+
+    # One process-wide subscription per thread; this socket gets a bounded queue
+    async with thread_hub.stream(
+        get_thread_channel(thread_id),
+        gate.send if since is not None else send_event,
+        resync=thread_resync_event(thread_id),
     ):
         try:
+            if since is not None:
+                # Subscribed first, so messages created meanwhile arrive live
+                async with socket_transactions() as transaction:
+                    events, replayed_seq = await missed_messages(transaction, replay_buffer, thread_id, since)
+                for event in events:
+                    await socket.send_text(event)
+                gate.open(replayed_seq)
+                last_seq = max(last_seq, replayed_seq)
+
             # Store connection state for handler
-            socket.state["thread_id"] = thread.id
+            socket.state["thread_id"] = thread_id
             socket.state["user_id"] = user_id
+            socket.state["last_seq"] = last_seq
             yield
         except WebSocketDisconnect:
             pass
         finally:
-            # Remove viewer from MemoryStore and get updated list
-            viewer_ids = await viewer_store.remove_viewer(thread.id, user_id)
+            await read_receipts.flush_for(thread_id, user_id)
+
+            # Remove viewer (on every app server) and get updated list
+            viewer_ids = await viewer_store.remove_viewer(thread_id, user_id)
 
             # Notify other users that someone left
             left_message = ServerMessage(
@@ -84,9 +140,9 @@ async def thread_connection_lifespan(
                 viewers=[sqid_encode(viewer) for viewer in viewer_ids],
             )
 
-            await notify_thread(channels, thread.id, left_message)
+            await notify_thread(channels, thread_id, left_message)
 
-            logger.info(f"WebSocket disconnected: user {user_id} from thread {thread.id}")
+            logger.info(f"WebSocket disconnected: user {user_id} from thread {thread_id}")
 
 
 @websocket_listener(
@@ -96,10 +152,10 @@ async def thread_connection_lifespan(
 )
 async def thread_handler(
     data: dict,
-    channels: ChannelsPlugin,
     socket: WebSocket,
-    transaction: AsyncSession,
-    viewer_store: ThreadViewerStore,
+    presence_broadcaster: PresenceBroadcaster,
+    replay_buffer: MessageReplayBuffer,
+    read_receipts: ReadReceipts,
 ) -> None:
     thread_id: int = socket.state["thread_id"]
     user_id: int = socket.state["user_id"]
@@ -108,16 +164,11 @@ async def thread_handler(
     # Route to appropriate handler based on message type
     match message.message_type:
         case ThreadSocketMessageType.USER_FOCUS | ThreadSocketMessageType.USER_BLUR:
-            viewer_ids = await viewer_store.add_viewer(thread_id, user_id)
-            await notify_thread(
-                channels,
-                thread_id,
-                ServerMessage(
-                    message_type=message.message_type,
-                    user_id=sqid_encode(user_id),
-                    viewers=[sqid_encode(viewer) for viewer in viewer_ids],
-                ),
+            # Batched per thread, so bursts of tab switching broadcast once
+            presence_broadcaster.update(
+                thread_id, user_id, focused=message.message_type == ThreadSocketMessageType.USER_FOCUS
             )
         case ThreadSocketMessageType.MARK_READ:
-            await mark_thread_as_read(transaction, thread_id, user_id)
-            await transaction.commit()
+            # Up to the latest message sent to the thread's sockets; written with the next batch
+            seq = max(socket.state["last_seq"], replay_buffer.last_seq(get_thread_channel(thread_id)) or 0)
+            read_receipts.mark(thread_id, user_id, seq)
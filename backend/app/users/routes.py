@@ -20,12 +20,12 @@ from app.utils.sqids import Sqid
 
 @get("/", guards=[requires_team])
 async def list_users(
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
     team_id: int,
 ) -> list[UserAndRoleSchema]:
     # Query users who are members of this team via Role table
     stmt = select(User, Role).where(Role.team_id == team_id).join(Role, Role.user_id == User.id)
-    result = await transaction.execute(stmt)
+    result = await read_transaction.execute(stmt)
     rows = result.all()
 
     return [
@@ -44,12 +44,14 @@ async def list_users(
 
 
 @get("/current_user")
-async def get_current_user(request: Request, transaction: AsyncSession, action_registry: ActionRegistry) -> UserSchema:
+async def get_current_user(
+    request: Request, read_transaction: AsyncSession, action_registry: ActionRegistry
+) -> UserSchema:
     """Get current authenticated user information."""
     user_id: int = request.user
 
     stmt = select(User).where(User.id == user_id)
-    result = await transaction.execute(stmt)
+    result = await read_transaction.execute(stmt)
     user = result.scalar_one()
 
     # Compute actions for this user
@@ -69,9 +71,9 @@ async def get_current_user(request: Request, transaction: AsyncSession, action_r
 
 
 @get("/{user_id:str}")
-async def get_user(user_id: Sqid, transaction: AsyncSession, action_registry: ActionRegistry) -> UserSchema:
+async def get_user(user_id: Sqid, read_transaction: AsyncSession, action_registry: ActionRegistry) -> UserSchema:
     """Get a user by ID - requires authentication."""
-    user = await get_or_404(transaction, User, user_id)
+    user = await get_or_404(read_transaction, User, user_id)
 
     # Compute actions for this user
     action_group = action_registry.get_class(ActionGroupType.UserActions)
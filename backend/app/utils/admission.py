@@ -0,0 +1,262 @@
+"""Per-team admission control.
+
+Each request of a scoped session is admitted under its team (or campaign, for
+campaign-scoped sessions) and its route's admission class:
+
+- light: CRUD and detail routes (the default)
+- dashboard: object lists and time series, which dashboards request once per widget,
+  all at once
+- heavy: other report queries (facets, boards, view counts)
+
+Each (team, class) pair has a concurrency limit and a token bucket (rate per second,
+burst). A request over either limit waits up to its class's max wait (by default
+ADMISSION_MAX_WAIT_SECONDS) for its turn, and is then rejected with 429 and
+Retry-After. The dashboard class takes a whole dashboard's requests in its burst and
+lets them wait longer, so they queue for its slots instead of failing. Since the
+limits are per team, a team running many heavy requests queues behind its own slots
+instead of filling the connection pool for every other team.
+
+Routes select their class with opt={ADMISSION_CLASS_OPT: "heavy"}. The limits can be
+overridden with ADMISSION_LIMITS, e.g. "light=20:20:40,heavy=4:2:8,dashboard=8:10:60:30"
+(concurrency:rate:burst[:max wait in seconds]).
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Self
+
+from litestar.enums import ScopeType
+from litestar.exceptions import TooManyRequestsException
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Receive, Scope, Send
+from opentelemetry import metrics  # type: ignore[import-untyped]
+
+from app.utils.configure import ConfigProtocol, config
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+rejected_counter = meter.create_counter("admission.rejected", description="Requests rejected by admission control")
+wait_time_histogram = meter.create_histogram(
+    "admission.wait_time", unit="ms", description="Time requests waited for admission"
+)
+
+# Route handler/router opt selecting the admission class
+ADMISSION_CLASS_OPT = "admission_class"
+DEFAULT_ADMISSION_CLASS = "light"
+# Idle limiters are dropped at most this often
+SWEEP_INTERVAL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    """Concurrent requests, and request rate (per second, with burst), allowed per team.
+
+    max_wait overrides the controller's maximum wait for a slot or token.
+    """
+
+    concurrency: int
+    rate: float
+    burst: int
+    max_wait: float | None = None
+
+
+DEFAULT_LIMITS: dict[str, AdmissionLimits] = {
+    "light": AdmissionLimits(concurrency=20, rate=20, burst=40),
+    "heavy": AdmissionLimits(concurrency=4, rate=2, burst=8),
+    # A dashboard sends one request per widget at once
+    "dashboard": AdmissionLimits(concurrency=8, rate=10, burst=60, max_wait=30),
+}
+
+
+def parse_limits(value: str) -> dict[str, AdmissionLimits]:
+    """Parse "class=concurrency:rate:burst[:max_wait],..." into limits."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, sizes = item.partition("=")
+        concurrency, rate, burst, *max_wait = sizes.split(":")
+        limits[name.strip()] = AdmissionLimits(
+            concurrency=int(concurrency),
+            rate=float(rate),
+            burst=int(burst),
+            max_wait=float(max_wait[0]) if max_wait else None,
+        )
+    return limits
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request can't be admitted within the maximum wait."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Request rejected by admission control ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Limiter:
+    """Concurrency slots and token bucket of one team and admission class."""
+
+    def __init__(self, limits: AdmissionLimits) -> None:
+        self.limits = limits
+        self.active = 0
+        self.tokens = float(limits.burst)
+        self.refilled_at = time.monotonic()
+        self.waiters: deque[asyncio.Future[None]] = deque()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.limits.burst, self.tokens + (now - self.refilled_at) * self.limits.rate)
+        self.refilled_at = now
+
+    def is_idle(self) -> bool:
+        self.refill()
+        return self.active == 0 and not self.waiters and self.tokens >= self.limits.burst
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    """Admits requests per (key, admission class) within concurrency and rate limits."""
+
+    def __init__(self, limits: Mapping[str, AdmissionLimits], max_wait: float = 5) -> None:
+        self.limits = dict(limits)
+        self.max_wait = max_wait
+        self._limiters: dict[tuple[str, str], _Limiter] = {}
+        self._swept_at = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config: ConfigProtocol) -> Self:
+        return cls(DEFAULT_LIMITS | parse_limits(config.ADMISSION_LIMITS), config.ADMISSION_MAX_WAIT_SECONDS)
+
+    def _limiter(self, key: str, admission_class: str) -> _Limiter:
+        if admission_class not in self.limits:
+            raise ValueError(f"Unknown admission class: {admission_class}")
+        if time.monotonic() - self._swept_at > SWEEP_INTERVAL_SECONDS:
+            self._sweep()
+        limiter = self._limiters.get((key, admission_class))
+        if limiter is None:
+            limiter = self._limiters[key, admission_class] = _Limiter(self.limits[admission_class])
+        return limiter
+
+    def _sweep(self) -> None:
+        """Drop limiters back at their initial state."""
+        self._limiters = {k: limiter for k, limiter in self._limiters.items() if not limiter.is_idle()}
+        self._swept_at = time.monotonic()
+
+    async def acquire(self, key: str, admission_class: str = DEFAULT_ADMISSION_CLASS) -> None:
+        """Take one of key's slots for admission_class, waiting up to max_wait for it."""
+        limiter = self._limiter(key, admission_class)
+        max_wait = self.max_wait if limiter.limits.max_wait is None else limiter.limits.max_wait
+        start = time.monotonic()
+        attributes = {"admission_class": admission_class}
+        try:
+            await self._take_token(limiter, max_wait)
+            await self._take_slot(limiter, max_wait, deadline=start + max_wait)
+        except AdmissionRejectedError as exc:
+            rejected_counter.add(1, attributes | {"reason": exc.reason})
+            raise
+        finally:
+            wait_time_histogram.record((time.monotonic() - start) * 1000, attributes)
+
+    def release(self, key: str, admission_class: str = DEFAULT_ADMISSION_CLASS) -> None:
+        """Return a slot taken with acquire."""
+        self._limiters[key, admission_class].release()
+
+    async def _take_token(self, limiter: _Limiter, max_wait: float) -> None:
+        limiter.refill()
+        delay = max(0.0, (1 - limiter.tokens) / limiter.limits.rate)
+        if delay > max_wait:
+            raise AdmissionRejectedError("rate", retry_after=delay)
+        # Reserve the token now: requests arriving later queue behind this one
+        limiter.tokens -= 1
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _take_slot(self, limiter: _Limiter, max_wait: float, deadline: float) -> None:
+        if limiter.active < limiter.limits.concurrency and not limiter.waiters:
+            limiter.active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        limiter.waiters.append(waiter)
+        try:
+            async with asyncio.timeout(max(0.0, deadline - time.monotonic())):
+                await waiter
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                limiter.release()  # The slot was handed over as we gave up; pass it on
+            else:
+                waiter.cancel()
+            if isinstance(exc, TimeoutError):
+                raise AdmissionRejectedError("concurrency", retry_after=max_wait) from None
+            raise
+        finally:
+            if waiter in limiter.waiters:
+                limiter.waiters.remove(waiter)
+
+    def snapshot(self) -> dict[tuple[str, str], int]:
+        """Active requests per (key, admission class)."""
+        return {k: limiter.active for k, limiter in self._limiters.items() if limiter.active}
+
+
+def admission_key(session: Any) -> str | None:
+    """Key a session's requests are admitted under, or None for unscoped sessions."""
+    if not isinstance(session, Mapping):
+        return None
+    if team_id := session.get("team_id"):
+        return f"team:{team_id}"
+    if campaign_id := session.get("campaign_id"):
+        return f"campaign:{campaign_id}"
+    return None
+
+
+class AdmissionControlMiddleware(ASGIMiddleware):
+    """Admit scoped requests through the admission controller, or answer 429.
+
+    Must run after the session middleware, which puts the session in the scope.
+    """
+
+    scopes = (ScopeType.HTTP,)
+
+    def __init__(self, controller: AdmissionController | None = None) -> None:
+        self.controller = controller
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp) -> None:
+        key = admission_key(scope.get("session"))
+        if key is None:
+            await next_app(scope, receive, send)
+            return
+
+        controller = self.controller or admission_controller
+        admission_class = scope["route_handler"].opt.get(ADMISSION_CLASS_OPT, DEFAULT_ADMISSION_CLASS)
+        try:
+            await controller.acquire(key, admission_class)
+        except AdmissionRejectedError as exc:
+            logger.warning(
+                "Request rejected by admission control",
+                extra={"key": key, "admission_class": admission_class, "reason": exc.reason, "path": scope["path"]},
+            )
+            raise TooManyRequestsException(
+                detail="Too many concurrent requests, please retry shortly",
+                headers={"Retry-After": str(math.ceil(exc.retry_after))},
+            ) from exc
+
+        try:
+            await next_app(scope, receive, send)
+        finally:
+            controller.release(key, admission_class)
+
+
+admission_controller = AdmissionController.from_config(config)
@@ -0,0 +1,88 @@
+"""Cancel a request's running database queries when its client disconnects.
+
+Litestar keeps running a handler after the client has gone away, so an abandoned
+report query would hold its connection until it finishes or hits its statement
+timeout. CancelOnDisconnectMiddleware watches for http.disconnect while the request
+is handled and cancels the statements of every transaction the request opened
+(see track_session). The canceled statement raises QueryCanceled, which rolls the
+transaction back and returns the connection to the pool.
+"""
+
+import asyncio
+import contextlib
+import logging
+
+from litestar import Request
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Receive, ReceiveMessage, Scope, Send
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.db import cancel_running_query
+
+logger = logging.getLogger(__name__)
+
+# scope["state"] key holding the sessions whose queries are canceled on disconnect
+DB_SESSIONS_STATE_KEY = "db_sessions"
+
+# Request body messages read ahead of the app
+RECEIVE_QUEUE_SIZE = 1
+
+
+def track_session(request: Request, session: AsyncSession) -> None:
+    """Cancel the session's running query if the request's client disconnects."""
+    sessions: list[AsyncSession] | None = request.scope.get("state", {}).get(DB_SESSIONS_STATE_KEY)
+    if sessions is not None:
+        sessions.append(session)
+
+
+class CancelOnDisconnectMiddleware(ASGIMiddleware):
+    """Cancel the request's database queries once the client disconnects."""
+
+    scopes = (ScopeType.HTTP,)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp) -> None:
+        sessions: list[AsyncSession] = []
+        scope.setdefault("state", {})[DB_SESSIONS_STATE_KEY] = sessions  # type: ignore[typeddict-item]
+
+        # The watcher owns the server's receive; the app reads the messages it forwards.
+        # The queue is bounded so a streamed body is only read as fast as the app consumes
+        # it, and once the body is complete the only message left to wait for is the disconnect.
+        messages: asyncio.Queue[ReceiveMessage] = asyncio.Queue(maxsize=RECEIVE_QUEUE_SIZE)
+        disconnect: ReceiveMessage | None = None
+
+        async def watch() -> None:
+            nonlocal disconnect
+            more_body = True
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnect = message
+                    with contextlib.suppress(asyncio.QueueFull):
+                        # Wakes an app waiting on an empty queue; otherwise app_receive sees the flag
+                        messages.put_nowait(message)
+                    await self._cancel_queries(scope, sessions)
+                    return
+                if more_body:
+                    await messages.put(message)
+                    more_body = bool(message.get("more_body", False))
+
+        async def app_receive() -> ReceiveMessage:
+            if disconnect is not None and messages.empty():
+                return disconnect
+            return await messages.get()
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await next_app(scope, app_receive, send)
+        finally:
+            watcher.cancel()
+
+    @staticmethod
+    async def _cancel_queries(scope: Scope, sessions: list[AsyncSession]) -> None:
+        for session in sessions:
+            try:
+                if await cancel_running_query(session):
+                    logger.info("Canceled query after client disconnect", extra={"path": scope["path"]})
+            except Exception:
+                logger.exception("Failed to cancel query after client disconnect")
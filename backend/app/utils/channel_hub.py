@@ -0,0 +1,208 @@
+"""Process-wide channel subscriptions with in-process fan-out to WebSockets.
+
+Subscribing every socket to the ChannelsPlugin gives each socket its own unbounded
+queue, and LISTEN/UNLISTEN traffic that grows with sockets. ChannelHub holds a single
+plugin subscription per active channel (one LISTEN on the channels backend's listener
+connection) and copies each event to the bounded queue of every local socket on it.
+
+A socket that falls behind doesn't slow the others down. When its queue is full, the
+oldest event is dropped, and events with the same coalesce key (e.g. presence updates
+of one user) replace each other instead of queueing. Dropping an event without a key
+(e.g. a created message) loses information the client can't rebuild from later events,
+so the socket's resync event, if it has one, is sent next to make it refetch. A channel stays subscribed for
+LINGER_SECONDS after its last socket leaves, so reconnects don't cause LISTEN churn.
+An observer (e.g. a replay buffer) sees each event once, before it is fanned out.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager, suppress
+
+from litestar.channels import ChannelsPlugin, Subscriber
+from opentelemetry import metrics  # type: ignore[import-untyped]
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+dropped_counter = meter.create_counter("channels.hub.dropped", description="Events dropped for slow sockets")
+coalesced_counter = meter.create_counter(
+    "channels.hub.coalesced", description="Queued events replaced by a newer event with the same key"
+)
+
+LINGER_SECONDS = 30
+
+CoalesceKey = Callable[[bytes], str | None]
+Observer = Callable[[str, bytes], None]
+
+
+class SocketQueue:
+    """Bounded queue of events for one socket."""
+
+    def __init__(self, maxsize: int, resync: bytes | None = None) -> None:
+        self.maxsize = maxsize
+        self.resync = resync
+        self.dropped = 0
+        self._resync_pending = False
+        self._events: deque[tuple[str | None, bytes]] = deque()
+        self._ready = asyncio.Event()
+
+    def put(self, event: bytes, key: str | None = None) -> None:
+        """Queue an event, replacing a queued event with the same key or dropping the oldest one."""
+        if key is not None:
+            for queued in self._events:
+                if queued[0] == key:
+                    self._events.remove(queued)
+                    coalesced_counter.add(1)
+                    break
+        if len(self._events) >= self.maxsize:
+            dropped_key, _ = self._events.popleft()
+            if dropped_key is None and self.resync is not None:
+                self._resync_pending = True
+            self.dropped += 1
+            dropped_counter.add(1)
+        self._events.append((key, event))
+        self._ready.set()
+
+    async def get(self) -> bytes:
+        while not self._events and not self._resync_pending:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._resync_pending and self.resync is not None:
+            self._resync_pending = False
+            return self.resync
+        return self._events.popleft()[1]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    async def send_to(self, on_event: Callable[[bytes], Awaitable[None]]) -> None:
+        """Send queued events until the socket fails or the task is canceled."""
+        while True:
+            event = await self.get()
+            try:
+                await on_event(event)
+            except Exception as exc:
+                logger.debug("Stopped sending channel events to socket: %s", exc)
+                return
+
+
+class _ChannelListener:
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self.queues: set[SocketQueue] = set()
+        self.subscriber: Subscriber | None = None
+        self.started: asyncio.Future[None] | None = None
+        self.release_handle: asyncio.TimerHandle | None = None
+
+
+class ChannelHub:
+    """Fans channel events out to local sockets through one subscription per channel."""
+
+    def __init__(
+        self,
+        channels: ChannelsPlugin,
+        queue_size: int = 100,
+        coalesce_key: CoalesceKey | None = None,
+        linger: float = LINGER_SECONDS,
+        observer: Observer | None = None,
+    ) -> None:
+        self.channels = channels
+        self.queue_size = queue_size
+        self.coalesce_key = coalesce_key
+        self.linger = linger
+        self.observer = observer
+        self._listeners: dict[str, _ChannelListener] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def stream(
+        self, channel: str, on_event: Callable[[bytes], Awaitable[None]], resync: bytes | None = None
+    ) -> AsyncIterator[SocketQueue]:
+        """Send the channel's events to on_event (e.g. socket.send_text) while the context is open.
+
+        resync is sent in place of events without a coalesce key that the socket fell too far behind for.
+        """
+        listener = await self._acquire(channel)
+        queue = SocketQueue(self.queue_size, resync)
+        listener.queues.add(queue)
+        sender = asyncio.create_task(queue.send_to(on_event))
+        try:
+            yield queue
+        finally:
+            sender.cancel()
+            with suppress(asyncio.CancelledError):
+                await sender
+            listener.queues.discard(queue)
+            if not listener.queues:
+                self._schedule_release(listener)
+
+    def subscriber_count(self, channel: str) -> int:
+        """Local sockets on the channel."""
+        listener = self._listeners.get(channel)
+        return len(listener.queues) if listener else 0
+
+    def channel_count(self) -> int:
+        """Channels with a subscription, including lingering ones."""
+        return len(self._listeners)
+
+    async def close(self) -> None:
+        """Unsubscribe from every channel."""
+        for listener in list(self._listeners.values()):
+            if listener.release_handle is not None:
+                listener.release_handle.cancel()
+            await self._release(listener, force=True)
+
+    async def _acquire(self, channel: str) -> _ChannelListener:
+        listener = self._listeners.get(channel)
+        if listener is None:
+            listener = self._listeners[channel] = _ChannelListener(channel)
+            listener.started = asyncio.ensure_future(self._start(listener))
+        if listener.release_handle is not None:
+            listener.release_handle.cancel()
+            listener.release_handle = None
+        assert listener.started is not None
+        await asyncio.shield(listener.started)
+        return listener
+
+    async def _start(self, listener: _ChannelListener) -> None:
+        try:
+            listener.subscriber = await self.channels.subscribe([listener.channel])
+        except BaseException:
+            self._listeners.pop(listener.channel, None)
+            raise
+        self._spawn(self._fan_out(listener, listener.subscriber))
+
+    async def _fan_out(self, listener: _ChannelListener, subscriber: Subscriber) -> None:
+        async for event in subscriber.iter_events():
+            if self.observer is not None:
+                try:
+                    self.observer(listener.channel, event)
+                except Exception:
+                    logger.exception("Channel observer failed on %s", listener.channel)
+            key = self.coalesce_key(event) if self.coalesce_key else None
+            for queue in listener.queues:
+                queue.put(event, key)
+
+    def _schedule_release(self, listener: _ChannelListener) -> None:
+        if self.linger <= 0:
+            self._spawn(self._release(listener))
+            return
+        loop = asyncio.get_running_loop()
+        listener.release_handle = loop.call_later(self.linger, lambda: self._spawn(self._release(listener)))
+
+    async def _release(self, listener: _ChannelListener, force: bool = False) -> None:
+        if self._listeners.get(listener.channel) is not listener or (listener.queues and not force):
+            return  # A socket subscribed again
+        del self._listeners[listener.channel]
+        if listener.subscriber is not None:
+            try:
+                await self.channels.unsubscribe(listener.subscriber, [listener.channel])
+            except Exception:
+                logger.exception("Failed to unsubscribe from channel %s", listener.channel)
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -53,6 +53,29 @@ class ConfigProtocol(Protocol):
     ALLOW_LOCAL_SES: bool
     WEBHOOK_SECRET: str
     SESSION_COOKIE_DOMAIN: str | None
+    SESSION_BACKEND: str
+    SESSION_COOKIE_SECRETS: str
+    SESSION_CACHE_TTL_SECONDS: int
+    SESSION_CACHE_MAX_ENTRIES: int
+    SESSION_RENEWAL_THRESHOLD: float
+    SESSION_RENEWAL_FLUSH_SECONDS: int
+    DB_POOL_WARM_SIZE: int
+    DB_POOL_IDLE_SECONDS: float
+    DEPLOYMENT_ROLE: str
+    DB_MAX_CONNECTIONS: int
+    DB_CONNECTION_BUDGETS: str
+    READ_AFTER_WRITE_SECONDS: float
+    DB_STATEMENT_TIMEOUT_MS: int
+    DB_REPORT_STATEMENT_TIMEOUT_MS: int
+    ADMISSION_LIMITS: str
+    ADMISSION_MAX_WAIT_SECONDS: float
+    THREAD_SOCKET_QUEUE_SIZE: int
+    PRESENCE_HEARTBEAT_SECONDS: float
+    PRESENCE_LEASE_SECONDS: float
+    THREAD_PRESENCE_INTERVAL_MS: int
+    THREAD_REPLAY_BUFFER_SIZE: int
+    THREAD_READ_FLUSH_MS: int
+    THREAD_ID_CACHE_SIZE: int
     FRONTEND_ORIGIN: str
     MAX_UPLOAD_SIZE: int
     MAX_DOCUMENT_SIZE: int
@@ -90,6 +113,9 @@ class ConfigProtocol(Protocol):
     @property
     def SQLALCHEMY_DB_URL(self) -> str: ...
 
+    @property
+    def READER_DB_URL(self) -> str | None: ...
+
     @property
     def DATABASE_URL(self) -> str: ...
 
@@ -130,6 +156,57 @@ class Config:
 
     # Session Configuration
     SESSION_COOKIE_DOMAIN: str | None = os.getenv("SESSION_COOKIE_DOMAIN", "localhost")
+    # "server" (PostgreSQL session store) or "cookie" (encrypted stateless cookies)
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "server")
+    # Comma-separated hex AES keys for cookie sessions, current key first (older keys are decrypt-only)
+    SESSION_COOKIE_SECRETS: str = os.getenv("SESSION_COOKIE_SECRETS", "")
+    # In-process session read cache (per worker, invalidated across workers); 0 disables caching
+    SESSION_CACHE_TTL_SECONDS: int = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "30"))
+    SESSION_CACHE_MAX_ENTRIES: int = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+    # Only persist a renewed session expiry once it has moved by this fraction of the TTL
+    SESSION_RENEWAL_THRESHOLD: float = float(os.getenv("SESSION_RENEWAL_THRESHOLD", "0.1"))
+    SESSION_RENEWAL_FLUSH_SECONDS: int = int(os.getenv("SESSION_RENEWAL_FLUSH_SECONDS", "60"))
+
+    # Database Pool Configuration
+    # Connections each engine keeps open while in use (0 = open a connection per checkout)
+    DB_POOL_WARM_SIZE: int = int(os.getenv("DB_POOL_WARM_SIZE", "5"))
+    # Idle connections are all closed after this long without a checkout, so Aurora can scale to zero
+    DB_POOL_IDLE_SECONDS: float = float(os.getenv("DB_POOL_IDLE_SECONDS", "300"))
+    # "web" or "worker": selects the per-purpose connection budgets (see app/utils/connections.py)
+    DEPLOYMENT_ROLE: str = os.getenv("DEPLOYMENT_ROLE", "web")
+    # Global cap on Postgres connections held by this process, across all pools
+    DB_MAX_CONNECTIONS: int = int(os.getenv("DB_MAX_CONNECTIONS", "40"))
+    # Budget overrides as "purpose=reserved:limit,..." (e.g. "app=10:20,queue=1:3")
+    DB_CONNECTION_BUDGETS: str = os.getenv("DB_CONNECTION_BUDGETS", "")
+    # After a write, the user's reads go to the writer for this long (covers replica lag)
+    READ_AFTER_WRITE_SECONDS: float = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+    # Statement timeout for request transactions; routes override it with the statement_timeout_ms opt
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    # Statement timeout for report queries (object lists, facets, boards, time series)
+    DB_REPORT_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_REPORT_STATEMENT_TIMEOUT_MS", "60000"))
+
+    # Per-team admission control (see app/utils/admission.py)
+    # Limit overrides as "class=concurrency:rate:burst[:max_wait],..." (e.g. "heavy=4:2:8")
+    ADMISSION_LIMITS: str = os.getenv("ADMISSION_LIMITS", "")
+    # Requests over their team's limits wait this long for a slot before getting a 429
+    ADMISSION_MAX_WAIT_SECONDS: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "5"))
+
+    # Events queued per thread WebSocket before the oldest are dropped (see app/utils/channel_hub.py)
+    THREAD_SOCKET_QUEUE_SIZE: int = int(os.getenv("THREAD_SOCKET_QUEUE_SIZE", "100"))
+
+    # Thread viewer presence across app servers (see app/threads/presence.py)
+    # Each server holding sockets renews its lease this often...
+    PRESENCE_HEARTBEAT_SECONDS: float = float(os.getenv("PRESENCE_HEARTBEAT_SECONDS", "10"))
+    # ...and its viewers are dropped once the lease has gone this long without renewal
+    PRESENCE_LEASE_SECONDS: float = float(os.getenv("PRESENCE_LEASE_SECONDS", "30"))
+    # Focus/blur changes of a thread's viewers are broadcast at most this often
+    THREAD_PRESENCE_INTERVAL_MS: int = int(os.getenv("THREAD_PRESENCE_INTERVAL_MS", "250"))
+    # Recent messages kept per thread for WebSockets resuming with ?since= (see app/threads/replay.py)
+    THREAD_REPLAY_BUFFER_SIZE: int = int(os.getenv("THREAD_REPLAY_BUFFER_SIZE", "200"))
+    # Read cursor moves are written in one batch this often (see app/threads/read_receipts.py)
+    THREAD_READ_FLUSH_MS: int = int(os.getenv("THREAD_READ_FLUSH_MS", "2000"))
+    # Thread ids of objects kept in memory per process (see app/threads/services.py)
+    THREAD_ID_CACHE_SIZE: int = int(os.getenv("THREAD_ID_CACHE_SIZE", "10000"))
 
     FRONTEND_ORIGIN: str = os.getenv("FRONTEND_ORIGIN", "http://localhost:3000")
 
@@ -231,6 +308,14 @@ class Config:
         app_password = os.getenv("DB_PASSWORD", "arive")
         return self._build_database_url(app_user, app_password, driver="+psycopg")
 
+    @property
+    def READER_DB_URL(self) -> str | None:
+        """SQLAlchemy async URL for the read replica (arive user, Aurora reader endpoint).
+
+        Read-only endpoints use the writer when unset.
+        """
+        return os.getenv("READER_DB_URL") or None
+
     # Backwards compatibility aliases
     @property
     def DATABASE_URL(self) -> str:
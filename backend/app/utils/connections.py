@@ -0,0 +1,259 @@
+"""Process-wide Postgres connection budget.
+
+Every pool in the process opens its connections through ConnectionManager:
+
+- app: the SQLAlchemy engine serving requests
+- reader: the read replica engine serving read-only requests
+- sessions: the session store engine
+- channels: the LISTEN/NOTIFY channels backend
+- queue: the SAQ broker pool
+- tasks: the SQLAlchemy engine used by SAQ tasks
+- presence: the thread realtime engine (presence heartbeats, viewer events and read receipts)
+
+Each purpose has a reservation it can always open, and a limit. Connections above the
+reservation are borrowed from the shared headroom (DB_MAX_CONNECTIONS minus all
+reservations), so a busy purpose can't starve the others. When no connection can be
+opened, the caller waits until one is closed.
+
+Budgets depend on the deployment role (DEPLOYMENT_ROLE=web or worker) and can be
+overridden with DB_CONNECTION_BUDGETS, e.g. "app=10:20,queue=1:3" (reserved:limit).
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any, Self
+
+import psycopg
+from litestar.channels.backends.psycopg import PsycoPgChannelsBackend
+from opentelemetry import metrics  # type: ignore[import-untyped]
+from opentelemetry.metrics import CallbackOptions, Observation  # type: ignore[import-untyped]
+from psycopg.sql import SQL, Identifier
+from psycopg_pool import AsyncConnectionPool
+from sqlalchemy.engine import make_url
+
+from app.utils.configure import ConfigProtocol, config
+from app.utils.pool import pool_options
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+limited_counter = meter.create_counter(
+    "db.connections.limited", description="Connection attempts that had to wait for the connection budget"
+)
+budget_wait_histogram = meter.create_histogram(
+    "db.connections.budget_wait", unit="ms", description="Time spent waiting for the connection budget"
+)
+
+
+class ConnectionLimitError(psycopg.OperationalError):
+    """Raised when the connection budget stays exhausted for the whole acquire timeout."""
+
+
+@dataclass(frozen=True)
+class ConnectionBudget:
+    """Connections a purpose may always open (reserved) and may open at most (limit)."""
+
+    reserved: int
+    limit: int
+
+
+ROLE_BUDGETS: dict[str, dict[str, ConnectionBudget]] = {
+    "web": {
+        "app": ConnectionBudget(reserved=8, limit=20),
+        "reader": ConnectionBudget(reserved=4, limit=15),
+        "sessions": ConnectionBudget(reserved=2, limit=5),
+        "channels": ConnectionBudget(reserved=1, limit=3),
+        "queue": ConnectionBudget(reserved=1, limit=3),
+        "tasks": ConnectionBudget(reserved=0, limit=5),
+        "presence": ConnectionBudget(reserved=1, limit=2),
+    },
+    "worker": {
+        "app": ConnectionBudget(reserved=0, limit=5),
+        "reader": ConnectionBudget(reserved=0, limit=2),
+        "sessions": ConnectionBudget(reserved=0, limit=2),
+        "channels": ConnectionBudget(reserved=1, limit=3),
+        "queue": ConnectionBudget(reserved=2, limit=5),
+        "tasks": ConnectionBudget(reserved=5, limit=10),
+        "presence": ConnectionBudget(reserved=0, limit=1),
+    },
+}
+
+
+def parse_budgets(value: str) -> dict[str, ConnectionBudget]:
+    """Parse "purpose=reserved:limit,..." into budgets."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        purpose, _, sizes = item.partition("=")
+        reserved, _, limit = sizes.partition(":")
+        budgets[purpose.strip()] = ConnectionBudget(reserved=int(reserved), limit=int(limit or reserved))
+    return budgets
+
+
+class ConnectionManager:
+    """Enforces a global connection cap with per-purpose reservations."""
+
+    def __init__(
+        self,
+        max_connections: int,
+        budgets: dict[str, ConnectionBudget],
+        acquire_timeout: float = 30,
+    ) -> None:
+        reserved = sum(budget.reserved for budget in budgets.values())
+        if reserved > max_connections:
+            raise ValueError(f"Connection reservations ({reserved}) exceed the global cap ({max_connections})")
+        for purpose, budget in budgets.items():
+            if budget.reserved > budget.limit:
+                raise ValueError(f"Connection reservation for {purpose} exceeds its limit")
+
+        self.max_connections = max_connections
+        self.budgets = budgets
+        self.acquire_timeout = acquire_timeout
+        self.shared = max_connections - reserved
+        self.open = dict.fromkeys(budgets, 0)
+        self._waiters: list[asyncio.Future[None]] = []
+
+    @classmethod
+    def from_config(cls, config: ConfigProtocol) -> Self:
+        """Size the budgets for the configured deployment role."""
+        if config.DEPLOYMENT_ROLE not in ROLE_BUDGETS:
+            raise ValueError(f"Unknown DEPLOYMENT_ROLE: {config.DEPLOYMENT_ROLE}")
+        budgets = ROLE_BUDGETS[config.DEPLOYMENT_ROLE] | parse_budgets(config.DB_CONNECTION_BUDGETS)
+        return cls(config.DB_MAX_CONNECTIONS, budgets)
+
+    def _borrowed(self) -> int:
+        return sum(max(0, self.open[p] - budget.reserved) for p, budget in self.budgets.items())
+
+    def _can_open(self, purpose: str) -> bool:
+        budget = self.budgets[purpose]
+        count = self.open[purpose]
+        if count >= budget.limit:
+            return False
+        return count < budget.reserved or self._borrowed() < self.shared
+
+    async def acquire(self, purpose: str) -> None:
+        """Take a connection slot for purpose, waiting until one is free."""
+        if purpose not in self.budgets:
+            raise ValueError(f"Unknown connection purpose: {purpose}")
+
+        if not self._can_open(purpose):
+            limited_counter.add(1, {"purpose": purpose})
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(self.acquire_timeout):
+                    while not self._can_open(purpose):
+                        waiter = asyncio.get_running_loop().create_future()
+                        self._waiters.append(waiter)
+                        try:
+                            await waiter
+                        finally:
+                            if waiter in self._waiters:
+                                self._waiters.remove(waiter)
+            except TimeoutError:
+                raise ConnectionLimitError(
+                    f"No {purpose} database connection available within {self.acquire_timeout}s ({self.snapshot()})"
+                ) from None
+            finally:
+                budget_wait_histogram.record((time.perf_counter() - start) * 1000, {"purpose": purpose})
+
+        self.open[purpose] += 1
+
+    def release(self, purpose: str) -> None:
+        """Return a connection slot and wake waiters to re-check the budget."""
+        self.open[purpose] -= 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def snapshot(self) -> dict[str, int]:
+        """Open connections per purpose."""
+        return dict(self.open)
+
+    def observe_open(self, options: CallbackOptions) -> list[Observation]:
+        return [Observation(count, {"purpose": purpose}) for purpose, count in self.open.items()]
+
+    def pool_options(self, purpose: str) -> dict[str, Any]:
+        """SQLAlchemy pool arguments sized to the purpose's limit."""
+        return pool_options(purpose, max_connections=self.budgets[purpose].limit)
+
+    def async_creator(self, purpose: str, url: str, **connect_kwargs: Any) -> Callable[[], Awaitable[Any]]:
+        """SQLAlchemy async_creator that opens connections through this budget.
+
+        connect_kwargs replace the engine's connect_args, which async_creator bypasses.
+        """
+        conninfo = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+        async def connect() -> ManagedConnection:
+            return await ManagedConnection.connect(conninfo, purpose=purpose, manager=self, **connect_kwargs)
+
+        return connect
+
+    def broker_pool(self, purpose: str, conninfo: str) -> AsyncConnectionPool:
+        """psycopg pool (e.g. for the SAQ broker) that opens connections through this budget."""
+        return AsyncConnectionPool(
+            conninfo,
+            connection_class=ManagedConnection,
+            kwargs={"purpose": purpose, "manager": self},
+            min_size=0,
+            max_size=self.budgets[purpose].limit,
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+
+
+class ManagedConnection(psycopg.AsyncConnection[Any]):
+    """psycopg connection that holds a slot in the connection budget until it is closed."""
+
+    _manager: ConnectionManager | None = None
+    _purpose: str = ""
+
+    @classmethod
+    async def connect(  # type: ignore[override]
+        cls,
+        conninfo: str = "",
+        *,
+        purpose: str,
+        manager: ConnectionManager | None = None,
+        **kwargs: Any,
+    ) -> Self:
+        manager = manager or connection_manager
+        await manager.acquire(purpose)
+        try:
+            conn = await super().connect(conninfo, **kwargs)
+        except BaseException:
+            manager.release(purpose)
+            raise
+        conn._manager = manager
+        conn._purpose = purpose
+        return conn
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            if self._manager is not None:
+                self._manager.release(self._purpose)
+                self._manager = None
+
+
+class ManagedPsycoPgChannelsBackend(PsycoPgChannelsBackend):
+    """Channels backend whose listener and publish connections count against the budget."""
+
+    async def on_startup(self) -> None:
+        self._listener_conn = await ManagedConnection.connect(self._pg_dsn, purpose="channels", autocommit=True)
+        await self._exit_stack.enter_async_context(self._listener_conn)
+
+    async def publish(self, data: bytes, channels: Iterable[str]) -> None:
+        dec_data = data.decode("utf-8")
+        async with await ManagedConnection.connect(self._pg_dsn, purpose="channels", autocommit=True) as conn:
+            for channel in channels:
+                await conn.execute(SQL("NOTIFY {channel}, {data}").format(channel=Identifier(channel), data=dec_data))
+
+
+connection_manager = ConnectionManager.from_config(config)
+meter.create_observable_gauge(
+    "db.connections.open", callbacks=[connection_manager.observe_open], description="Open connections per purpose"
+)
@@ -1,13 +1,20 @@
 """Database utility functions for common operations."""
 
 import logging
+from collections.abc import Callable, Mapping
+from contextlib import AbstractAsyncContextManager
 from typing import Any
 
-from litestar import Request
+import psycopg
+from litestar.connection import ASGIConnection
 from litestar.exceptions import NotFoundException
 from msgspec import structs
-from sqlalchemy import select, text
+from psycopg import generators, sql
+from psycopg.pq import ExecStatus, TransactionStatus
+from sqlalchemy import Connection, event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.util import await_only
 
 from app.auth.enums import ScopeType
 from app.base.models import BaseDBModel
@@ -19,6 +26,17 @@ from app.utils.configure import config
 
 logger = logging.getLogger(__name__)
 
+# session.info keys holding the settings to apply when a transaction begins
+RLS_SETTINGS_KEY = "rls_settings"
+STATEMENT_TIMEOUT_KEY = "statement_timeout_ms"
+# session.info key holding the psycopg connection of the session's open transaction
+DRIVER_CONNECTION_KEY = "driver_connection"
+# Route handler/router opt overriding DB_STATEMENT_TIMEOUT_MS, e.g. Router(..., opt={STATEMENT_TIMEOUT_OPT: 60_000})
+STATEMENT_TIMEOUT_OPT = "statement_timeout_ms"
+
+# Opens a short-lived RLS transaction (see provide_socket_transactions)
+SocketTransactions = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
 
 async def _emit_created_event(
     session: AsyncSession,
@@ -258,30 +276,120 @@ async def create_model[T: BaseDBModel](
     return obj
 
 
-async def set_rls_variables(session: AsyncSession, request: Request) -> None:
-    """Set PostgreSQL RLS session variables for database-level security.
+def get_rls_settings(session_data: Mapping[str, Any]) -> dict[str, str]:
+    """Resolve the PostgreSQL RLS session variables for a request's session data.
 
     Session variables for RLS:
     - app.team_id: Set when user has team scope
     - app.campaign_id: Set when user has campaign scope
     - app.is_system_mode: Set to true for admin/system operations that bypass RLS
 
-    Note: Must be called within an active transaction (after begin()).
-    SET LOCAL is transaction-scoped and doesn't support parameter binding.
-    We use f-strings with validated integer IDs, which is safe since PostgreSQL
-    expects numeric literals for SET LOCAL with integer values.
-
-    Application-level filters are set via session.info in provide_transaction().
+    Returns an empty dict for unauthenticated requests (no scope_type).
     """
-    # Set system mode flag
+    # System mode bypasses all scope checks
     if config.IS_SYSTEM_MODE:
-        await session.execute(text("SET LOCAL app.is_system_mode = true"))
-        return  # System mode bypasses all scope checks
-
-    # Check for scope_type in session
-    scope_type = request.session.get("scope_type")
+        return {"app.is_system_mode": "true"}
 
+    scope_type = session_data.get("scope_type")
     if not scope_type:
+        return {}
+
+    if scope_type == ScopeType.TEAM.value:
+        team_id = session_data.get("team_id")
+        if not team_id:
+            raise ValueError("scope_type is TEAM but no team_id in session")
+        return {"app.team_id": str(int(team_id))}
+
+    if scope_type == ScopeType.CAMPAIGN.value:
+        campaign_id = session_data.get("campaign_id")
+        if not campaign_id:
+            raise ValueError("scope_type is CAMPAIGN but no campaign_id in session")
+        return {"app.campaign_id": str(int(campaign_id))}
+
+    raise ValueError(f"Invalid scope_type in session: {scope_type}")
+
+
+def _set_config_select(settings: Mapping[str, str]) -> sql.Composed:
+    """Fold settings into one SELECT set_config(name, value, is_local => true)."""
+    calls = [sql.SQL("set_config({}, {}, true)").format(sql.Literal(n), sql.Literal(v)) for n, v in settings.items()]
+    return sql.SQL("SELECT ") + sql.SQL(", ").join(calls)
+
+
+def _begin_command(connection: psycopg.AsyncConnection) -> sql.Composable:
+    """The BEGIN psycopg would send for the connection's transaction characteristics."""
+    parts = [sql.SQL("BEGIN")]
+    if connection.isolation_level is not None:
+        parts.append(sql.SQL("ISOLATION LEVEL " + connection.isolation_level.name.replace("_", " ")))
+    if connection.read_only is not None:
+        parts.append(sql.SQL("READ ONLY" if connection.read_only else "READ WRITE"))
+    if connection.deferrable is not None:
+        parts.append(sql.SQL("DEFERRABLE" if connection.deferrable else "NOT DEFERRABLE"))
+    return sql.SQL(" ").join(parts)
+
+
+async def _begin_with_settings(connection: psycopg.AsyncConnection, settings: Mapping[str, str]) -> None:
+    """Open the transaction and apply settings in one simple-query round trip.
+
+    psycopg sends its own BEGIN before the first statement, and awaits it separately,
+    unless the connection is already in a transaction. Sending "BEGIN; SELECT
+    set_config(...)" as one query leaves it in one, so the settings cost no round trip
+    of their own.
+    """
+    query = _begin_command(connection) + sql.SQL("; ") + _set_config_select(settings)
+    async with connection.lock:
+        connection.pgconn.send_query(query.as_bytes(connection))
+        results = await connection.wait(generators.execute(connection.pgconn))
+    for result in results:
+        if result.status == ExecStatus.FATAL_ERROR:
+            raise psycopg.errors.error_from_result(result, encoding=connection.info.encoding)
+
+
+def _apply_transaction_settings(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    """Session after_begin hook: set RLS variables and the statement timeout for the transaction."""
+    driver_connection = connection.connection.driver_connection
+    session.info[DRIVER_CONNECTION_KEY] = driver_connection
+
+    settings = dict(session.info.get(RLS_SETTINGS_KEY) or {})
+    if (timeout_ms := session.info.get(STATEMENT_TIMEOUT_KEY)) is not None:
+        settings["statement_timeout"] = str(timeout_ms)
+    if not settings:
+        return
+
+    if (
+        isinstance(driver_connection, psycopg.AsyncConnection)
+        and not driver_connection.autocommit
+        and driver_connection.pgconn.transaction_status == TransactionStatus.IDLE
+    ):
+        await_only(_begin_with_settings(driver_connection, settings))
+    else:
+        # Already inside a transaction (e.g. a session bound to an outer connection)
+        connection.exec_driver_sql(_set_config_select(settings).as_string(driver_connection))
+
+
+def _forget_driver_connection(session: Session, transaction: SessionTransaction) -> None:
+    """Session after_transaction_end hook: the connection goes back to the pool, stop tracking it."""
+    if transaction.parent is None:
+        session.info.pop(DRIVER_CONNECTION_KEY, None)
+
+
+def _listen_for_begin(sync_session: Session) -> None:
+    if not event.contains(sync_session, "after_begin", _apply_transaction_settings):
+        event.listen(sync_session, "after_begin", _apply_transaction_settings)
+        event.listen(sync_session, "after_transaction_end", _forget_driver_connection)
+
+
+async def set_rls_variables(session: AsyncSession, request: ASGIConnection) -> None:
+    """Set PostgreSQL RLS session variables for database-level security.
+
+    The variables are not sent immediately. They are stored on the session, and an
+    after_begin hook sends a single SELECT set_config(..., true) together with the
+    transaction's BEGIN, so they cost no round trip of their own. set_config(..., true)
+    is transaction-scoped like SET LOCAL.
+
+    Application-level filters are set via session.info in provide_transaction().
+    """
+    settings = get_rls_settings(request.session)
+    if not settings:
         # No scope set - this is an unauthenticated request (e.g., login, signup)
         # Don't set any RLS variables. Tables with RLS will return empty results,
         # tables without RLS (sessions, users for lookup) will work normally.
@@ -293,20 +401,37 @@ async def set_rls_variables(session: AsyncSession, request: Request) -> None:
                 "has_user_id": bool(request.session.get("user_id")),
             },
         )
-        return
 
-    if scope_type == ScopeType.TEAM.value:
-        team_id = request.session.get("team_id")
-        if team_id:
-            await session.execute(text(f"SET LOCAL app.team_id = {team_id}"))
-        else:
-            raise ValueError("scope_type is TEAM but no team_id in session")
+    session.sync_session.info[RLS_SETTINGS_KEY] = settings
+    _listen_for_begin(session.sync_session)
 
-    elif scope_type == ScopeType.CAMPAIGN.value:
-        campaign_id = request.session.get("campaign_id")
-        if campaign_id:
-            await session.execute(text(f"SET LOCAL app.campaign_id = {campaign_id}"))
-        else:
-            raise ValueError("scope_type is CAMPAIGN but no campaign_id in session")
-    else:
-        raise ValueError(f"Invalid scope_type in session: {scope_type}")
+
+def get_statement_timeout(request: ASGIConnection) -> int:
+    """Statement timeout in milliseconds for the request's route (see STATEMENT_TIMEOUT_OPT)."""
+    return int(request.route_handler.opt.get(STATEMENT_TIMEOUT_OPT, config.DB_STATEMENT_TIMEOUT_MS))
+
+
+def set_statement_timeout(session: AsyncSession, timeout_ms: int) -> None:
+    """Limit each statement of the session's transaction to timeout_ms (0 disables the limit).
+
+    Like set_rls_variables, this is applied with set_config(..., true), the equivalent of
+    SET LOCAL statement_timeout, sent together with the transaction's BEGIN.
+    """
+    session.sync_session.info[STATEMENT_TIMEOUT_KEY] = timeout_ms
+    _listen_for_begin(session.sync_session)
+
+
+async def cancel_running_query(session: AsyncSession) -> bool:
+    """Cancel the statement the session's transaction is currently running, if any.
+
+    The canceled statement fails with QueryCanceled, which rolls the transaction back.
+    Returns whether a cancel request was sent.
+    """
+    driver_connection = session.sync_session.info.get(DRIVER_CONNECTION_KEY)
+    if (
+        not isinstance(driver_connection, psycopg.AsyncConnection)
+        or driver_connection.pgconn.transaction_status != TransactionStatus.ACTIVE
+    ):
+        return False
+    await driver_connection.cancel_safe()
+    return True
@@ -0,0 +1,151 @@
+"""Connection pool that stays warm under traffic and drains to zero when idle.
+
+Aurora Serverless can only scale to zero once every client connection is closed, which
+is why the engines used to run with pool_size=0 and overflow connections only. That
+made every checkout pay TCP + TLS + auth setup. WarmQueuePool keeps up to pool_size
+connections open while traffic is flowing, and closes all idle connections once the
+pool has gone idle_timeout seconds without a checkout.
+
+Pool metrics (exported through OpenTelemetry when configured):
+- db.pool.checkouts: connections handed out
+- db.pool.wait_time: milliseconds spent waiting for a connection, including connect time
+- db.pool.connects: new database connections opened (rate = connects per second)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from opentelemetry import metrics  # type: ignore[import-untyped]
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, PoolProxiedConnection
+from sqlalchemy.util import greenlet_spawn, queue as sqla_queue
+
+from app.utils.configure import config
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+checkout_counter = meter.create_counter("db.pool.checkouts", description="Connections checked out of the pool")
+wait_time_histogram = meter.create_histogram(
+    "db.pool.wait_time", unit="ms", description="Time spent waiting for a pooled connection"
+)
+connect_counter = meter.create_counter("db.pool.connects", description="New database connections opened")
+
+
+@dataclass
+class PoolStats:
+    """In-process pool counters, mirrored to the OpenTelemetry instruments."""
+
+    checkouts: int = 0
+    connects: int = 0
+    idle_closes: int = 0
+    wait_seconds: float = 0.0
+
+
+class WarmQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that closes its idle connections after idle_timeout seconds.
+
+    pool_size connections are kept while the pool is in use; max_overflow extra
+    connections are opened during bursts and closed on return, as with QueuePool.
+    """
+
+    def __init__(self, creator: Any, idle_timeout: float | None = None, **kwargs: Any) -> None:
+        super().__init__(creator, **kwargs)
+        self.idle_timeout = config.DB_POOL_IDLE_SECONDS if idle_timeout is None else idle_timeout
+        self.stats = PoolStats()
+        self._attributes = {"pool.name": self._orig_logging_name or "default"}
+        self._last_activity = time.monotonic()
+        self._idle_check: asyncio.TimerHandle | None = None
+        self._idle_check_loop: asyncio.AbstractEventLoop | None = None
+        self._idle_close_task: asyncio.Task | None = None
+
+    def recreate(self) -> "WarmQueuePool":
+        pool = super().recreate()
+        assert isinstance(pool, WarmQueuePool)
+        pool.idle_timeout = self.idle_timeout
+        return pool
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        connection = super().connect()
+        waited = time.perf_counter() - start
+
+        self._last_activity = time.monotonic()
+        self.stats.checkouts += 1
+        self.stats.wait_seconds += waited
+        checkout_counter.add(1, self._attributes)
+        wait_time_histogram.record(waited * 1000, self._attributes)
+        return connection
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        record = super()._create_connection()
+        self.stats.connects += 1
+        connect_counter.add(1, self._attributes)
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._last_activity = time.monotonic()
+        self._schedule_idle_check(self.idle_timeout)
+
+    def _schedule_idle_check(self, delay: float) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # A pending check on a closed loop (e.g. between test event loops) never fires
+        if self._idle_check is not None and self._idle_check_loop is loop:
+            return
+        self._idle_check = loop.call_later(delay, self._check_idle)
+        self._idle_check_loop = loop
+
+    def _check_idle(self) -> None:
+        self._idle_check = None
+        if self.checkedout():
+            return  # Rescheduled when the connections are returned
+
+        idle_for = time.monotonic() - self._last_activity
+        if idle_for < self.idle_timeout:
+            self._schedule_idle_check(self.idle_timeout - idle_for)
+        elif self.checkedin() and self._idle_close_task is None:
+            self._idle_close_task = asyncio.get_running_loop().create_task(self._close_idle_connections())
+
+    async def _close_idle_connections(self) -> None:
+        try:
+            closed = await greenlet_spawn(self._drain_idle_connections)
+            logger.info("Closed %d idle database connections", closed, extra={"pool": self._attributes["pool.name"]})
+        except Exception:
+            logger.exception("Failed to close idle database connections")
+        finally:
+            self._idle_close_task = None
+
+    def _drain_idle_connections(self) -> int:
+        """Close every checked-in connection, stopping early if the pool is used again."""
+        started_at = self._last_activity
+        closed = 0
+        while self._last_activity == started_at:
+            try:
+                record = self._pool.get(False)
+            except sqla_queue.Empty:
+                break
+            record.close()
+            self._dec_overflow()
+            closed += 1
+        self.stats.idle_closes += closed
+        return closed
+
+
+def pool_options(name: str, max_connections: int) -> dict[str, Any]:
+    """Engine pool arguments for a WarmQueuePool with at most max_connections connections.
+
+    Up to DB_POOL_WARM_SIZE connections are kept warm; the rest are burst overflow.
+    """
+    pool_size = min(config.DB_POOL_WARM_SIZE, max_connections)
+    return {
+        "poolclass": WarmQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_connections - pool_size,
+        "pool_logging_name": name,
+    }
@@ -1,8 +1,11 @@
 import logging
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 
 import aiohttp
-from litestar import Litestar, Request
+from litestar import Litestar, Request, WebSocket
+from litestar.channels import ChannelsPlugin
 from litestar.datastructures import State
 from litestar.exceptions import ClientException
 from litestar.status_codes import HTTP_409_CONFLICT
@@ -10,50 +13,148 @@ from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import raiseload
-from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.client.s3_client import S3Dep
 from app.emails.client import BaseEmailClient
 from app.emails.service import EmailService
 from app.objects.base import ObjectRegistry
 from app.sessions.store import PostgreSQLSessionStore
-from app.threads.services import ThreadViewerStore
+from app.threads.presence import PresenceBroadcaster, ThreadViewerStore
+from app.threads.read_receipts import ReadReceipts
+from app.threads.replay import MessageReplayBuffer
+from app.threads.utils import thread_event_coalesce_key
+from app.utils.cancellation import track_session
+from app.utils.channel_hub import ChannelHub
 from app.utils.configure import ConfigProtocol, config
-from app.utils.db import set_rls_variables
+from app.utils.connections import connection_manager
+from app.utils.db import SocketTransactions, get_statement_timeout, set_rls_variables, set_statement_timeout
 from app.utils.db_filters import soft_delete_filter
 
 logger = logging.getLogger(__name__)
 
 
-def provide_viewer_store(request: Request) -> ThreadViewerStore:
-    """Provide ThreadViewerStore instance with injected MemoryStore."""
-    return ThreadViewerStore(store=request.app.stores.get("viewers"))
+def provide_viewer_store(state: State) -> ThreadViewerStore:
+    """Provide the process-wide ThreadViewerStore."""
+    return state.viewer_store
 
 
-async def provide_transaction(db_session: AsyncSession, request: Request) -> AsyncGenerator[AsyncSession]:
-    """Provide a database transaction with PostgreSQL RLS for multi-tenant isolation.
+def provide_presence_broadcaster(state: State) -> PresenceBroadcaster:
+    """Provide the process-wide PresenceBroadcaster."""
+    return state.presence_broadcaster
 
-    Security is enforced via PostgreSQL Row-Level Security (RLS) policies at the database level.
-    This provides strong isolation guarantees that cannot be bypassed at the application layer.
-    """
 
-    def _raiseload_listener(execute_state):
-        execute_state.statement = execute_state.statement.options(raiseload("*"))
+# session.info key set once the transaction has written anything
+WROTE_KEY = "wrote"
+# request.session key: reads go to the writer until this time, so users see their own writes
+READ_FROM_WRITER_UNTIL_KEY = "read_writer_until"
+
+
+def _raiseload_listener(execute_state):
+    execute_state.statement = execute_state.statement.options(raiseload("*"))
+
 
-    # Attach event listeners once per session
+def _record_dml(execute_state):
+    if execute_state.is_insert or execute_state.is_update or execute_state.is_delete:
+        execute_state.session.info[WROTE_KEY] = True
+
+
+def _record_flush(session, flush_context):
+    session.info[WROTE_KEY] = True
+
+
+def _attach_listeners(db_session: AsyncSession) -> None:
+    """Attach soft-delete, raiseload and write-tracking listeners once per session."""
     if not db_session.sync_session.info.get("_listeners_attached"):
         event.listen(db_session.sync_session, "do_orm_execute", soft_delete_filter)
         event.listen(db_session.sync_session, "do_orm_execute", _raiseload_listener)
+        event.listen(db_session.sync_session, "do_orm_execute", _record_dml)
+        event.listen(db_session.sync_session, "after_flush", _record_flush)
         db_session.sync_session.info["_listeners_attached"] = True
 
+
+async def provide_transaction(db_session: AsyncSession, request: Request) -> AsyncGenerator[AsyncSession]:
+    """Provide a database transaction with PostgreSQL RLS for multi-tenant isolation.
+
+    Security is enforced via PostgreSQL Row-Level Security (RLS) policies at the database level.
+    This provides strong isolation guarantees that cannot be bypassed at the application layer.
+
+    Statements are limited to the route's statement timeout, and canceled if the client
+    disconnects while they run.
+    """
+    _attach_listeners(db_session)
+    db_session.sync_session.info[WROTE_KEY] = False
+    track_session(request, db_session)
+
     try:
         async with db_session.begin():
             await set_rls_variables(db_session, request)
+            set_statement_timeout(db_session, get_statement_timeout(request))
             yield db_session
 
     except IntegrityError as exc:
         raise ClientException(status_code=HTTP_409_CONFLICT, detail=str(exc)) from exc
 
+    if db_session.sync_session.info[WROTE_KEY] and request.app.state.get("reader_sessionmaker"):
+        _pin_reads_to_writer(request)
+
+
+def _pin_reads_to_writer(request: Request) -> None:
+    """Send this user's reads to the writer for a short window after a committed write."""
+    now = time.time()
+    window = config.READ_AFTER_WRITE_SECONDS
+    # Only touch the session once per half window, so bursts of writes don't rewrite it
+    if request.session.get(READ_FROM_WRITER_UNTIL_KEY, 0) < now + window / 2:
+        request.session[READ_FROM_WRITER_UNTIL_KEY] = now + window
+
+
+async def provide_read_transaction(
+    db_session: AsyncSession, request: Request, state: State
+) -> AsyncGenerator[AsyncSession]:
+    """Provide a read-only transaction on the read replica, with the same RLS and filters.
+
+    Uses the writer when no reader is configured, or for a short window after the user's
+    last write (replica lag would otherwise hide it). Either way it runs in its own session,
+    since handlers may also depend on `transaction` (e.g. through the action registry).
+    """
+    reader_sessionmaker: async_sessionmaker[AsyncSession] | None = state.get("reader_sessionmaker")
+    if reader_sessionmaker is None or request.session.get(READ_FROM_WRITER_UNTIL_KEY, 0) > time.time():
+        session = AsyncSession(bind=db_session.bind, expire_on_commit=False, autoflush=False)
+    else:
+        session = reader_sessionmaker()
+
+    _attach_listeners(session)
+    track_session(request, session)
+    try:
+        async with session.begin():
+            await set_rls_variables(session, request)
+            set_statement_timeout(session, get_statement_timeout(request))
+            yield session
+    finally:
+        await session.close()
+
+
+def provide_socket_transactions(db_session: AsyncSession, socket: WebSocket) -> SocketTransactions:
+    """Provide short-lived transactions, with the same RLS and filters, for a WebSocket.
+
+    A socket can stay open for hours, so it must not hold the request-scoped `transaction`
+    (and its connection). Each `async with socket_transactions() as session:` opens its own
+    session, commits when the block exits and returns the connection to the pool.
+    """
+
+    @asynccontextmanager
+    async def socket_transaction() -> AsyncIterator[AsyncSession]:
+        session = AsyncSession(bind=db_session.bind, expire_on_commit=False, autoflush=False)
+        _attach_listeners(session)
+        try:
+            async with session.begin():
+                await set_rls_variables(session, socket)
+                set_statement_timeout(session, get_statement_timeout(socket))
+                yield session
+        finally:
+            await session.close()
+
+    return socket_transaction
+
 
 async def on_startup(app: Litestar) -> None:
     logger.info(
@@ -62,11 +163,42 @@ async def on_startup(app: Litestar) -> None:
         app.debug,
     )
     app.state.http = aiohttp.ClientSession()
+    app.state.replay_buffer = MessageReplayBuffer(size=config.THREAD_REPLAY_BUFFER_SIZE)
+    app.state.thread_hub = ChannelHub(
+        app.plugins.get(ChannelsPlugin),
+        queue_size=config.THREAD_SOCKET_QUEUE_SIZE,
+        coalesce_key=thread_event_coalesce_key,
+        observer=app.state.replay_buffer.record,
+    )
+    presence_sessionmaker = create_presence_sessionmaker()
+    # Starts sharing presence with the other app servers on the first socket
+    app.state.viewer_store = ThreadViewerStore(presence_sessionmaker, app.plugins.get(ChannelsPlugin))
+    app.state.read_receipts = ReadReceipts(presence_sessionmaker)
+    app.state.presence_broadcaster = PresenceBroadcaster(app.plugins.get(ChannelsPlugin))
+    if config.READER_DB_URL:
+        app.state.reader_sessionmaker = create_reader_sessionmaker(config.READER_DB_URL)
+    if isinstance(session_store := app.stores.get("sessions"), PostgreSQLSessionStore):
+        session_store.start_renewal_flusher()
+        await session_store.start_invalidation_listener(app.plugins.get(ChannelsPlugin))
     logger.info("Application startup complete")
 
 
 async def on_shutdown(app: Litestar) -> None:
     logger.info("Application shutdown initiated")
+    if isinstance(session_store := app.stores.get("sessions"), PostgreSQLSessionStore):
+        await session_store.stop_invalidation_listener()
+        await session_store.stop_renewal_flusher()
+    if thread_hub := app.state.get("thread_hub"):
+        await thread_hub.close()
+    if presence_broadcaster := app.state.get("presence_broadcaster"):
+        presence_broadcaster.close()
+    if read_receipts := app.state.get("read_receipts"):
+        await read_receipts.close()
+    if viewer_store := app.state.get("viewer_store"):
+        await viewer_store.stop()
+        await viewer_store.sessionmaker.kw["bind"].dispose()
+    if reader_sessionmaker := app.state.get("reader_sessionmaker"):
+        await reader_sessionmaker.kw["bind"].dispose()
     if hasattr(app.state, "http"):
         await app.state.http.close()
         logger.info("Application shutdown complete")
@@ -78,19 +210,31 @@ def provide_http(state: State) -> aiohttp.ClientSession:
     return state.http
 
 
+def provide_thread_hub(state: State) -> ChannelHub:
+    return state.thread_hub
+
+
+def provide_replay_buffer(state: State) -> MessageReplayBuffer:
+    return state.replay_buffer
+
+
+def provide_read_receipts(state: State) -> ReadReceipts:
+    return state.read_receipts
+
+
 def create_postgres_session_store() -> PostgreSQLSessionStore:
     """Provide PostgreSQL session store with connection pooling."""
 
     engine = create_async_engine(
         config.ASYNC_DATABASE_URL,
-        poolclass=AsyncAdaptedQueuePool,
-        pool_size=0,  # Zero persistent connections for Aurora scale-to-zero
-        max_overflow=5,  # Create up to 5 temporary connections on-demand
+        **connection_manager.pool_options("sessions"),  # Closed when idle for Aurora scale-to-zero
         pool_timeout=10,
-        connect_args={
-            "connect_timeout": 10,
-            "application_name": "manageros-sessions",
-        },
+        async_creator=connection_manager.async_creator(
+            "sessions",
+            config.ASYNC_DATABASE_URL,
+            connect_timeout=10,
+            application_name="manageros-sessions",
+        ),
     )
 
     # Create session factory
@@ -101,7 +245,48 @@ def create_postgres_session_store() -> PostgreSQLSessionStore:
         autobegin=True,
     )
 
-    return PostgreSQLSessionStore(session_factory)
+    return PostgreSQLSessionStore(
+        session_factory,
+        cache_ttl=config.SESSION_CACHE_TTL_SECONDS,
+        cache_max_entries=config.SESSION_CACHE_MAX_ENTRIES,
+        renewal_threshold=config.SESSION_RENEWAL_THRESHOLD,
+        renewal_flush_interval=config.SESSION_RENEWAL_FLUSH_SECONDS,
+    )
+
+
+def create_reader_sessionmaker(url: str) -> async_sessionmaker[AsyncSession]:
+    """Provide a session factory for the read replica (Aurora reader endpoint)."""
+    engine = create_async_engine(
+        url,
+        **connection_manager.pool_options("reader"),
+        pool_timeout=30,
+        async_creator=connection_manager.async_creator(
+            "reader",
+            url,
+            connect_timeout=10,
+            application_name="manageros-reader",
+        ),
+    )
+    return async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+
+def create_presence_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Provide a session factory for thread viewer presence and read receipts.
+
+    See app/threads/presence.py and app/threads/read_receipts.py.
+    """
+    engine = create_async_engine(
+        config.ASYNC_DATABASE_URL,
+        **connection_manager.pool_options("presence"),
+        pool_timeout=10,
+        async_creator=connection_manager.async_creator(
+            "presence",
+            config.ASYNC_DATABASE_URL,
+            connect_timeout=10,
+            application_name="manageros-presence",
+        ),
+    )
+    return async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 
 def provide_object_registry(s3_client: S3Dep, config: ConfigProtocol) -> ObjectRegistry:
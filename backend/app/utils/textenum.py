@@ -46,6 +46,9 @@ class TextEnum[E: Enum](types.TypeDecorator[E]):
         if isinstance(value, Enum):
             return value.name
         # SQLAlchemy relationship filters may pass strings directly
+        # API filters send enum values (e.g., "active"), map those to the stored name
+        if value in self.enum_class._value2member_map_:
+            return self.enum_class._value2member_map_[value].name
         return value
 
     def process_result_value(self, value: str | None, dialect: Any) -> E | None:
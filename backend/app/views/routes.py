@@ -6,30 +6,41 @@ from litestar.exceptions import (
     NotFoundException,
     ValidationException,
 )
-from sqlalchemy import insert, or_, select
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.actions.deps import ActionDeps
 from app.auth.guards import requires_scoped_session
+from app.objects.base import ObjectRegistry
 from app.objects.enums import ObjectTypes
+from app.utils.admission import ADMISSION_CLASS_OPT
 from app.utils.db import get_or_404
-from app.utils.sqids import Sqid
+from app.utils.sqids import Sqid, sqid_dec_hook, sqid_decode, sqid_enc_hook
 from app.views.models import SavedView
 from app.views.schemas import (
     CreateSavedViewSchema,
+    SavedViewCountsResponse,
+    SavedViewObjectsRequest,
+    SavedViewObjectsResponse,
     SavedViewSchema,
     UpdateSavedViewSchema,
 )
 from app.views.services import (
+    VIEW_COUNTS_CACHE_TTL_SECONDS,
     check_view_ownership,
     clear_user_defaults,
+    count_views,
     get_or_create_default_view,
+    list_views_for_user,
     saved_view_to_schema,
+    view_counts_cache_key,
+    view_to_list_request,
 )
 
 
 @get("/{object_type:str}")
 async def list_saved_views(
-    object_type: ObjectTypes, transaction: AsyncSession, request: Request
+    object_type: ObjectTypes, read_transaction: AsyncSession, request: Request
 ) -> list[SavedViewSchema]:
     """List all saved views for a specific object type.
 
@@ -43,54 +54,52 @@ async def list_saved_views(
     Returns full schemas including configuration, so clients don't need
     to make additional requests when switching between views.
     """
-    # Query for both user's personal views and team-shared views for this object type
-    # RLS will automatically filter to the current team
-    # Order by: default first, then alphabetically by name
-    stmt = (
-        select(SavedView)
-        .where(
-            SavedView.object_type == object_type,
-            or_(
-                SavedView.user_id == request.user,  # Personal views
-                SavedView.user_id.is_(None),  # Team-shared views
-            ),
-        )
-        .order_by(
-            SavedView.is_default.desc(),  # Default views first
-            SavedView.name.asc(),  # Then alphabetically
-        )
-    )
-    result = await transaction.execute(stmt)
-    saved_views = result.scalars().all()
+    return await list_views_for_user(read_transaction, user_id=request.user, object_type=object_type)
 
-    # Convert to schemas
-    view_schemas = [saved_view_to_schema(view) for view in saved_views]
 
-    # Check if user has a personal default
-    has_personal_default = any(v.is_default and v.is_personal for v in view_schemas)
-
-    # If no personal default, include system default view at the beginning
-    if not has_personal_default:
-        system_default = await get_or_create_default_view(
-            transaction,
-            user_id=request.user,
-            object_type=object_type,
-        )
-        # Only add if it's the hardcoded default (id=None)
-        if system_default.id is None:
-            view_schemas.insert(0, system_default)
+@get("/{object_type:str}/counts", opt={ADMISSION_CLASS_OPT: "heavy"})
+async def get_saved_view_counts(
+    object_type: ObjectTypes,
+    read_transaction: AsyncSession,
+    request: Request,
+    object_registry: ObjectRegistry,
+    team_id: int | None,
+    campaign_id: int | None,
+) -> SavedViewCountsResponse:
+    """Get badge counts for every saved view of an object type.
+
+    All views are counted in a single scan using count(*) FILTER (WHERE ...)
+    per view. Results are cached briefly per scope, user and view configuration.
+    """
+    object_class = object_registry.get_class(object_type)
+    views = await list_views_for_user(read_transaction, user_id=request.user, object_type=object_type)
+
+    store = request.app.stores.get("view_counts")
+    cache_key = view_counts_cache_key(
+        team_id=team_id,
+        campaign_id=campaign_id,
+        user_id=request.user,
+        object_type=object_type,
+        views=views,
+    )
+    if cached := await store.get(cache_key):
+        return msgspec.json.decode(cached, type=SavedViewCountsResponse, dec_hook=sqid_dec_hook)
 
-    return view_schemas
+    response = SavedViewCountsResponse(counts=await count_views(read_transaction, object_class, views))
+    await store.set(
+        cache_key, msgspec.json.encode(response, enc_hook=sqid_enc_hook), expires_in=VIEW_COUNTS_CACHE_TTL_SECONDS
+    )
+    return response
 
 
 @get("/{object_type:str}/{id:str}")
 async def get_saved_view(
     object_type: ObjectTypes,
     id: Sqid,
-    transaction: AsyncSession,
+    read_transaction: AsyncSession,
 ) -> SavedViewSchema:
     """Get a specific saved view by ID."""
-    view = await get_or_404(transaction, SavedView, id)
+    view = await get_or_404(read_transaction, SavedView, id)
 
     # Validate object_type matches
     if view.object_type != object_type:
@@ -192,6 +201,40 @@ async def update_saved_view(
     return saved_view_to_schema(view)
 
 
+@post("/{object_type:str}/{id:str}/objects", status_code=200, opt={ADMISSION_CLASS_OPT: "dashboard"})
+async def list_saved_view_objects(
+    object_type: ObjectTypes,
+    id: str,
+    data: SavedViewObjectsRequest,
+    request: Request,
+    read_transaction: AsyncSession,
+    object_registry: ObjectRegistry,
+    read_action_deps: ActionDeps,
+) -> SavedViewObjectsResponse:
+    """Resolve a saved view and list its objects in one request.
+
+    Pass id=default to use the user's default view (or the hard-coded default).
+    Paging and search in the body override the view's own configuration.
+    """
+    if id == "default":
+        view = await get_or_create_default_view(read_transaction, user_id=request.user, object_type=object_type)
+    else:
+        try:
+            view_id = sqid_decode(id)
+        except ValueError as e:
+            raise NotFoundException(f"SavedView {id} not found") from e
+        saved_view = await get_or_404(read_transaction, SavedView, view_id)
+        if saved_view.object_type != object_type:
+            raise NotFoundException(f"SavedView {id} not found for object type {object_type}")
+        view = saved_view_to_schema(saved_view)
+
+    object_class = object_registry.get_class(object_type)
+    objects = await object_class.get_list_response(
+        read_transaction, view_to_list_request(view, data), user_id=request.user, deps=read_action_deps
+    )
+    return SavedViewObjectsResponse(view=view, objects=objects)
+
+
 @delete("/{object_type:str}/{id:str}", status_code=204)
 async def delete_saved_view(
     object_type: ObjectTypes,
@@ -226,9 +269,11 @@ view_router = Router(
     guards=[requires_scoped_session],
     route_handlers=[
         list_saved_views,
+        get_saved_view_counts,
         get_saved_view,
         create_saved_view,
         update_saved_view,
+        list_saved_view_objects,
         delete_saved_view,
     ],
     tags=["views"],
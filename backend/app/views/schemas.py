@@ -4,7 +4,7 @@ from datetime import datetime
 
 from app.base.schemas import BaseSchema
 from app.objects.enums import ObjectTypes
-from app.objects.schemas import FilterDefinition, SortDefinition
+from app.objects.schemas import FilterDefinition, ObjectListResponse, SortDefinition
 from app.utils.sqids import Sqid
 from app.views.enums import DisplayMode
 
@@ -78,3 +78,31 @@ class UpdateSavedViewSchema(BaseSchema):
     name: str | None = None
     config: SavedViewConfigSchema | None = None
     is_default: bool | None = None
+
+
+class SavedViewCountSchema(BaseSchema):
+    """Number of objects matching a saved view's filters."""
+
+    id: Sqid | None  # None for hard-coded defaults
+    count: int
+
+
+class SavedViewCountsResponse(BaseSchema):
+    """Response schema for saved view badge counts."""
+
+    counts: list[SavedViewCountSchema]
+
+
+class SavedViewObjectsRequest(BaseSchema):
+    """Optional overrides applied on top of a saved view's configuration."""
+
+    limit: int | None = None  # Defaults to the view's page_size
+    offset: int = 0
+    search: str | None = None  # Replaces the view's search_term when set
+
+
+class SavedViewObjectsResponse(BaseSchema):
+    """Response schema for executing a saved view: the resolved view and its first page."""
+
+    view: SavedViewSchema
+    objects: ObjectListResponse
@@ -1,16 +1,30 @@
 """Business logic for saved view operations."""
 
+import hashlib
 from datetime import UTC, datetime
 
 import msgspec
 from litestar.exceptions import PermissionDeniedException
-from sqlalchemy import select, update
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
 
+from app.objects.base import BaseObject
 from app.objects.enums import ObjectTypes
+from app.objects.schemas import ObjectListRequest
+from app.objects.services import build_filter_condition
+from app.utils.sqids import sqid_enc_hook
 from app.views.defaults import get_default_view_config
 from app.views.models import SavedView
-from app.views.schemas import SavedViewConfigSchema, SavedViewSchema
+from app.views.schemas import (
+    SavedViewConfigSchema,
+    SavedViewCountSchema,
+    SavedViewObjectsRequest,
+    SavedViewSchema,
+)
+
+# Badge counts are cheap to serve stale for a few seconds
+VIEW_COUNTS_CACHE_TTL_SECONDS = 30
 
 
 def check_view_ownership(view: SavedView, user_id: int) -> None:
@@ -122,3 +136,115 @@ async def get_or_create_default_view(
         created_at=datetime.now(tz=UTC),
         updated_at=datetime.now(tz=UTC),
     )
+
+
+async def list_views_for_user(
+    session: AsyncSession,
+    *,
+    user_id: int,
+    object_type: ObjectTypes,
+) -> list[SavedViewSchema]:
+    """List a user's personal and team-shared views for an object type.
+
+    Ordered default first, then by name. The hard-coded default view is prepended
+    when the user hasn't set a personal default. RLS filters to the current team.
+    """
+    stmt = (
+        select(SavedView)
+        .where(
+            SavedView.object_type == object_type,
+            or_(
+                SavedView.user_id == user_id,  # Personal views
+                SavedView.user_id.is_(None),  # Team-shared views
+            ),
+        )
+        .order_by(
+            SavedView.is_default.desc(),  # Default views first
+            SavedView.name.asc(),  # Then alphabetically
+        )
+    )
+    result = await session.execute(stmt)
+    view_schemas = [saved_view_to_schema(view) for view in result.scalars().all()]
+
+    # If no personal default, include system default view at the beginning
+    has_personal_default = any(v.is_default and v.is_personal for v in view_schemas)
+    if not has_personal_default:
+        system_default = await get_or_create_default_view(session, user_id=user_id, object_type=object_type)
+        # Only add if it's the hardcoded default (id=None)
+        if system_default.id is None:
+            view_schemas.insert(0, system_default)
+
+    return view_schemas
+
+
+def view_to_list_request(view: SavedViewSchema, overrides: SavedViewObjectsRequest) -> ObjectListRequest:
+    """Build the list request a client would send for a view, with paging/search overrides."""
+    return ObjectListRequest(
+        limit=overrides.limit if overrides.limit is not None else view.config.page_size,
+        offset=overrides.offset,
+        filters=view.config.column_filters,
+        sorts=view.config.sorting,
+        search=overrides.search if overrides.search is not None else view.config.search_term,
+    )
+
+
+def view_config_to_predicate(
+    object_class: type[BaseObject],
+    config: SavedViewConfigSchema,
+) -> ColumnElement[bool] | None:
+    """Translate a view's filters and search term into a single WHERE predicate.
+
+    Returns None when the view matches every object.
+    """
+    model = object_class.model()
+    conditions = [
+        condition
+        for filter_def in config.column_filters
+        if (condition := build_filter_condition(model, filter_def)) is not None
+    ]
+    search_filter = object_class.create_search_filter(config.search_term)
+    if search_filter is not None:
+        conditions.append(search_filter)
+    return and_(*conditions) if conditions else None
+
+
+async def count_views(
+    session: AsyncSession,
+    object_class: type[BaseObject],
+    views: list[SavedViewSchema],
+) -> list[SavedViewCountSchema]:
+    """Count matching objects for every view in one scan using count(*) FILTER (WHERE ...).
+
+    Scope and soft-delete filtering are applied automatically via SQLAlchemy events.
+    """
+    if not views:
+        return []
+
+    counts = []
+    for index, view in enumerate(views):
+        predicate = view_config_to_predicate(object_class, view.config)
+        count = func.count().filter(predicate) if predicate is not None else func.count()
+        counts.append(count.label(f"view_{index}"))
+
+    result = await session.execute(select(*counts).select_from(object_class.model()))
+    row = result.one()
+    return [SavedViewCountSchema(id=view.id, count=row[index]) for index, view in enumerate(views)]
+
+
+def view_counts_cache_key(
+    *,
+    team_id: int | None,
+    campaign_id: int | None,
+    user_id: int,
+    object_type: ObjectTypes,
+    views: list[SavedViewSchema],
+) -> str:
+    """Build a cache key for view counts.
+
+    Includes the RLS scope, and a digest of the view configs so that editing a
+    view's filters invalidates its cached counts immediately.
+    """
+    digest = hashlib.sha256(
+        msgspec.json.encode([(view.id, view.config) for view in views], enc_hook=sqid_enc_hook)
+    ).hexdigest()[:16]
+    return f"view_counts:{team_id}:{campaign_id}:{user_id}:{object_type}:{digest}"
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-request cost of setting RLS variables.
+
+Compares the old transaction prologue (BEGIN, then SET LOCAL, then the first query)
+with set_rls_variables, whose after_begin hook sends "BEGIN; SELECT set_config(...)"
+as one simple query, so psycopg skips its own BEGIN. Traffic goes through a local TCP
+proxy that delays every packet by half the round-trip time, to reproduce typical
+1-3 ms database latency.
+
+Usage:
+    uv run python scripts/bench_rls_prologue.py [--iterations 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.utils.configure import config
+from app.utils.db import set_rls_variables
+
+TEAM_ID = 1
+
+
+async def start_latency_proxy(target_host: str, target_port: int, rtt_ms: float) -> asyncio.Server:
+    """Forward TCP traffic to the database, delaying each chunk by rtt/2 in each direction."""
+    delay = rtt_ms / 2000
+
+    async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while chunk := await reader.read(65536):
+                await asyncio.sleep(delay)
+                writer.write(chunk)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        server_reader, server_writer = await asyncio.open_connection(target_host, target_port)
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer))
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def old_prologue(session: AsyncSession) -> None:
+    async with session.begin():
+        await session.execute(text(f"SET LOCAL app.team_id = {TEAM_ID}"))
+        await session.execute(text("SELECT 1"))
+
+
+async def new_prologue(session: AsyncSession) -> None:
+    request = SimpleNamespace(session={"scope_type": "team", "team_id": TEAM_ID})
+    async with session.begin():
+        await set_rls_variables(session, request)  # type: ignore[arg-type]
+        await session.execute(text("SELECT 1"))
+
+
+async def measure(sessionmaker: async_sessionmaker, prologue, iterations: int) -> float:
+    """Return the median milliseconds per request-shaped transaction."""
+    timings = []
+    for _ in range(iterations):
+        async with sessionmaker() as session:
+            start = time.perf_counter()
+            await prologue(session)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def main(iterations: int) -> None:
+    url = make_url(config.ASYNC_DATABASE_URL)
+    print(f"{'RTT':>6} {'SET LOCAL':>12} {'set_config':>12} {'saved':>10}")
+    for rtt_ms in (0.0, 1.0, 2.0, 3.0):
+        proxy = await start_latency_proxy(url.host or "localhost", url.port or 5432, rtt_ms)
+        proxy_port = proxy.sockets[0].getsockname()[1]
+        engine = create_async_engine(url.set(host="127.0.0.1", port=proxy_port), pool_size=1, max_overflow=0)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            await measure(sessionmaker, old_prologue, 5)  # Warm up the pooled connection
+            old_ms = await measure(sessionmaker, old_prologue, iterations)
+            new_ms = await measure(sessionmaker, new_prologue, iterations)
+        finally:
+            await engine.dispose()
+            proxy.close()
+        print(f"{rtt_ms:>4.1f}ms {old_ms:>10.2f}ms {new_ms:>10.2f}ms {old_ms - new_ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Switch the sessions table between LOGGED and UNLOGGED storage.
+
+UNLOGGED tables skip the write-ahead log, which cuts WAL traffic for session
+writes considerably. The trade-off: the table is truncated after a crash
+(everyone is logged out) and it is not replicated to read replicas.
+
+Usage:
+    uv run python scripts/set_sessions_logging.py --unlogged
+    uv run python scripts/set_sessions_logging.py --logged
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text
+
+from app.utils.configure import config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--unlogged", action="store_true", help="Store sessions without WAL")
+    mode.add_argument("--logged", action="store_true", help="Store sessions with WAL (default)")
+    args = parser.parse_args()
+
+    persistence = "UNLOGGED" if args.unlogged else "LOGGED"
+    # Changing persistence rewrites the table and needs the owner, so use the admin connection
+    engine = create_engine(config.ADMIN_DB_URL)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE sessions SET {persistence}"))
+        relpersistence = conn.execute(
+            text("SELECT relpersistence FROM pg_class WHERE oid = 'public.sessions'::regclass")
+        ).scalar_one()
+    engine.dispose()
+
+    print(f"sessions table is now {'UNLOGGED' if relpersistence == 'u' else 'LOGGED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 from litestar.testing import AsyncTestClient
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.utils.sqids import sqid_encode
+from app.campaigns.models import Campaign
+from app.objects.enums import ObjectTypes
+from app.threads.models import Thread
+from app.threads.services import ThreadIdCache, get_or_create_thread_id, thread_ids
+from app.utils.sqids import Sqid, sqid_encode
+from tests.factories.threads import MessageFactory, ThreadFactory
 
 
 class TestThreads:
@@ -57,6 +64,64 @@ class TestThreads:
         assert response.status_code in [200, 201, 204, 404]
 
 
+class TestGetOrCreateThreadId:
+    """Tests for resolving an object's thread with one upsert, cached per process."""
+
+    async def test_existing_thread_is_cached(self, db_session: AsyncSession, campaign, team):
+        """Test a thread is created once, and then served from the cache without a query."""
+        threadable_type = Campaign.threadable_type()
+        thread_id = await get_or_create_thread_id(db_session, threadable_type, campaign.id, team.id)
+        # Not cached until the transaction creating it commits
+        assert thread_ids.get(threadable_type, campaign.id, team.id) is None
+
+        assert await get_or_create_thread_id(db_session, threadable_type, campaign.id, team.id) == thread_id
+        threads = await db_session.scalar(
+            select(func.count()).where(Thread.threadable_type == threadable_type, Thread.threadable_id == campaign.id)
+        )
+        assert threads == 1
+
+        statements: list[str] = []
+
+        def record(orm_execute_state) -> None:
+            statements.append(str(orm_execute_state.statement))
+
+        event.listen(db_session.sync_session, "do_orm_execute", record)
+        assert await get_or_create_thread_id(db_session, threadable_type, campaign.id, team.id) == thread_id
+        event.remove(db_session.sync_session, "do_orm_execute", record)
+        assert statements == []
+
+        # Only served to the thread's team
+        assert thread_ids.get(threadable_type, campaign.id, team.id + 1) is None
+
+    async def test_created_thread_cached_on_commit(self, test_engine, setup_database):
+        """Test a thread created by a committed transaction is cached."""
+        sessionmaker = async_sessionmaker(test_engine)
+        async with sessionmaker.begin() as session:
+            await session.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+            team_id = await session.scalar(text("INSERT INTO teams (name) VALUES ('Threads') RETURNING id"))
+        try:
+            async with sessionmaker.begin() as session:
+                await session.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+                thread_id = await get_or_create_thread_id(session, "campaigns", team_id, team_id)
+                assert thread_ids.get("campaigns", team_id, team_id) is None
+            assert thread_ids.get("campaigns", team_id, team_id) == thread_id
+        finally:
+            async with sessionmaker.begin() as session:
+                await session.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+                await session.execute(text("DELETE FROM threads WHERE team_id = :id"), {"id": team_id})
+                await session.execute(text("DELETE FROM teams WHERE id = :id"), {"id": team_id})
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the cache keeps the most recently used threads."""
+        cache = ThreadIdCache(size=2)
+        cache.put("campaigns", 1, Sqid(11), team_id=1)
+        cache.put("campaigns", 2, Sqid(12), team_id=1)
+        assert cache.get("campaigns", 1, team_id=1) == 11
+        cache.put("campaigns", 3, Sqid(13), team_id=1)
+        assert cache.get("campaigns", 2, team_id=1) is None
+        assert cache.get("campaigns", 1, team_id=1) == 11
+
+
 class TestMessages:
     """Tests for message operations."""
 
@@ -73,6 +138,38 @@ class TestMessages:
         # Should succeed or return appropriate status
         assert response.status_code in [200, 404]
 
+    async def test_page_messages_newest_first(
+        self,
+        authenticated_client: AsyncTestClient,
+        db_session: AsyncSession,
+        campaign,
+        team,
+        user,
+    ):
+        """Test paging back from the newest messages with before, and forward with after."""
+        thread = await ThreadFactory.create_async(
+            session=db_session,
+            team_id=team.id,
+            threadable_type=Campaign.threadable_type(),
+            threadable_id=campaign.id,
+        )
+        for _ in range(5):
+            await MessageFactory.create_async(session=db_session, team_id=team.id, thread_id=thread.id, user_id=user.id)
+        await db_session.flush()
+        url = f"/threads/{ObjectTypes.Campaigns}/{sqid_encode(campaign.id)}/messages"
+
+        async def page(**params) -> tuple[list[int], bool]:
+            response = await authenticated_client.get(url, params={"limit": 2, **params})
+            assert response.status_code == 200, response.text
+            data = response.json()
+            return [message["seq"] for message in data["messages"]], data["has_more"]
+
+        assert await page(newest_first=True) == ([5, 4], True)
+        assert await page(newest_first=True, before=4) == ([3, 2], True)
+        assert await page(newest_first=True, before=2) == ([1], False)
+        assert await page(after=3) == ([4, 5], False)
+        assert await page() == ([1, 2], True)
+
 
 class TestThreadUnreadCounts:
     """Tests for thread unread count tracking."""
@@ -94,3 +191,35 @@ class TestThreadUnreadCounts:
         # Thread may be None if no thread exists yet, or contain unread info
         if data["thread"] is not None:
             assert "unread_count" in data["thread"] or "has_unread" in data["thread"]
+
+    async def test_unread_counts_on_detail_and_list(
+        self,
+        authenticated_client: AsyncTestClient,
+        db_session: AsyncSession,
+        campaign,
+        team,
+        user,
+    ):
+        """Test the detail and list endpoints count unread messages of the object's thread."""
+        thread = await ThreadFactory.create_async(
+            session=db_session,
+            team_id=team.id,
+            threadable_type=Campaign.threadable_type(),
+            threadable_id=campaign.id,
+        )
+        for _ in range(2):
+            await MessageFactory.create_async(session=db_session, team_id=team.id, thread_id=thread.id, user_id=user.id)
+        await db_session.flush()
+
+        response = await authenticated_client.get(f"/campaigns/{sqid_encode(campaign.id)}")
+        assert response.status_code == 200
+        assert response.json()["thread"] == {"thread_id": sqid_encode(thread.id), "unread_count": 2}
+
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Campaigns}", json={})
+        assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+        objects = {obj["id"]: obj for obj in response.json()["objects"]}
+        assert objects[sqid_encode(campaign.id)]["unread_count"] == 2
+
+        # Object types without threads leave it out
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Users}", json={})
+        assert all(obj.get("unread_count") is None for obj in response.json()["objects"])
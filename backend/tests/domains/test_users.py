@@ -89,6 +89,18 @@ class TestUsers:
         )
         assert response.status_code in [200, 201, 204]
 
+    async def test_logout_everywhere(
+        self,
+        authenticated_client: AsyncTestClient,
+    ):
+        """Test POST /auth/logout-everywhere ends the current session too."""
+
+        response = await authenticated_client.post("/auth/logout-everywhere")
+        assert response.status_code == 201
+
+        response = await authenticated_client.get("/users/current_user")
+        assert response.status_code == 401
+
 
 class TestTeams:
     """Tests for team endpoints."""
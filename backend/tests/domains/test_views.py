@@ -5,10 +5,13 @@ from litestar.testing import AsyncTestClient
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.campaigns.enums import CampaignStates
 from app.objects.enums import ObjectTypes
 from app.users.enums import RoleLevel
 from app.utils.sqids import sqid_encode
 from app.views.models import SavedView
+from tests.factories.brands import BrandFactory
+from tests.factories.campaigns import CampaignFactory
 
 
 class TestViews:
@@ -322,6 +325,101 @@ class TestViews:
         response = await authenticated_client.delete(f"/views/campaigns/{sqid_encode(team_view.id)}")
         assert response.status_code == 403
 
+    async def test_view_counts(
+        self,
+        authenticated_client: AsyncTestClient,
+        team,
+        user,
+        db_session: AsyncSession,
+    ):
+        """Test GET /views/{object_type}/counts counts every view in one request."""
+        brand = await BrandFactory.create_async(session=db_session, team_id=team.id)
+        for state in [CampaignStates.DRAFT, CampaignStates.ACTIVE, CampaignStates.ACTIVE]:
+            await CampaignFactory.create_async(session=db_session, team_id=team.id, brand_id=brand.id, state=state)
+
+        active_view = SavedView(
+            name="Active",
+            object_type=ObjectTypes.Campaigns,
+            config={
+                "display_mode": "table",
+                "column_filters": [
+                    {"type": "enum_filter", "column": "state", "values": [CampaignStates.ACTIVE.value]},
+                ],
+            },
+            user_id=user.id,
+            team_id=team.id,
+        )
+        db_session.add(active_view)
+        await db_session.flush()
+        await db_session.commit()
+
+        response = await authenticated_client.get("/views/campaigns/counts")
+        assert response.status_code == 200
+
+        counts = {item["id"]: item["count"] for item in response.json()["counts"]}
+        assert counts == {
+            None: 3,  # Hard-coded default view has no filters
+            sqid_encode(active_view.id): 2,
+        }
+
+        # Second request is served from the short-lived cache, so a new campaign isn't counted yet
+        await CampaignFactory.create_async(
+            session=db_session, team_id=team.id, brand_id=brand.id, state=CampaignStates.ACTIVE
+        )
+        await db_session.commit()
+
+        cached_response = await authenticated_client.get("/views/campaigns/counts")
+        assert cached_response.json() == response.json()
+
+    async def test_list_saved_view_objects(
+        self,
+        authenticated_client: AsyncTestClient,
+        team,
+        user,
+        db_session: AsyncSession,
+    ):
+        """Test POST /views/{object_type}/{id}/objects resolves the view and lists its objects."""
+        brand = await BrandFactory.create_async(session=db_session, team_id=team.id)
+        for state in [CampaignStates.DRAFT, CampaignStates.ACTIVE, CampaignStates.ACTIVE]:
+            await CampaignFactory.create_async(session=db_session, team_id=team.id, brand_id=brand.id, state=state)
+
+        active_view = SavedView(
+            name="Active",
+            object_type=ObjectTypes.Campaigns,
+            config={
+                "display_mode": "table",
+                "column_filters": [
+                    {"type": "enum_filter", "column": "state", "values": [CampaignStates.ACTIVE.value]},
+                ],
+                "page_size": 10,
+            },
+            user_id=user.id,
+            team_id=team.id,
+        )
+        db_session.add(active_view)
+        await db_session.flush()
+        await db_session.commit()
+
+        response = await authenticated_client.post(
+            f"/views/campaigns/{sqid_encode(active_view.id)}/objects",
+            json={"limit": 1},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["view"]["name"] == "Active"
+        assert data["objects"]["total"] == 2
+        assert data["objects"]["limit"] == 1  # Override beats the view's page_size
+        assert len(data["objects"]["objects"]) == 1
+
+        # The default alias falls back to the hard-coded default view
+        response = await authenticated_client.post("/views/campaigns/default/objects", json={})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["view"]["id"] is None
+        assert data["objects"]["total"] == 3
+
 
 class TestViewRLS:
     """Tests for Row-Level Security on views."""
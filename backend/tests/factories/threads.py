@@ -16,6 +16,7 @@ class ThreadFactory(BaseFactory):
 
     threadable_type = "Campaign"  # Default to Campaign, override as needed
     threadable_id = 1  # Must be explicitly set to valid ID
+    last_seq = 0  # Bumped as messages are inserted
     created_at = Use(
         BaseFactory.__faker__.date_time_between,
         start_date="-1y",
@@ -43,6 +44,7 @@ class MessageFactory(BaseFactory):
         }
     )
     campaign_id = None  # Must be explicitly set if needed
+    seq = None  # Assigned from the thread on insert
     created_at = Use(
         BaseFactory.__faker__.date_time_between,
         start_date="-1y",
@@ -105,6 +105,11 @@ async def provide_test_transaction(db_session: AsyncSession, request: "Request")
             pass  # Connection might be closed
 
 
+def provide_test_read_transaction(transaction: AsyncSession) -> AsyncSession:
+    """Test read transaction provider: reads share the test transaction's db_session."""
+    return transaction
+
+
 def provide_test_config(test_config: TestConfig) -> Config:
     """Dependency provider for test config."""
     return test_config
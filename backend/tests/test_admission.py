@@ -0,0 +1,141 @@
+"""Tests for per-team admission control (app/utils/admission.py)."""
+
+import asyncio
+
+import pytest
+from litestar.testing import AsyncTestClient
+
+from app.objects.enums import ObjectTypes
+from app.utils.admission import (
+    DEFAULT_ADMISSION_CLASS,
+    DEFAULT_LIMITS,
+    AdmissionController,
+    AdmissionLimits,
+    AdmissionRejectedError,
+    admission_controller,
+    parse_limits,
+)
+from app.utils.sqids import sqid_decode
+
+
+class TestAdmissionController:
+    """Tests for concurrency slots, token buckets and team isolation."""
+
+    @pytest.fixture
+    def controller(self) -> AdmissionController:
+        return AdmissionController(
+            {
+                "light": AdmissionLimits(concurrency=10, rate=100, burst=100),
+                "heavy": AdmissionLimits(concurrency=1, rate=100, burst=100),
+            },
+            max_wait=0.1,
+        )
+
+    async def test_waiting_request_gets_released_slot(self, controller: AdmissionController):
+        """Test a request over the concurrency limit is admitted once a slot is returned."""
+        await controller.acquire("team:1", "heavy")
+        waiter = asyncio.create_task(controller.acquire("team:1", "heavy"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        controller.release("team:1", "heavy")
+        await waiter
+        assert controller.snapshot() == {("team:1", "heavy"): 1}
+
+    async def test_rejected_after_max_wait(self, controller: AdmissionController):
+        """Test a request still over the limit after max_wait is rejected."""
+        await controller.acquire("team:1", "heavy")
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            await controller.acquire("team:1", "heavy")
+        assert exc_info.value.reason == "concurrency"
+        assert controller.snapshot() == {("team:1", "heavy"): 1}
+
+    async def test_limits_are_per_team_and_class(self, controller: AdmissionController):
+        """Test one team's heavy requests don't hold back other teams or its light requests."""
+        await controller.acquire("team:1", "heavy")
+        await asyncio.wait_for(controller.acquire("team:2", "heavy"), 0.05)
+        await asyncio.wait_for(controller.acquire("team:1", "light"), 0.05)
+
+    async def test_rate_limited_with_retry_after(self):
+        """Test requests beyond the burst wait for tokens, or are rejected when the wait is too long."""
+        controller = AdmissionController({"light": AdmissionLimits(concurrency=10, rate=10, burst=2)}, max_wait=0.15)
+        for _ in range(2):
+            await controller.acquire("team:1")
+            controller.release("team:1")
+
+        waiter = asyncio.create_task(controller.acquire("team:1"))  # Waits ~0.1s for the next token
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError) as exc_info:
+            await controller.acquire("team:1")  # Would wait ~0.2s, behind the reserved token
+        assert exc_info.value.reason == "rate"
+        assert exc_info.value.retry_after > 0.15
+
+        await waiter
+        assert controller.snapshot() == {("team:1", "light"): 1}
+
+    async def test_dashboard_fan_out_admitted(self):
+        """Test a 20-widget dashboard's parallel requests queue for dashboard slots instead of failing."""
+        controller = AdmissionController(DEFAULT_LIMITS, max_wait=1)
+
+        async def load_widget(admission_class: str) -> None:
+            await controller.acquire("team:1", admission_class)
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                controller.release("team:1", admission_class)
+
+        widgets = 20
+        await asyncio.gather(*(load_widget("dashboard") for _ in range(widgets)))
+
+        # The heavy class's rate can't refill that many tokens within the max wait
+        results = await asyncio.gather(*(load_widget("heavy") for _ in range(widgets)), return_exceptions=True)
+        assert any(isinstance(result, AdmissionRejectedError) for result in results)
+
+    def test_parse_limits(self):
+        """Test limit overrides parse as class=concurrency:rate:burst[:max_wait]."""
+        assert parse_limits("heavy=4:0.5:8") == {"heavy": AdmissionLimits(concurrency=4, rate=0.5, burst=8)}
+        assert parse_limits("dashboard=8:10:60:30")["dashboard"].max_wait == 30
+
+
+async def test_heavy_route_over_limit_returns_429(
+    authenticated_client: AsyncTestClient, team, monkeypatch: pytest.MonkeyPatch
+):
+    """Test a heavy request over its team's limit gets 429 with Retry-After."""
+    monkeypatch.setattr(admission_controller, "max_wait", 0.05)
+    key = f"team:{sqid_decode(str(team.id))}"
+    limit = admission_controller.limits["heavy"].concurrency
+    for _ in range(limit):
+        await admission_controller.acquire(key, "heavy")
+    try:
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Campaigns}/facets", json={"facets": ["state"]})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        # Light routes of the same team are still admitted
+        response = await authenticated_client.get(f"/o/{ObjectTypes.Campaigns}/schema")
+        assert response.status_code == 200
+    finally:
+        for _ in range(limit):
+            admission_controller.release(key, "heavy")
+
+
+async def test_widget_routes_admitted_as_dashboard(
+    authenticated_client: AsyncTestClient, monkeypatch: pytest.MonkeyPatch
+):
+    """Test the list, saved view and time series routes a dashboard's widgets load are in the dashboard class."""
+    admitted: list[str] = []
+    acquire = admission_controller.acquire
+
+    async def record(key: str, admission_class: str = DEFAULT_ADMISSION_CLASS) -> None:
+        admitted.append(admission_class)
+        await acquire(key, admission_class)
+
+    monkeypatch.setattr(admission_controller, "acquire", record)
+    time_series = {"field": "name", "time_range": "all_time", "aggregation": "count_"}
+    responses = await asyncio.gather(
+        authenticated_client.post(f"/o/{ObjectTypes.Brands}/data", json=time_series),
+        authenticated_client.post(f"/o/{ObjectTypes.Brands}", json={}),
+        authenticated_client.post(f"/views/{ObjectTypes.Brands}/default/objects", json={}),
+    )
+    assert [response.status_code for response in responses] == [201, 201, 200]
+    assert admitted == ["dashboard", "dashboard", "dashboard"]
@@ -0,0 +1,107 @@
+"""Tests for the process-wide channel hub (app/utils/channel_hub.py)."""
+
+import asyncio
+
+import pytest
+from litestar.channels import ChannelsPlugin
+from litestar.channels.backends.memory import MemoryChannelsBackend
+
+from app.threads.enums import ThreadSocketMessageType
+from app.threads.schemas import ServerMessage
+from app.threads.utils import encode_server_message_str, thread_event_coalesce_key
+from app.utils.channel_hub import ChannelHub, SocketQueue
+
+
+def presence(message_type: ThreadSocketMessageType, user_id: str, viewers: list[str]) -> bytes:
+    message = ServerMessage(message_type=message_type, user_id=user_id, viewers=viewers)
+    return encode_server_message_str(message).encode()
+
+
+class TestChannelHub:
+    """Tests for shared subscriptions, fan-out and backpressure."""
+
+    @pytest.fixture
+    async def channels(self):
+        plugin = ChannelsPlugin(backend=MemoryChannelsBackend(), arbitrary_channels_allowed=True)
+        async with plugin:
+            yield plugin
+
+    async def test_sockets_share_one_subscription(self, channels: ChannelsPlugin):
+        """Test every local socket gets each event through a single plugin subscriber."""
+        hub = ChannelHub(channels, linger=0)
+        received: dict[str, list[bytes]] = {"a": [], "b": []}
+
+        async def collect(name: str, event: bytes) -> None:
+            received[name].append(event)
+
+        async with (
+            hub.stream("thread_1", lambda e: collect("a", e)),
+            hub.stream("thread_1", lambda e: collect("b", e)),
+        ):
+            assert len(channels._channels["thread_1"]) == 1
+            assert hub.subscriber_count("thread_1") == 2
+
+            await channels.wait_published(b"hello", "thread_1")
+            for _ in range(20):
+                if all(received.values()):
+                    break
+                await asyncio.sleep(0.01)
+
+        assert received == {"a": [b"hello"], "b": [b"hello"]}
+        await asyncio.sleep(0.01)  # Released in the background
+        assert hub.channel_count() == 0
+        assert not channels._channels["thread_1"]
+
+    async def test_channel_lingers_for_reconnects(self, channels: ChannelsPlugin):
+        """Test a channel stays subscribed for the linger period after its last socket leaves."""
+        hub = ChannelHub(channels, linger=60)
+
+        async def ignore(event: bytes) -> None:
+            pass
+
+        async with hub.stream("thread_1", ignore):
+            subscriber = next(iter(channels._channels["thread_1"]))
+        async with hub.stream("thread_1", ignore):
+            assert channels._channels["thread_1"] == {subscriber}
+
+        await hub.close()
+        assert hub.channel_count() == 0
+        assert not channels._channels["thread_1"]
+
+
+class TestSocketQueue:
+    """Tests for the per-socket queue of slow clients."""
+
+    def test_oldest_events_dropped_when_full(self):
+        """Test a full queue drops its oldest event."""
+        queue = SocketQueue(maxsize=2)
+        for event in (b"1", b"2", b"3"):
+            queue.put(event)
+        assert len(queue) == 2
+        assert queue.dropped == 1
+
+    async def test_presence_events_coalesced(self):
+        """Test a user's queued presence events are replaced by their latest one."""
+        queue = SocketQueue(maxsize=10)
+        events = [
+            presence(ThreadSocketMessageType.USER_JOINED, "u1", ["u1"]),
+            b'{"message_type":"message_created","viewers":[],"message_id":"m1"}',
+            presence(ThreadSocketMessageType.USER_LEFT, "u1", []),
+        ]
+        for event in events:
+            queue.put(event, thread_event_coalesce_key(event))
+
+        assert [await queue.get() for _ in range(len(queue))] == [events[1], events[2]]
+
+    async def test_resync_after_dropped_message(self):
+        """Test dropping an event without a coalesce key sends the resync event next, once."""
+        queue = SocketQueue(maxsize=2, resync=b"resync")
+        queue.put(b"joined", "presence:u1")
+        queue.put(b"m1")
+        queue.put(b"m2")
+        assert await queue.get() == b"m1"  # Only the presence event was dropped
+
+        queue.put(b"m3")
+        queue.put(b"m4")
+        queue.put(b"m5")
+        assert [await queue.get() for _ in range(3)] == [b"resync", b"m4", b"m5"]
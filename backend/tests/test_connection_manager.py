@@ -0,0 +1,87 @@
+"""Tests for the process-wide connection budget (app/utils/connections.py)."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.utils.connections import (
+    ConnectionBudget,
+    ConnectionLimitError,
+    ConnectionManager,
+    ManagedConnection,
+    parse_budgets,
+)
+
+
+class TestConnectionManager:
+    """Tests for reservations, borrowing and the global cap."""
+
+    @pytest.fixture
+    def manager(self) -> ConnectionManager:
+        # 3 reserved, 2 shared
+        return ConnectionManager(
+            max_connections=5,
+            budgets={
+                "app": ConnectionBudget(reserved=2, limit=4),
+                "queue": ConnectionBudget(reserved=1, limit=3),
+            },
+            acquire_timeout=0.1,
+        )
+
+    async def test_reservations_survive_borrowing(self, manager: ConnectionManager):
+        """Test a purpose can't borrow into another purpose's reservation."""
+        for _ in range(4):
+            await manager.acquire("app")  # 2 reserved + 2 shared
+
+        with pytest.raises(ConnectionLimitError):
+            await manager.acquire("app")  # Over the app limit
+        await manager.acquire("queue")  # Still within its reservation
+        with pytest.raises(ConnectionLimitError):
+            await manager.acquire("queue")  # Shared headroom is used up by app
+
+        assert manager.snapshot() == {"app": 4, "queue": 1}
+
+    async def test_waiters_woken_on_release(self, manager: ConnectionManager):
+        """Test a waiting acquire proceeds once a connection is closed."""
+        for _ in range(4):
+            await manager.acquire("app")
+
+        waiter = asyncio.create_task(manager.acquire("app"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        manager.release("app")
+        await waiter
+        assert manager.snapshot()["app"] == 4
+
+    def test_reservations_must_fit_global_cap(self):
+        """Test budgets reserving more than the cap are rejected."""
+        with pytest.raises(ValueError):
+            ConnectionManager(max_connections=2, budgets={"app": ConnectionBudget(reserved=3, limit=3)})
+
+    def test_parse_budgets(self):
+        """Test budget overrides parse as purpose=reserved:limit."""
+        assert parse_budgets("app=10:20, queue=2") == {
+            "app": ConnectionBudget(reserved=10, limit=20),
+            "queue": ConnectionBudget(reserved=2, limit=2),
+        }
+
+    async def test_engine_connections_hold_budget_until_closed(self, test_config):
+        """Test engine connections are counted while open and released when closed."""
+        manager = ConnectionManager(max_connections=2, budgets={"app": ConnectionBudget(reserved=1, limit=2)})
+        engine = create_async_engine(
+            test_config.SQLALCHEMY_DB_URL,
+            **manager.pool_options("app"),
+            async_creator=manager.async_creator("app", test_config.SQLALCHEMY_DB_URL),
+        )
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                raw = await conn.get_raw_connection()
+                assert isinstance(raw.driver_connection, ManagedConnection)
+            assert manager.snapshot() == {"app": 1}  # Kept warm in the pool
+        finally:
+            await engine.dispose()
+        assert manager.snapshot() == {"app": 0}
@@ -0,0 +1,63 @@
+"""Tests for the warm connection pool (app/utils/pool.py)."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.utils.pool import WarmQueuePool
+
+
+class TestWarmQueuePool:
+    """Tests for keeping connections warm and closing them when idle."""
+
+    @pytest.fixture
+    async def engine(self, test_config):
+        engine = create_async_engine(
+            test_config.SQLALCHEMY_DB_URL,
+            poolclass=WarmQueuePool,
+            pool_size=2,
+            max_overflow=1,
+            idle_timeout=0.2,
+        )
+        yield engine
+        await engine.dispose()
+
+    async def test_connections_reused_while_warm(self, engine):
+        """Test sequential checkouts reuse one warm connection and are counted."""
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        pool = engine.pool
+        assert isinstance(pool, WarmQueuePool)
+        assert pool.stats.checkouts == 3
+        assert pool.stats.connects == 1
+        assert pool.checkedin() == 1
+
+    async def test_overflow_connections_closed_on_return(self, engine):
+        """Test a burst beyond pool_size opens overflow connections that aren't kept."""
+        async with engine.connect() as a, engine.connect() as b, engine.connect() as c:
+            for conn in (a, b, c):
+                await conn.execute(text("SELECT 1"))
+
+        assert engine.pool.stats.connects == 3
+        assert engine.pool.checkedin() == 2
+
+    async def test_idle_connections_closed(self, engine):
+        """Test every idle connection is closed after idle_timeout without checkouts."""
+        async with engine.connect() as a, engine.connect() as b:
+            await a.execute(text("SELECT 1"))
+            await b.execute(text("SELECT 1"))
+        assert engine.pool.checkedin() == 2
+
+        await asyncio.sleep(0.5)
+        assert engine.pool.checkedin() == 0
+        assert engine.pool.stats.idle_closes == 2
+
+        # The pool warms up again on the next checkout
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        assert engine.pool.stats.connects == 3
+        assert engine.pool.checkedin() == 1
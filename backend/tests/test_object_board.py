@@ -0,0 +1,75 @@
+"""Tests for kanban board endpoint (/o/{object_type}/board)."""
+
+import pytest
+from litestar.testing import AsyncTestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.campaigns.enums import CampaignStates
+from app.objects.enums import ObjectTypes
+from tests.factories.brands import BrandFactory
+from tests.factories.campaigns import CampaignFactory
+
+
+class TestObjectBoard:
+    """Tests for per-state top-N board loading."""
+
+    @pytest.fixture
+    async def campaigns(self, team, db_session: AsyncSession):
+        """Create three draft campaigns and one active campaign."""
+        brand = await BrandFactory.create_async(session=db_session, team_id=team.id)
+        for state in [CampaignStates.DRAFT, CampaignStates.DRAFT, CampaignStates.DRAFT, CampaignStates.ACTIVE]:
+            await CampaignFactory.create_async(session=db_session, team_id=team.id, brand_id=brand.id, state=state)
+        await db_session.flush()
+
+    async def test_board_returns_top_n_per_state(
+        self,
+        authenticated_client: AsyncTestClient,
+        campaigns,
+    ):
+        """Test every state gets a column with its first page and total."""
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Campaigns}/board", json={"limit": 2})
+
+        assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+        columns = {column["state"]: column for column in response.json()["columns"]}
+        assert set(columns) == {state.value for state in CampaignStates}
+
+        draft = columns[CampaignStates.DRAFT.value]
+        assert draft["total"] == 3
+        assert len(draft["objects"]) == 2
+        assert draft["next_cursor"] is not None
+
+        active = columns[CampaignStates.ACTIVE.value]
+        assert active["total"] == 1
+        assert len(active["objects"]) == 1
+        assert active["next_cursor"] is None
+
+        assert columns[CampaignStates.COMPLETED.value]["total"] == 0
+
+    async def test_board_cursor_loads_more_in_one_column(
+        self,
+        authenticated_client: AsyncTestClient,
+        campaigns,
+    ):
+        """Test a column cursor returns only the remaining objects of that column."""
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Campaigns}/board", json={"limit": 2})
+        draft = next(c for c in response.json()["columns"] if c["state"] == CampaignStates.DRAFT.value)
+
+        response = await authenticated_client.post(
+            f"/o/{ObjectTypes.Campaigns}/board",
+            json={"limit": 2, "cursor": draft["next_cursor"]},
+        )
+
+        assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+        (column,) = response.json()["columns"]
+        assert column["state"] == CampaignStates.DRAFT.value
+        assert column["total"] == 3
+        assert len(column["objects"]) == 1
+        assert column["next_cursor"] is None
+
+        loaded_ids = {obj["id"] for obj in draft["objects"]} | {obj["id"] for obj in column["objects"]}
+        assert len(loaded_ids) == 3
+
+    async def test_board_rejects_invalid_cursor(self, authenticated_client: AsyncTestClient):
+        """Test a malformed cursor is a client error."""
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Campaigns}/board", json={"cursor": "nope"})
+        assert response.status_code == 400
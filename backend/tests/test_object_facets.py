@@ -0,0 +1,107 @@
+"""Tests for facet counts endpoint (/o/{object_type}/facets)."""
+
+import pytest
+from litestar.testing import AsyncTestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.campaigns.enums import CampaignStates
+from app.objects.enums import ObjectTypes
+from app.utils.sqids import sqid_encode
+from tests.factories.brands import BrandFactory
+from tests.factories.campaigns import CampaignFactory
+
+
+class TestObjectFacets:
+    """Tests for facet counts under the current filters."""
+
+    @pytest.fixture
+    async def campaigns(self, team, db_session: AsyncSession):
+        """Create campaigns across two brands and three states."""
+        nike = await BrandFactory.create_async(session=db_session, team_id=team.id, name="Nike")
+        adidas = await BrandFactory.create_async(session=db_session, team_id=team.id, name="Adidas")
+        for brand, state in [
+            (nike, CampaignStates.DRAFT),
+            (nike, CampaignStates.DRAFT),
+            (nike, CampaignStates.ACTIVE),
+            (adidas, CampaignStates.ACTIVE),
+            (adidas, CampaignStates.COMPLETED),
+        ]:
+            await CampaignFactory.create_async(session=db_session, team_id=team.id, brand_id=brand.id, state=state)
+        await db_session.flush()
+        return nike, adidas
+
+    async def test_facet_counts_without_filters(
+        self,
+        authenticated_client: AsyncTestClient,
+        campaigns,
+    ):
+        """Test enum and object facets are counted in one request."""
+        nike, adidas = campaigns
+        response = await authenticated_client.post(
+            f"/o/{ObjectTypes.Campaigns}/facets",
+            json={"facets": ["state", "brand_id"]},
+        )
+
+        assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["total"] == 5
+
+        state_facet, brand_facet = data["facets"]
+        assert state_facet["column"] == "state"
+        assert {v["value"]: v["count"] for v in state_facet["values"]} == {
+            CampaignStates.DRAFT.value: 2,
+            CampaignStates.ACTIVE.value: 2,
+            CampaignStates.COMPLETED.value: 1,
+        }
+
+        assert brand_facet["column"] == "brand_id"
+        assert brand_facet["values"] == [
+            {"value": sqid_encode(nike.id), "count": 3, "label": "Nike"},
+            {"value": sqid_encode(adidas.id), "count": 2, "label": "Adidas"},
+        ]
+
+    async def test_facet_excludes_its_own_filter(
+        self,
+        authenticated_client: AsyncTestClient,
+        campaigns,
+    ):
+        """Test each facet applies every filter except the one on its own column."""
+        nike, _ = campaigns
+        response = await authenticated_client.post(
+            f"/o/{ObjectTypes.Campaigns}/facets",
+            json={
+                "facets": ["state", "brand_id"],
+                "filters": [
+                    {"type": "enum_filter", "column": "state", "values": [CampaignStates.ACTIVE.value]},
+                    {"type": "object_filter", "column": "brand_id", "values": [sqid_encode(nike.id)]},
+                ],
+            },
+        )
+
+        assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["total"] == 1
+
+        state_facet, brand_facet = data["facets"]
+        # State counts only see the brand filter
+        assert {v["value"]: v["count"] for v in state_facet["values"]} == {
+            CampaignStates.DRAFT.value: 2,
+            CampaignStates.ACTIVE.value: 1,
+        }
+        # Brand counts only see the state filter
+        assert {v["label"]: v["count"] for v in brand_facet["values"]} == {"Nike": 1, "Adidas": 1}
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"facets": ["no_such_field"]},
+            {"facets": ["name"]},
+            {"facets": ["state"], "filters": [{"type": "object_filter", "column": "brand_id", "values": ["!!"]}]},
+        ],
+        ids=["unknown_field", "non_facetable_field", "bad_filter_value"],
+    )
+    async def test_invalid_request_rejected(self, authenticated_client: AsyncTestClient, body: dict):
+        """Test an unknown or non-facetable field, or a bad filter value, is a validation error."""
+        response = await authenticated_client.post(f"/o/{ObjectTypes.Campaigns}/facets", json=body)
+
+        assert response.status_code == 400, f"Got {response.status_code}: {response.text}"
@@ -0,0 +1,78 @@
+"""Tests for read replica routing (provide_read_transaction)."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from litestar.datastructures import State
+from sqlalchemy import false, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.users.models import User
+from app.utils.providers import (
+    READ_FROM_WRITER_UNTIL_KEY,
+    provide_read_transaction,
+    provide_transaction,
+)
+
+
+class TestReadTransaction:
+    """Tests for routing reads to the replica with post-write stickiness."""
+
+    @pytest.fixture
+    async def writer_session(self, test_engine, setup_database):
+        session = AsyncSession(test_engine, expire_on_commit=False)
+        yield session
+        await session.close()
+
+    @pytest.fixture
+    async def reader_sessionmaker(self, test_config):
+        # A second engine on the same database stands in for the replica
+        engine = create_async_engine(test_config.SQLALCHEMY_DB_URL)
+        yield async_sessionmaker(engine, expire_on_commit=False)
+        await engine.dispose()
+
+    @staticmethod
+    def make_request(state: State):
+        return SimpleNamespace(
+            session={"scope_type": "team", "team_id": 42},
+            app=SimpleNamespace(state=state),
+            url=SimpleNamespace(path="/test"),
+            route_handler=SimpleNamespace(opt={}),
+            scope={},
+        )
+
+    async def read_bind(self, writer_session, request, state):
+        """Run a read through the provider and return the engine it used."""
+        provider = provide_read_transaction(writer_session, request, state)
+        session = await anext(provider)
+        try:
+            team_id = await session.scalar(text("SELECT current_setting('app.team_id', true)"))
+            assert team_id == "42"
+            return session.bind
+        finally:
+            await provider.aclose()
+
+    async def test_reads_use_replica(self, writer_session, reader_sessionmaker):
+        """Test reads go to the reader, with RLS applied."""
+        state = State({"reader_sessionmaker": reader_sessionmaker})
+        bind = await self.read_bind(writer_session, self.make_request(state), state)
+        assert bind is reader_sessionmaker.kw["bind"]
+
+    async def test_reads_use_writer_without_replica(self, writer_session):
+        """Test reads fall back to the writer when no reader is configured."""
+        state = State()
+        bind = await self.read_bind(writer_session, self.make_request(state), state)
+        assert bind is writer_session.bind
+
+    async def test_reads_stick_to_writer_after_write(self, writer_session, reader_sessionmaker):
+        """Test a committed write pins the user's reads to the writer for a short window."""
+        state = State({"reader_sessionmaker": reader_sessionmaker})
+        request = self.make_request(state)
+
+        async for session in provide_transaction(writer_session, request):  # type: ignore[arg-type]
+            await session.execute(update(User).where(false()).values(name="unchanged"))
+        assert request.session[READ_FROM_WRITER_UNTIL_KEY] > time.time()
+
+        bind = await self.read_bind(writer_session, request, state)
+        assert bind is writer_session.bind
@@ -6,9 +6,14 @@ These tests verify that:
 3. System mode bypass works as expected
 """
 
+from types import SimpleNamespace
+
 import pytest
+from psycopg.pq import TransactionStatus
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.utils.db import get_rls_settings, set_rls_variables
 
 
 class TestRLSConfiguration:
@@ -188,3 +193,51 @@ class TestRLSConfiguration:
         finally:
             # Restore system mode for cleanup
             await db_session.execute(text("SET LOCAL app.is_system_mode = true"))
+
+
+class TestRLSPrologue:
+    """Test RLS variables are set as the opening statement of each transaction."""
+
+    async def test_rls_variables_set_on_first_query(self, test_engine, setup_database):
+        """Verify team scope is applied when the transaction first uses a connection."""
+        request = SimpleNamespace(session={"scope_type": "team", "team_id": 42})
+        session = async_sessionmaker(test_engine, expire_on_commit=False)()
+        try:
+            async with session.begin():
+                await set_rls_variables(session, request)  # type: ignore[arg-type]
+                team_id = await session.scalar(text("SELECT current_setting('app.team_id', true)"))
+                assert team_id == "42"
+
+            # Transaction-scoped like SET LOCAL, and re-applied for the next transaction
+            async with session.begin():
+                team_id = await session.scalar(text("SELECT current_setting('app.team_id', true)"))
+                assert team_id == "42"
+        finally:
+            await session.close()
+
+    def test_rls_settings_require_scope_ids(self):
+        """Verify a scope without its id is rejected."""
+        assert get_rls_settings({}) == {}
+        assert get_rls_settings({"scope_type": "campaign", "campaign_id": 7}) == {"app.campaign_id": "7"}
+        with pytest.raises(ValueError):
+            get_rls_settings({"scope_type": "team"})
+
+    async def test_rls_variables_not_inherited_by_next_checkout(self, test_config, setup_database):
+        """Verify the scope is local to its transaction, not to the pooled connection."""
+        engine = create_async_engine(test_config.SQLALCHEMY_DB_URL, pool_size=1, max_overflow=0)
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        request = SimpleNamespace(session={"scope_type": "team", "team_id": 42})
+        try:
+            async with sessionmaker() as session, session.begin():
+                await set_rls_variables(session, request)  # type: ignore[arg-type]
+                connection = await session.connection()
+                # BEGIN went out together with the settings, before the first statement
+                driver_connection = (await connection.get_raw_connection()).driver_connection
+                assert driver_connection.pgconn.transaction_status == TransactionStatus.INTRANS  # type: ignore[union-attr]
+                assert await session.scalar(text("SELECT current_setting('app.team_id', true)")) == "42"
+
+            async with sessionmaker() as session, session.begin():
+                team_id = await session.scalar(text("SELECT current_setting('app.team_id', true)"))
+                assert not team_id
+        finally:
+            await engine.dispose()
@@ -0,0 +1,107 @@
+"""Tests for the encrypted cookie session backend."""
+
+import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from litestar.exceptions import ImproperlyConfiguredException
+from litestar.stores.memory import MemoryStore
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.sessions.cookie import (
+    ISSUED_AT_KEY,
+    SESSION_ID_KEY,
+    ScopedCookieBackendConfig,
+    ScopedCookieSessionBackend,
+    parse_cookie_secrets,
+    revoke_session,
+    revoke_team_sessions,
+    revoke_team_sessions_after_commit,
+    revoke_user_sessions,
+)
+
+OLD_SECRET = os.urandom(32)
+NEW_SECRET = os.urandom(32)
+
+
+def make_backend(secret: bytes, previous_secrets: list[bytes] | None = None) -> ScopedCookieSessionBackend:
+    config = ScopedCookieBackendConfig(secret=secret, previous_secrets=previous_secrets or [])
+    return ScopedCookieSessionBackend(config)
+
+
+class TestScopedCookieSessionBackend:
+    """Tests for encryption, key rotation and revocation."""
+
+    def test_round_trip_stamps_session(self) -> None:
+        """Test the RLS scope survives a round trip and the session gets an id and issue time."""
+        backend = make_backend(NEW_SECRET)
+        session = {"user_id": 1, "scope_type": "team", "team_id": 2}
+
+        loaded = backend.load_data(backend.dump_data(session))
+
+        assert loaded["team_id"] == 2
+        assert loaded[SESSION_ID_KEY]
+        assert loaded[ISSUED_AT_KEY] > 0
+
+    def test_previous_secrets_still_decrypt(self) -> None:
+        """Test sessions encrypted with a rotated-out key are still accepted."""
+        cookies = make_backend(OLD_SECRET).dump_data({"user_id": 1})
+
+        assert make_backend(NEW_SECRET, [OLD_SECRET]).load_data(cookies)["user_id"] == 1
+        with pytest.raises(InvalidTag):
+            make_backend(NEW_SECRET).load_data(cookies)
+
+    async def test_revoked_sessions_are_rejected(self, memory_store: MemoryStore) -> None:
+        """Test logout revokes one session and user revocation covers earlier sessions."""
+        backend = make_backend(NEW_SECRET)
+        first = backend.load_data(backend.dump_data({"user_id": 1}))
+        second = backend.load_data(backend.dump_data({"user_id": 1}))
+
+        await revoke_session(memory_store, first)
+        assert await backend._is_revoked(memory_store, first)
+        assert not await backend._is_revoked(memory_store, second)
+
+        await revoke_user_sessions(memory_store, 1)
+        assert await backend._is_revoked(memory_store, second)
+
+    async def test_team_revocation_covers_sessions_scoped_to_it(self, memory_store: MemoryStore) -> None:
+        """Test revoking a team's sessions leaves the user's sessions in other scopes alone."""
+        backend = make_backend(NEW_SECRET)
+        in_team = backend.load_data(backend.dump_data({"user_id": 1, "team_id": 2}))
+        elsewhere = backend.load_data(backend.dump_data({"user_id": 1, "team_id": 3}))
+
+        await revoke_team_sessions(memory_store, 2)
+        assert await backend._is_revoked(memory_store, in_team)
+        assert not await backend._is_revoked(memory_store, elsewhere)
+
+        # The same session switching into the revoked team is caught
+        assert await backend._is_revoked(memory_store, elsewhere | {"team_id": 2})
+
+    async def test_team_revoked_only_once_deletion_commits(
+        self, memory_store: MemoryStore, test_engine, setup_database
+    ) -> None:
+        """Test a rolled back team deletion leaves the team's sessions valid."""
+        backend = make_backend(NEW_SECRET)
+        session = backend.load_data(backend.dump_data({"user_id": 1, "team_id": 2}))
+
+        async with AsyncSession(test_engine) as transaction:
+            with pytest.raises(RuntimeError):
+                async with transaction.begin():
+                    revoke_team_sessions_after_commit(transaction, memory_store, 2)
+                    raise RuntimeError
+        assert not await backend._is_revoked(memory_store, session)
+
+        async with AsyncSession(test_engine) as transaction, transaction.begin():
+            revoke_team_sessions_after_commit(transaction, memory_store, 2)
+            assert not await backend._is_revoked(memory_store, session)
+        assert await backend._is_revoked(memory_store, session)
+
+    def test_cookie_secrets_are_validated(self) -> None:
+        """Test misconfigured SESSION_COOKIE_SECRETS fail with a clear error."""
+        assert parse_cookie_secrets(f"{NEW_SECRET.hex()}, {OLD_SECRET.hex()}") == [NEW_SECRET, OLD_SECRET]
+        with pytest.raises(ImproperlyConfiguredException, match="must be set"):
+            parse_cookie_secrets(" , ")
+        with pytest.raises(ImproperlyConfiguredException, match="hex"):
+            parse_cookie_secrets("not-hex")
+        with pytest.raises(ImproperlyConfiguredException, match="32 bytes"):
+            parse_cookie_secrets("abcd")
@@ -0,0 +1,217 @@
+"""Tests for PostgreSQLSessionStore and session cleanup."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+
+import msgspec
+import pytest
+from litestar.channels import ChannelsPlugin
+from litestar.channels.backends.memory import MemoryChannelsBackend
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.sessions.models import Session
+from app.sessions.store import PostgreSQLSessionStore
+from app.sessions.tasks import delete_expired_sessions_batch
+
+
+@pytest.fixture
+async def channels() -> AsyncGenerator[ChannelsPlugin]:
+    plugin = ChannelsPlugin(backend=MemoryChannelsBackend(), arbitrary_channels_allowed=True)
+    async with plugin:
+        yield plugin
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession):
+    """Provide a session factory that runs on the test transaction."""
+
+    @asynccontextmanager
+    async def session_factory() -> AsyncGenerator[AsyncSession]:
+        yield db_session
+
+    return session_factory
+
+
+@pytest.fixture
+async def session_store(session_factory, channels: ChannelsPlugin) -> AsyncGenerator[PostgreSQLSessionStore]:
+    """Provide a caching session store that runs on the test transaction."""
+    store = PostgreSQLSessionStore(session_factory, cache_max_entries=2)
+    await store.start_invalidation_listener(channels)
+    yield store
+    await store.stop_invalidation_listener()
+
+
+class TestPostgreSQLSessionStore:
+    """Tests for upsert writes and the in-process read cache."""
+
+    async def test_set_upserts_and_get_round_trips(
+        self, session_store: PostgreSQLSessionStore, db_session: AsyncSession
+    ) -> None:
+        """Test set inserts then updates the same row."""
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1}), expires_in=60)
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1, "team_id": 2}), expires_in=60)
+
+        rows = (await db_session.execute(select(Session).where(Session.session_id == "abc"))).scalars().all()
+        assert [row.data for row in rows] == [{"user_id": 1, "team_id": 2}]
+        assert msgspec.json.decode(await session_store.get("abc")) == {"user_id": 1, "team_id": 2}
+        expires_in = await session_store.expires_in("abc")
+        assert expires_in is not None and 0 < expires_in <= 60
+
+    async def test_get_is_served_from_cache(
+        self, session_store: PostgreSQLSessionStore, db_session: AsyncSession
+    ) -> None:
+        """Test reads after a write don't hit the database."""
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1}), expires_in=60)
+
+        # Remove the row behind the store's back: the cached copy is still served
+        await db_session.execute(delete(Session).where(Session.session_id == "abc"))
+        assert msgspec.json.decode(await session_store.get("abc")) == {"user_id": 1}
+        assert await session_store.exists("abc")
+
+    async def test_delete_invalidates_cache(self, session_store: PostgreSQLSessionStore) -> None:
+        """Test deleted sessions are not served from the cache."""
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1}), expires_in=60)
+        await session_store.delete("abc")
+
+        assert await session_store.get("abc") is None
+        assert not await session_store.exists("abc")
+
+    async def test_cache_is_bounded(self, session_store: PostgreSQLSessionStore) -> None:
+        """Test the least recently used session is evicted when the cache is full."""
+        for key in ["a", "b", "c"]:
+            await session_store.set(key, msgspec.json.encode({"key": key}), expires_in=60)
+
+        assert list(session_store._cache) == ["b", "c"]
+        # Evicted sessions are still loaded from the database
+        assert msgspec.json.decode(await session_store.get("a")) == {"key": "a"}
+
+    async def test_renewals_are_coalesced(
+        self, session_store: PostgreSQLSessionStore, db_session: AsyncSession
+    ) -> None:
+        """Test re-setting unchanged data only queues renewals that move the expiry enough."""
+        data = msgspec.json.encode({"user_id": 1})
+        await session_store.set("abc", data, expires_in=100)
+
+        # Moving the expiry by less than 10% of the TTL is ignored
+        await session_store.set("abc", data, expires_in=105)
+        assert session_store._pending_renewals == {}
+
+        # Moving it further is queued, not written
+        await session_store.set("abc", data, expires_in=200)
+        await session_store.get("abc", renew_for=300)
+        assert list(session_store._pending_renewals) == ["abc"]
+
+        assert await session_store.flush_renewals() == 1
+        assert session_store._pending_renewals == {}
+        session = (await db_session.execute(select(Session).where(Session.session_id == "abc"))).scalar_one()
+        await db_session.refresh(session)
+        assert 290 < (session.expires_at - datetime.now(tz=UTC)).total_seconds() <= 300
+
+    async def test_changed_data_is_written_immediately(self, session_store: PostgreSQLSessionStore) -> None:
+        """Test a set with new data is an upsert and drops any pending renewal."""
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1}), expires_in=100)
+        await session_store.get("abc", renew_for=200)
+        await session_store.set("abc", msgspec.json.encode({"user_id": 2}), expires_in=100)
+
+        assert session_store._pending_renewals == {}
+        session_store._cache.clear()
+        assert msgspec.json.decode(await session_store.get("abc")) == {"user_id": 2}
+
+    async def test_delete_where_removes_a_users_sessions(self, session_store: PostgreSQLSessionStore) -> None:
+        """Test deleting by a session field removes only the matching sessions, cached or not."""
+        await session_store.set("a", msgspec.json.encode({"user_id": 1}), expires_in=60)
+        await session_store.set("b", msgspec.json.encode({"user_id": 2}), expires_in=60)
+
+        await session_store.delete_where("user_id", 1)
+        assert await session_store.get("a") is None
+        assert msgspec.json.decode(await session_store.get("b")) == {"user_id": 2}
+
+    async def test_other_workers_drop_changed_sessions(
+        self, session_store: PostgreSQLSessionStore, session_factory, channels: ChannelsPlugin
+    ) -> None:
+        """Test a session changed or deleted on one worker isn't served from another's cache."""
+        other_worker = PostgreSQLSessionStore(session_factory)
+        await other_worker.start_invalidation_listener(channels)
+
+        async def served_by_other_worker() -> dict | None:
+            for _ in range(50):
+                await asyncio.sleep(0.01)  # Let the invalidation arrive
+                if "abc" not in other_worker._cache:
+                    break
+            data = await other_worker.get("abc")
+            return msgspec.json.decode(data) if data is not None else None
+
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1, "team_id": 1}), expires_in=60)
+        assert await served_by_other_worker() == {"user_id": 1, "team_id": 1}
+        assert "abc" in other_worker._cache
+
+        # Switching scope
+        await session_store.set("abc", msgspec.json.encode({"user_id": 1, "team_id": 2}), expires_in=60)
+        assert await served_by_other_worker() == {"user_id": 1, "team_id": 2}
+
+        # Logging out
+        await session_store.delete("abc")
+        assert await served_by_other_worker() is None
+        await other_worker.stop_invalidation_listener()
+
+    async def test_missing_sessions_cached_until_written(
+        self, session_store: PostgreSQLSessionStore, session_factory, channels: ChannelsPlugin
+    ) -> None:
+        """Test a cached miss (e.g. no revocation of a session) is dropped when another worker writes the key."""
+        other_worker = PostgreSQLSessionStore(session_factory)
+        await other_worker.start_invalidation_listener(channels)
+
+        assert not await other_worker.exists("sid:abc")
+        assert other_worker._cache["sid:abc"].data is None
+        assert await other_worker.expires_in("sid:abc") is None
+
+        await session_store.set("sid:abc", b"1", expires_in=60)
+        for _ in range(50):
+            await asyncio.sleep(0.01)  # Let the invalidation arrive
+            if "sid:abc" not in other_worker._cache:
+                break
+        assert await other_worker.exists("sid:abc")
+        await other_worker.stop_invalidation_listener()
+
+    async def test_not_cached_without_invalidations(self, session_factory, db_session: AsyncSession) -> None:
+        """Test sessions aren't cached unless the store listens for invalidations."""
+        store = PostgreSQLSessionStore(session_factory)
+        await store.set("abc", msgspec.json.encode({"user_id": 1}), expires_in=60)
+
+        await db_session.execute(delete(Session).where(Session.session_id == "abc"))
+        assert await store.get("abc") is None
+
+    async def test_renews_without_cache(self, session_factory, db_session: AsyncSession) -> None:
+        """Test get(renew_for=...) queues a renewal when caching is disabled."""
+        store = PostgreSQLSessionStore(session_factory, cache_ttl=0)
+        await store.set("abc", msgspec.json.encode({"user_id": 1}), expires_in=100)
+
+        await store.get("abc", renew_for=300)
+        assert list(store._pending_renewals) == ["abc"]
+
+        assert await store.flush_renewals() == 1
+        session = (await db_session.execute(select(Session).where(Session.session_id == "abc"))).scalar_one()
+        await db_session.refresh(session)
+        assert 290 < (session.expires_at - datetime.now(tz=UTC)).total_seconds() <= 300
+
+
+class TestSessionCleanup:
+    """Tests for batched deletion of expired sessions."""
+
+    async def test_deletes_expired_sessions_in_batches(self, db_session: AsyncSession) -> None:
+        """Test each batch deletes at most batch_size expired sessions and keeps live ones."""
+        now = datetime.now(tz=UTC)
+        for key in ["old-1", "old-2", "old-3"]:
+            db_session.add(Session(session_id=key, data={}, expires_at=now - timedelta(days=1)))
+        db_session.add(Session(session_id="live", data={}, expires_at=now + timedelta(days=1)))
+        await db_session.flush()
+
+        assert await delete_expired_sessions_batch(db_session, now=now, batch_size=2) == 2
+        assert await delete_expired_sessions_batch(db_session, now=now, batch_size=2) == 1
+        assert await delete_expired_sessions_batch(db_session, now=now, batch_size=2) == 0
+
+        remaining = (await db_session.execute(select(Session.session_id))).scalars().all()
+        assert remaining == ["live"]
@@ -0,0 +1,35 @@
+"""Tests for short-lived WebSocket transactions (provide_socket_transactions)."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.utils.providers import provide_socket_transactions
+
+
+class TestSocketTransactions:
+    """Tests that socket transactions hold a connection only while in use."""
+
+    @pytest.fixture
+    async def engine(self, test_config, setup_database):
+        engine = create_async_engine(test_config.SQLALCHEMY_DB_URL, pool_size=1, max_overflow=0)
+        yield engine
+        await engine.dispose()
+
+    async def test_connection_returned_after_each_transaction(self, engine):
+        """Test each transaction applies RLS, commits and returns its connection to the pool."""
+        socket = SimpleNamespace(
+            session={"scope_type": "team", "team_id": 42},
+            url=SimpleNamespace(path="/ws/threads/Campaign/abc"),
+            route_handler=SimpleNamespace(opt={}),
+        )
+        socket_transactions = provide_socket_transactions(AsyncSession(engine), socket)  # type: ignore[arg-type]
+
+        for _ in range(2):
+            async with socket_transactions() as session:
+                team_id = await session.scalar(text("SELECT current_setting('app.team_id', true)"))
+                assert team_id == "42"
+                assert engine.pool.checkedout() == 1
+            assert engine.pool.checkedout() == 0
@@ -0,0 +1,122 @@
+"""Tests for statement timeouts and query cancellation on client disconnect."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from psycopg.errors import QueryCanceled
+from psycopg.pq import TransactionStatus
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.cancellation import DB_SESSIONS_STATE_KEY, CancelOnDisconnectMiddleware, track_session
+from app.utils.configure import config
+from app.utils.db import DRIVER_CONNECTION_KEY, STATEMENT_TIMEOUT_OPT, set_statement_timeout
+from app.utils.providers import provide_transaction
+
+
+class TestStatementTimeout:
+    """Tests for the per-route statement timeout and disconnect cancellation."""
+
+    @pytest.fixture
+    async def session(self, test_engine, setup_database):
+        session = AsyncSession(test_engine, expire_on_commit=False)
+        yield session
+        await session.close()
+
+    @staticmethod
+    def make_request(opt: dict, state: dict | None = None):
+        return SimpleNamespace(
+            session={"scope_type": "team", "team_id": 42},
+            app=SimpleNamespace(state={}),
+            url=SimpleNamespace(path="/test"),
+            route_handler=SimpleNamespace(opt=opt),
+            scope={"state": state or {}},
+        )
+
+    async def test_route_timeout_applied_locally(self, session):
+        """Test provide_transaction uses the route's timeout, falling back to the default."""
+        async for tx in provide_transaction(session, self.make_request({STATEMENT_TIMEOUT_OPT: 1234})):  # type: ignore[arg-type]
+            assert await tx.scalar(text("SHOW statement_timeout")) == "1234ms"
+
+        async for tx in provide_transaction(session, self.make_request({})):  # type: ignore[arg-type]
+            timeout = await tx.scalar(text("SELECT current_setting('statement_timeout')::interval"))
+            assert timeout.total_seconds() * 1000 == config.DB_STATEMENT_TIMEOUT_MS
+
+    async def test_settings_visible_inside_transaction_only(self, session):
+        """Test RLS variables and the timeout are set in the transaction and don't outlive it."""
+        async for tx in provide_transaction(session, self.make_request({STATEMENT_TIMEOUT_OPT: 1234})):  # type: ignore[arg-type]
+            assert await tx.scalar(text("SELECT current_setting('app.team_id', true)")) == "42"
+            assert await tx.scalar(text("SHOW statement_timeout")) == "1234ms"
+
+        async with session.bind.connect() as connection:  # type: ignore[union-attr]
+            assert await connection.scalar(text("SELECT current_setting('app.team_id', true)")) in (None, "")
+
+    async def test_slow_statement_canceled(self, session):
+        """Test a statement running past the timeout is canceled."""
+        set_statement_timeout(session, 50)
+        with pytest.raises(OperationalError) as exc_info:
+            async with session.begin():
+                await session.execute(text("SELECT pg_sleep(5)"))
+        assert isinstance(exc_info.value.orig, QueryCanceled)
+
+    async def test_query_canceled_on_client_disconnect(self, session):
+        """Test the middleware cancels a running query when the client disconnects."""
+        received: list[str] = []
+
+        async def app(scope, receive, send):
+            received.append((await receive())["type"])
+            # What provide_transaction does for each request
+            track_session(SimpleNamespace(scope=scope), session)  # type: ignore[arg-type]
+            set_statement_timeout(session, 10_000)
+            try:
+                async with session.begin():
+                    await session.execute(text("SELECT pg_sleep(5)"))
+            finally:
+                received.append((await receive())["type"])
+
+        messages = [{"type": "http.request", "body": b"", "more_body": False}, {"type": "http.disconnect"}]
+
+        async def receive():
+            if len(messages) == 1:
+                # Disconnect once the query runs, however long connecting took
+                while (driver_connection := session.sync_session.info.get(DRIVER_CONNECTION_KEY)) is None or (
+                    driver_connection.pgconn.transaction_status != TransactionStatus.ACTIVE
+                ):
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.1)
+            return messages.pop(0)
+
+        scope = {"type": "http", "path": "/test", "state": {}}
+        with pytest.raises(OperationalError) as exc_info:
+            async with asyncio.timeout(2):
+                await CancelOnDisconnectMiddleware()(app)(scope, receive, None)  # type: ignore[arg-type]
+
+        assert isinstance(exc_info.value.orig, QueryCanceled)
+        assert received == ["http.request", "http.disconnect"]
+        assert scope["state"][DB_SESSIONS_STATE_KEY] == [session]
+
+    async def test_streamed_body_not_read_ahead(self):
+        """Test the middleware reads a streamed body no faster than the app consumes it."""
+        chunks = [{"type": "http.request", "body": b"x", "more_body": True} for _ in range(10)]
+        chunks.append({"type": "http.request", "body": b"", "more_body": False})
+        served = 0
+
+        async def receive():
+            nonlocal served
+            if served == len(chunks):
+                await asyncio.Event().wait()
+            served += 1
+            return chunks[served - 1]
+
+        async def app(scope, receive, send):
+            await asyncio.sleep(0.05)
+            assert served <= 2
+            while (await receive()).get("more_body"):
+                pass
+            assert served == len(chunks)
+
+        scope = {"type": "http", "path": "/test", "state": {}}
+        async with asyncio.timeout(2):
+            await CancelOnDisconnectMiddleware()(app)(scope, receive, None)  # type: ignore[arg-type]
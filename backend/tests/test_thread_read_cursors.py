@@ -0,0 +1,158 @@
+"""Tests for per-thread message sequence numbers and read cursors."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.threads.models import ThreadReadCursor, ThreadReadStatus
+from app.threads.read_receipts import ReadReceipts
+from app.threads.services import (
+    get_batch_unread_counts,
+    get_thread_unread_infos,
+    get_unread_count,
+    mark_thread_as_read,
+)
+from app.threads.tasks import compact_thread_read_log_batch
+from tests.factories.threads import MessageFactory
+
+
+class TestThreadReadCursors:
+    """Tests for unread counts computed from Thread.last_seq and the user's cursor."""
+
+    async def post(self, db_session: AsyncSession, thread, team, user, count: int = 1) -> list:
+        return [
+            await MessageFactory.create_async(session=db_session, team_id=team.id, thread_id=thread.id, user_id=user.id)
+            for _ in range(count)
+        ]
+
+    async def test_messages_numbered_per_thread(self, db_session: AsyncSession, thread, team, user):
+        """Test messages get consecutive numbers and the thread tracks the latest."""
+        messages = await self.post(db_session, thread, team, user, count=3)
+
+        assert [message.seq for message in messages] == [1, 2, 3]
+        assert thread.last_seq == 3
+
+    async def test_unread_counts_follow_cursor(self, db_session: AsyncSession, thread, team, user, campaign):
+        """Test unread counts start at all messages, reset on read, and skip deleted messages."""
+        await self.post(db_session, thread, team, user, count=2)
+        assert await get_unread_count(db_session, thread.id, user.id) == 2
+
+        await mark_thread_as_read(db_session, thread.id, user.id)
+        await mark_thread_as_read(db_session, thread.id, user.id)  # Upserts the same cursor
+        assert await get_unread_count(db_session, thread.id, user.id) == 0
+        cursors = (await db_session.scalars(select(ThreadReadCursor).where(ThreadReadCursor.user_id == user.id))).all()
+        assert [cursor.seq for cursor in cursors] == [2]
+
+        new_messages = await self.post(db_session, thread, team, user, count=3)
+        new_messages[0].soft_delete()
+        await db_session.flush()
+        assert await get_unread_count(db_session, thread.id, user.id) == 2
+        assert await get_batch_unread_counts(db_session, "Campaign", [campaign.id], user.id) == [(thread.id, 2)]
+        infos = await get_thread_unread_infos(db_session, "Campaign", [campaign.id, campaign.id + 1], user.id)
+        assert {object_id: (info.thread_id, info.unread_count) for object_id, info in infos.items()} == {
+            campaign.id: (thread.id, 2)
+        }
+
+    async def test_compaction_folds_read_log_into_cursors(self, db_session: AsyncSession, thread, team, user):
+        """Test the legacy read log is backfilled into cursors and deleted, never moving a cursor back."""
+        messages = await self.post(db_session, thread, team, user, count=3)
+        read_at = messages[1].created_at + timedelta(microseconds=1)
+        if messages[2].created_at <= read_at:
+            messages[2].created_at = read_at + timedelta(seconds=1)
+        for at in (read_at - timedelta(days=1), read_at):
+            db_session.add(ThreadReadStatus(thread_id=thread.id, user_id=user.id, read_at=at))
+        await db_session.flush()
+
+        assert await compact_thread_read_log_batch(db_session, batch_size=1) == 1
+        assert await compact_thread_read_log_batch(db_session, batch_size=10) == 1
+        assert await compact_thread_read_log_batch(db_session, batch_size=10) == 0
+
+        assert await db_session.scalar(select(func.count()).select_from(ThreadReadStatus)) == 0
+        assert await get_unread_count(db_session, thread.id, user.id) == 1
+
+        # A stale log row doesn't undo a later read
+        await mark_thread_as_read(db_session, thread.id, user.id)
+        db_session.add(ThreadReadStatus(thread_id=thread.id, user_id=user.id, read_at=datetime(2020, 1, 1, tzinfo=UTC)))
+        await db_session.flush()
+        await compact_thread_read_log_batch(db_session, batch_size=10)
+        assert await get_unread_count(db_session, thread.id, user.id) == 0
+
+
+class TestReadReceipts:
+    """Tests for coalescing read cursor moves into batched upserts."""
+
+    @pytest.fixture
+    async def thread_and_users(self, test_engine, setup_database):
+        async with test_engine.begin() as conn:
+            await conn.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+            team_id = await conn.scalar(text("INSERT INTO teams (name) VALUES ('Receipts') RETURNING id"))
+            thread_id = await conn.scalar(
+                text(
+                    "INSERT INTO threads (threadable_type, threadable_id, team_id, last_seq)"
+                    " VALUES ('campaigns', 1, :team_id, 10) RETURNING id"
+                ),
+                {"team_id": team_id},
+            )
+            user_ids = [
+                await conn.scalar(
+                    text("INSERT INTO users (name, email, email_verified) VALUES (:name, :email, true) RETURNING id"),
+                    {"name": name, "email": f"{name}@receipts.test"},
+                )
+                for name in ("ana", "ben")
+            ]
+        yield thread_id, user_ids
+        async with test_engine.begin() as conn:
+            await conn.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+            await conn.execute(text("DELETE FROM threads WHERE id = :id"), {"id": thread_id})
+            await conn.execute(text("DELETE FROM users WHERE id = ANY(:ids)"), {"ids": user_ids})
+            await conn.execute(text("DELETE FROM teams WHERE id = :id"), {"id": team_id})
+
+    async def test_marks_are_coalesced(self, test_engine, thread_and_users):
+        """Test repeated marks are written as one upsert, and cursors never move back."""
+        thread_id, (ana, ben) = thread_and_users
+        receipts = ReadReceipts(async_sessionmaker(test_engine), interval=60)
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+
+        for seq in (3, 5, 4):
+            receipts.mark(thread_id, ana, seq)
+        receipts.mark(thread_id, ben, 2)
+        assert await receipts.flush() == 2
+        assert await receipts.flush() == 0
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+        assert sum("thread_read_cursors" in statement for statement in statements) == 1
+
+        receipts.mark(thread_id, ana, 1)  # Behind the written cursor
+        await receipts.close()
+        async with test_engine.connect() as conn:
+            cursors = dict(
+                (
+                    await conn.execute(
+                        select(ThreadReadCursor.user_id, ThreadReadCursor.seq).where(
+                            ThreadReadCursor.thread_id == thread_id
+                        )
+                    )
+                ).all()
+            )
+        assert cursors == {ana: 5, ben: 2}
+
+    async def test_flushed_on_timer(self, test_engine, thread_and_users):
+        """Test pending marks are written once the interval has passed."""
+        thread_id, (ana, _) = thread_and_users
+        receipts = ReadReceipts(async_sessionmaker(test_engine), interval=0.01)
+        receipts.mark(thread_id, ana, 7)
+        for _ in range(50):
+            await asyncio.sleep(0.02)
+            async with test_engine.connect() as conn:
+                seq = await conn.scalar(select(ThreadReadCursor.seq).where(ThreadReadCursor.thread_id == thread_id))
+            if seq is not None:
+                break
+        assert seq == 7
+        await receipts.close()
@@ -0,0 +1,130 @@
+"""Tests for replaying missed messages to resuming thread WebSockets."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from litestar.channels import ChannelsPlugin
+from litestar.channels.backends.memory import MemoryChannelsBackend
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.threads.enums import ThreadSocketMessageType
+from app.threads.replay import MessageReplayBuffer, ResumeGate, missed_messages
+from app.threads.schemas import ServerMessage
+from app.threads.services import notify_thread_after_commit
+from app.threads.utils import created_message_seq, encode_server_message_str, get_thread_channel
+from app.utils.channel_hub import ChannelHub
+from app.utils.sqids import sqid_encode
+from tests.factories.threads import MessageFactory
+
+
+def created(seq: int) -> bytes:
+    message = ServerMessage(
+        message_type=ThreadSocketMessageType.MESSAGE_CREATED, message_id=sqid_encode(seq), seq=seq, viewers=[]
+    )
+    return encode_server_message_str(message).encode()
+
+
+class TestMessageReplayBuffer:
+    """Tests for the per-thread buffer of recent MESSAGE_CREATED events."""
+
+    def test_replays_only_complete_ranges(self):
+        """Test a replay is served only when every missed seq is kept."""
+        buffer = MessageReplayBuffer(size=3)
+        for seq in (1, 2, 3, 4):
+            buffer.record("thread_1", created(seq))
+        buffer.record("thread_1", created(4))  # Seen twice
+        buffer.record("thread_1", b'{"message_type":"user_joined","viewers":[]}')
+
+        assert buffer.since("thread_1", 2, last_seq=4) == [created(3), created(4)]
+        assert buffer.since("thread_1", 4, last_seq=4) == []
+        assert buffer.since("thread_1", 0, last_seq=4) is None  # Seq 1 was evicted
+        assert buffer.since("thread_1", 2, last_seq=5) is None  # Seq 5 wasn't received
+        assert buffer.since("thread_2", 0, last_seq=1) is None
+
+        # After a gap, only the events from the gap on are complete
+        buffer.record("thread_1", created(7))
+        assert buffer.since("thread_1", 6, last_seq=7) == [created(7)]
+        assert buffer.since("thread_1", 3, last_seq=7) is None
+
+    async def test_hub_feeds_buffer(self):
+        """Test the hub's observer sees each channel event once, however many sockets listen."""
+        buffer = MessageReplayBuffer()
+        plugin = ChannelsPlugin(backend=MemoryChannelsBackend(), arbitrary_channels_allowed=True)
+        async with plugin:
+            hub = ChannelHub(plugin, linger=0, observer=buffer.record)
+            received: list[bytes] = []
+
+            async def collect(event: bytes) -> None:
+                received.append(event)
+
+            async with hub.stream("thread_1", collect), hub.stream("thread_1", collect):
+                await plugin.wait_published(created(1), "thread_1")
+                for _ in range(20):
+                    if len(received) == 2:
+                        break
+                    await asyncio.sleep(0.01)
+
+        assert buffer.since("thread_1", 0, last_seq=1) == [created(1)]
+
+    async def test_gate_holds_live_events_until_replayed(self):
+        """Test live events wait for the replay, and messages it covered aren't sent twice."""
+        sent: list[bytes] = []
+
+        async def send(event: bytes) -> None:
+            sent.append(event)
+
+        gate = ResumeGate(send)
+        pending = [asyncio.create_task(gate.send(created(seq))) for seq in (3, 4)]
+        await asyncio.sleep(0.01)
+        assert sent == []
+
+        gate.open(replayed_seq=3)
+        await asyncio.gather(*pending)
+        assert [created_message_seq(event) for event in sent] == [4]
+
+
+class TestMissedMessages:
+    """Tests for reading the missed messages of a resuming socket."""
+
+    async def test_falls_back_to_database(self, db_session: AsyncSession, thread, team, user):
+        """Test missed messages not in the buffer are read from the database, skipping deleted ones."""
+        messages = [
+            await MessageFactory.create_async(session=db_session, team_id=team.id, thread_id=thread.id, user_id=user.id)
+            for _ in range(4)
+        ]
+        messages[2].soft_delete()
+        await db_session.flush()
+
+        events, last_seq = await missed_messages(db_session, MessageReplayBuffer(), thread.id, since=1)
+        assert last_seq == 4
+        assert [created_message_seq(event) for event in events] == [2, 4]
+
+        # Kept events are replayed as they were broadcast
+        buffer = MessageReplayBuffer()
+        for seq in (2, 3, 4):
+            buffer.record(get_thread_channel(thread.id), created(seq))
+        events, _ = await missed_messages(db_session, buffer, thread.id, since=1)
+        assert events == [created(2), created(3), created(4)]
+
+
+class TestNotifyAfterCommit:
+    """Tests for announcing created messages only once they are committed."""
+
+    async def test_rolled_back_message_not_announced(self, test_engine, setup_database):
+        """Test a rolled back transaction publishes nothing, so its seq can't shadow the next message."""
+        published: list[tuple[str, list[str]]] = []
+        channels = SimpleNamespace(publish=lambda data, channels: published.append((data, channels)))
+        message = ServerMessage(message_type=ThreadSocketMessageType.MESSAGE_CREATED, seq=1, viewers=[])
+
+        async with AsyncSession(test_engine) as session:
+            with pytest.raises(RuntimeError):
+                async with session.begin():
+                    notify_thread_after_commit(session, channels, 1, message)  # type: ignore[arg-type]
+                    raise RuntimeError
+        assert published == []
+
+        async with AsyncSession(test_engine) as session, session.begin():
+            notify_thread_after_commit(session, channels, 1, message)  # type: ignore[arg-type]
+            assert published == []
+        assert published == [(encode_server_message_str(message), [get_thread_channel(1)])]
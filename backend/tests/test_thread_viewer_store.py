@@ -1,115 +1,248 @@
-"""Unit tests for ThreadViewerStore."""
+"""Tests for thread viewer presence (ViewerReplica and ThreadViewerStore)."""
+
+import asyncio
+from types import SimpleNamespace
 
 import pytest
-from litestar.stores.memory import MemoryStore
+from litestar.channels import ChannelsPlugin
+from litestar.channels.backends.memory import MemoryChannelsBackend
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.threads.enums import ThreadSocketMessageType
+from app.threads.models import PresenceNode
+from app.threads.presence import PresenceBroadcaster, PresenceEvent, ThreadViewerStore, ViewerReplica
+from app.threads.schemas import ServerMessage
+from app.threads.utils import decode_presence_update, encode_server_message_str, expand_presence_update
+from app.utils.sqids import sqid_encode
+
+
+class TestViewerReplica:
+    """Tests for the in-memory viewer replica."""
+
+    def test_add_and_remove_viewers_workflow(self) -> None:
+        """Test viewers are counted per socket, so a user stays until their last socket leaves."""
+        replica = ViewerReplica()
+        assert replica.get_viewers(1) == set()
+
+        replica.join(1, 101, "node-a")
+        replica.join(1, 102, "node-a")
+        replica.join(1, 101, "node-a")  # Second tab
+        assert replica.get_viewers(1) == {101, 102}
+
+        replica.leave(1, 101, "node-a")
+        assert replica.get_viewers(1) == {101, 102}
+        replica.leave(1, 101, "node-a")
+        assert replica.get_viewers(1) == {102}
+
+        # Leaving without joining is ignored
+        replica.leave(1, 999, "node-a")
+        replica.leave(2, 101, "node-a")
+        assert replica.get_viewers(1) == {102}
+
+        replica.leave(1, 102, "node-a")
+        assert replica.get_viewers(1) == set()
+        assert not replica.has_node("node-a")
+
+    def test_expire_node(self) -> None:
+        """Test expiring a node drops only its viewers."""
+        replica = ViewerReplica()
+        replica.join(1, 101, "node-a")
+        replica.join(1, 101, "node-b")
+        replica.join(1, 102, "node-b")
+        replica.join(2, 201, "node-b")
+
+        replica.expire_node("node-b")
 
-from app.threads.services import ThreadViewerStore
+        assert replica.get_viewers(1) == {101}
+        assert replica.get_viewers(2) == set()
+        assert replica.node_viewers("node-a") == [(1, 101, 1)]
 
 
 class TestThreadViewerStore:
-    """High-value integration tests for ThreadViewerStore."""
-
-    @pytest.mark.asyncio
-    async def test_add_and_remove_viewers_workflow(self, memory_store: MemoryStore) -> None:
-        """Test adding and removing viewers with state verification at each step."""
-        store = ThreadViewerStore(store=memory_store)
-        thread_id = 1
-
-        # Initially, thread should have no viewers
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == set()
-
-        # Add first viewer
-        await store.add_viewer(thread_id, 101)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101}
-
-        # Add second viewer
-        await store.add_viewer(thread_id, 102)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101, 102}
-
-        # Add third viewer
-        await store.add_viewer(thread_id, 103)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101, 102, 103}
-
-        # Add duplicate viewer (should not create duplicate)
-        await store.add_viewer(thread_id, 101)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101, 102, 103}
-        assert len(viewers) == 3
-
-        # Remove one viewer
-        await store.remove_viewer(thread_id, 102)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101, 103}
-
-        # Remove another viewer
-        await store.remove_viewer(thread_id, 101)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {103}
-
-        # Remove last viewer
-        await store.remove_viewer(thread_id, 103)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == set()
-
-    @pytest.mark.asyncio
-    async def test_edge_cases_and_graceful_handling(self, memory_store: MemoryStore) -> None:
-        """Test edge cases like removing non-existent viewers."""
-        store = ThreadViewerStore(store=memory_store)
-        thread_id = 1
-
-        # Remove viewer from empty thread (should not error)
-        await store.remove_viewer(thread_id, 999)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == set()
-
-        # Add a viewer
-        await store.add_viewer(thread_id, 101)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101}
-
-        # Remove non-existent viewer (should not error, should not affect existing)
-        await store.remove_viewer(thread_id, 999)
-        viewers = await store.get_viewers(thread_id)
-        assert viewers == {101}
-
-    @pytest.mark.asyncio
-    async def test_simultaneous_threads(self, memory_store: MemoryStore) -> None:
-        """Test that multiple threads maintain independent viewer sets."""
-        store = ThreadViewerStore(store=memory_store)
-
-        # Add viewers to thread 1
-        await store.add_viewer(1, 101)
-        await store.add_viewer(1, 102)
-
-        # Add viewers to thread 2
-        await store.add_viewer(2, 201)
-        await store.add_viewer(2, 202)
-
-        # Add viewers to thread 3
-        await store.add_viewer(3, 301)
-
-        # Verify all threads have independent viewer sets
-        assert await store.get_viewers(1) == {101, 102}
-        assert await store.get_viewers(2) == {201, 202}
-        assert await store.get_viewers(3) == {301}
-
-        # Remove viewer from thread 2
-        await store.remove_viewer(2, 201)
-
-        # Verify thread 2 is updated but threads 1 and 3 are unchanged
-        assert await store.get_viewers(1) == {101, 102}
-        assert await store.get_viewers(2) == {202}
-        assert await store.get_viewers(3) == {301}
-
-        # Clear thread 1 completely
-        await store.remove_viewer(1, 101)
-        await store.remove_viewer(1, 102)
-
-        # Verify thread 1 is empty but other threads are unchanged
-        assert await store.get_viewers(1) == set()
-        assert await store.get_viewers(2) == {202}
-        assert await store.get_viewers(3) == {301}
+    """Tests for presence shared between app servers through the database and channels."""
+
+    @pytest.fixture
+    async def sessionmaker(self, test_engine, setup_database):
+        yield async_sessionmaker(test_engine, expire_on_commit=False)
+        async with test_engine.begin() as conn:
+            await conn.execute(text("DELETE FROM thread_viewer_events"))
+            await conn.execute(text("DELETE FROM presence_nodes"))
+
+    @pytest.fixture
+    async def thread_and_users(self, test_engine, setup_database):
+        async with test_engine.begin() as conn:
+            await conn.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+            team_id = await conn.scalar(text("INSERT INTO teams (name) VALUES ('Presence') RETURNING id"))
+            thread_id = await conn.scalar(
+                text(
+                    "INSERT INTO threads (threadable_type, threadable_id, team_id)"
+                    " VALUES ('Campaign', 1, :team_id) RETURNING id"
+                ),
+                {"team_id": team_id},
+            )
+            user_ids = [
+                await conn.scalar(
+                    text("INSERT INTO users (name, email, email_verified) VALUES (:name, :email, true) RETURNING id"),
+                    {"name": name, "email": f"{name}@presence.test"},
+                )
+                for name in ("ana", "ben")
+            ]
+        yield thread_id, user_ids
+        async with test_engine.begin() as conn:
+            await conn.execute(text("SELECT set_config('app.is_system_mode', 'true', true)"))
+            await conn.execute(text("DELETE FROM threads WHERE id = :id"), {"id": thread_id})
+            await conn.execute(text("DELETE FROM users WHERE id = ANY(:ids)"), {"ids": user_ids})
+            await conn.execute(text("DELETE FROM teams WHERE id = :id"), {"id": team_id})
+
+    @pytest.fixture
+    async def channels(self):
+        plugin = ChannelsPlugin(backend=MemoryChannelsBackend(), arbitrary_channels_allowed=True)
+        async with plugin:
+            yield plugin
+
+    @staticmethod
+    async def settle() -> None:
+        """Let the channels deliver published events."""
+        await asyncio.sleep(0.05)
+
+    async def test_viewers_shared_between_nodes(self, sessionmaker, thread_and_users, channels):
+        """Test joins and leaves on one node reach another, and a new node loads the current viewers."""
+        thread_id, (ana, ben) = thread_and_users
+        node_a = ThreadViewerStore(sessionmaker, channels, node_id="node-a", heartbeat=60, lease=60)
+        node_b = ThreadViewerStore(sessionmaker, channels, node_id="node-b", heartbeat=60, lease=60)
+        try:
+            assert await node_a.add_viewer(thread_id, ana) == {ana}
+            await node_b.start()
+            assert node_b.get_viewers(thread_id) == {ana}  # From the snapshot
+
+            assert await node_b.add_viewer(thread_id, ben) == {ana, ben}
+            await self.settle()
+            assert node_a.get_viewers(thread_id) == {ana, ben}
+
+            assert await node_a.remove_viewer(thread_id, ana) == {ben}
+            await self.settle()
+            assert node_b.get_viewers(thread_id) == {ben}
+
+            # A node starting now only sees viewers that are still there
+            node_c = ThreadViewerStore(sessionmaker, channels, node_id="node-c")
+            await node_c.start()
+            assert node_c.get_viewers(thread_id) == {ben}
+            await node_c.stop()
+
+            # Stopping withdraws the node's viewers everywhere
+            await node_b.stop()
+            await self.settle()
+            assert node_a.get_viewers(thread_id) == set()
+        finally:
+            await node_a.stop()
+            await node_b.stop()
+
+    async def test_crashed_node_expires(self, sessionmaker, thread_and_users, channels):
+        """Test a node whose lease lapses is swept, and its viewers dropped on every node."""
+        thread_id, (ana, ben) = thread_and_users
+        node_a = ThreadViewerStore(sessionmaker, channels, node_id="node-a", heartbeat=60, lease=60)
+        crashed = ThreadViewerStore(sessionmaker, channels, node_id="crashed", heartbeat=60, lease=60)
+        try:
+            await crashed.add_viewer(thread_id, ben)
+            await node_a.add_viewer(thread_id, ana)
+            assert node_a.get_viewers(thread_id) == {ana, ben}
+
+            # The node dies without withdrawing, and its lease runs out
+            crashed._heartbeat_task.cancel()  # type: ignore[union-attr]
+            async with sessionmaker.begin() as session:
+                await session.execute(
+                    update(PresenceNode)
+                    .where(PresenceNode.node_id == "crashed")
+                    .values(expires_at=text("now() - interval '1 second'"))
+                )
+
+            observer = ThreadViewerStore(sessionmaker, channels, node_id="observer")
+            await observer.start()
+            assert observer.get_viewers(thread_id) == {ana}  # Expired leases aren't loaded
+
+            await node_a.beat()
+            await self.settle()
+            assert node_a.get_viewers(thread_id) == {ana}
+            assert observer.get_viewers(thread_id) == {ana}
+            async with sessionmaker() as session:
+                nodes = set(await session.scalars(select(PresenceNode.node_id)))
+            assert nodes == {"node-a"}
+            await observer.stop()
+        finally:
+            await node_a.stop()
+            await crashed.stop()
+
+    def test_events_in_snapshot_are_skipped(self) -> None:
+        """Test events already included in the startup snapshot aren't applied twice."""
+        store = ThreadViewerStore(None, None, node_id="node-a")  # type: ignore[arg-type]
+        store._snapshot_event_id = 10
+        store.replica.join(1, 101, "node-b")
+
+        store.apply(PresenceEvent(kind="joined", node_id="node-b", thread_id=1, user_id=101, event_id=10))
+        store.apply(PresenceEvent(kind="left", node_id="node-b", thread_id=1, user_id=101, event_id=11))
+        assert store.get_viewers(1) == set()
+
+        # Events of this node are already in the replica
+        store.apply(PresenceEvent(kind="joined", node_id="node-a", thread_id=1, user_id=101, event_id=12))
+        assert store.get_viewers(1) == set()
+
+
+class TestPresenceBroadcaster:
+    """Tests for batching focus/blur changes per thread."""
+
+    @pytest.fixture
+    async def channels(self):
+        plugin = ChannelsPlugin(backend=MemoryChannelsBackend(), arbitrary_channels_allowed=True)
+        async with plugin:
+            yield plugin
+
+    async def test_burst_is_broadcast_once(self, channels):
+        """Test a burst of focus/blur is broadcast once per thread, with each user's latest state."""
+        broadcaster = PresenceBroadcaster(channels, interval=0.05)
+        subscriber = await channels.subscribe(["thread_1", "thread_2"])
+        try:
+            for focused in (True, False, True, False):
+                broadcaster.update(1, 101, focused=focused)
+            broadcaster.update(1, 102, focused=True)
+            broadcaster.update(2, 201, focused=True)
+
+            events = []
+            async with asyncio.timeout(1):
+                async for event in subscriber.iter_events():
+                    events.append(decode_presence_update(event))
+                    if len(events) == 2:
+                        break
+            await asyncio.sleep(0.1)
+            assert subscriber.qsize == 0  # Nothing else was broadcast
+        finally:
+            await channels.unsubscribe(subscriber)
+
+        updates = {tuple(update.focused): update for update in events if update is not None}
+        assert updates[(sqid_encode(102),)].blurred == [sqid_encode(101)]
+        assert updates[(sqid_encode(201),)].blurred == []
+
+    async def test_expand_for_clients_without_diffs(self):
+        """Test a PresenceUpdate expands to the per-user messages older clients expect."""
+        published: list[bytes] = []
+        channels = SimpleNamespace(publish=lambda data, channels: published.append(data))
+        broadcaster = PresenceBroadcaster(channels, interval=60)  # type: ignore[arg-type]
+        broadcaster.update(1, 101, focused=True)
+        broadcaster.update(1, 102, focused=False)
+        broadcaster.close()
+
+        update = decode_presence_update(published[0])
+        assert update is not None
+        viewers = [sqid_encode(101), sqid_encode(102)]
+        assert expand_presence_update(update, viewers) == [
+            encode_server_message_str(
+                ServerMessage(ThreadSocketMessageType.USER_FOCUS, user_id=sqid_encode(101), viewers=viewers)
+            ),
+            encode_server_message_str(
+                ServerMessage(ThreadSocketMessageType.USER_BLUR, user_id=sqid_encode(102), viewers=viewers)
+            ),
+        ]
+
+        # Other events pass through
+        joined = ServerMessage(ThreadSocketMessageType.USER_JOINED, user_id=sqid_encode(101), viewers=viewers)
+        assert decode_presence_update(encode_server_message_str(joined)) is None
@@ -1,6 +1,7 @@
 """Tests for time series data endpoint (/o/{object_type}/data)."""
 
 from datetime import UTC, datetime
+from decimal import Decimal
 
 import pytest
 from litestar.testing import AsyncTestClient
@@ -11,6 +12,7 @@ from app.roster.models import Roster
 from tests.factories.brands import BrandFactory
 from tests.factories.campaigns import CampaignFactory
 from tests.factories.deliverables import DeliverableFactory
+from tests.factories.payments import InvoiceFactory
 
 
 class TestTimeSeriesData:
@@ -402,3 +404,97 @@ class TestTimeSeriesData:
         assert breakdowns.get("Nike") == 2, "Should have 2 campaigns for Nike"
         assert breakdowns.get("Adidas") == 1, "Should have 1 campaign for Adidas"
         assert bucket_2025["total_count"] == 3
+
+    async def test_percentile_aggregation(
+        self,
+        authenticated_client: AsyncTestClient,
+        team,
+        db_session: AsyncSession,
+    ):
+        """Test p50/p90 aggregations are computed server-side per bucket."""
+        for amount in ["100.00", "200.00", "300.00", "400.00", "500.00"]:
+            await InvoiceFactory.create_async(
+                session=db_session,
+                team_id=team.id,
+                amount_due=Decimal(amount),
+                created_at=datetime(2025, 11, 15, tzinfo=UTC),
+            )
+        await db_session.flush()
+
+        expected = {"p50": 300.0, "p90": 460.0}
+        for aggregation, value in expected.items():
+            response = await authenticated_client.post(
+                f"/o/{ObjectTypes.Invoices}/data",
+                json={
+                    "field": "amount_due",
+                    "start_date": "2025-11-01T00:00:00Z",
+                    "end_date": "2025-11-30T00:00:00Z",
+                    "aggregation": aggregation,
+                    "granularity": "month",
+                },
+            )
+
+            assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+            data = response.json()
+            assert data["aggregation_type"] == aggregation
+            assert data["data"]["type"] == "numerical"
+
+            bucket = next(dp for dp in data["data"]["data_points"] if dp["count"] > 0)
+            assert bucket["value"] == pytest.approx(value)
+            assert bucket["count"] == 5
+
+    async def test_count_distinct_on_categorical_field(
+        self,
+        authenticated_client: AsyncTestClient,
+        team,
+        db_session: AsyncSession,
+    ):
+        """Test count_distinct returns a numerical series even for categorical fields."""
+        brand = await BrandFactory.create_async(session=db_session, team_id=team.id, name="Nike")
+        for name in ["Launch", "Launch", "Holiday"]:
+            await CampaignFactory.create_async(
+                session=db_session,
+                team_id=team.id,
+                brand_id=brand.id,
+                name=name,
+                created_at=datetime(2025, 11, 15, tzinfo=UTC),
+            )
+        await db_session.flush()
+
+        response = await authenticated_client.post(
+            f"/o/{ObjectTypes.Campaigns}/data",
+            json={
+                "field": "name",
+                "start_date": "2025-11-01T00:00:00Z",
+                "end_date": "2025-11-30T00:00:00Z",
+                "aggregation": "count_distinct",
+                "granularity": "month",
+            },
+        )
+
+        assert response.status_code in [200, 201], f"Got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["data"]["type"] == "numerical"
+
+        bucket = next(dp for dp in data["data"]["data_points"] if dp["count"] > 0)
+        assert bucket["value"] == 2
+        assert bucket["count"] == 3
+
+    async def test_percentile_on_categorical_field_is_rejected(
+        self,
+        authenticated_client: AsyncTestClient,
+    ):
+        """Test a percentile of a non-numerical field is a validation error, not a server error."""
+        response = await authenticated_client.post(
+            f"/o/{ObjectTypes.Campaigns}/data",
+            json={
+                "field": "name",
+                "start_date": "2025-11-01T00:00:00Z",
+                "end_date": "2025-11-30T00:00:00Z",
+                "aggregation": "p90",
+                "granularity": "month",
+            },
+        )
+
+        assert response.status_code == 400, f"Got {response.status_code}: {response.text}"
+        assert "p90" in response.text